@@ -1,12 +1,16 @@
+import atexit
+
 from flask import Flask
 from flask_restx import Api
 from app.api.v1.users import api as users_ns
 from app.api.v1.amenities import api as amenities_ns
 from app.api.v1.places import api as places_ns
 from app.api.v1.reviews import api as reviews_ns
+from app.services import facade
 
-def create_app():
+def create_app(config_class="config.DevelopmentConfig"):
     app = Flask(__name__)
+    app.config.from_object(config_class)
     api = Api(app, version='1.0', title='HBnB API', description='HBnB Application API')
 
     # Register namespaces
@@ -15,7 +19,28 @@ def create_app():
     api.add_namespace(places_ns, path='/api/v1/places')
     api.add_namespace(reviews_ns, path='/api/v1/reviews')
 
+    if app.config.get('DATA_DIR'):
+        open_store(app)
+
     # Debug: show all registered URLs and their allowed methods
     print(app.url_map)
 
     return app
+
+def open_store(app):
+    """Back the shared facade with a DurableStore (once per process)."""
+    from app.persistence.durable import DurableStore
+
+    config = app.config
+    if facade.user_repo._store is not None:
+        return
+    store = DurableStore(config['DATA_DIR'], sync=config['DATA_SYNC'],
+                         snapshot_every=config['SNAPSHOT_EVERY'])
+    counts = facade.open_store(store)
+    app.logger.info("Recovered %d objects from %s", sum(counts.values()), config['DATA_DIR'])
+
+    def close():
+        # A snapshot on the way out makes the next start-up a plain load
+        store.snapshot()
+        store.close()
+    atexit.register(close)
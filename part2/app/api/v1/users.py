@@ -1,8 +1,7 @@
 from flask_restx import Namespace, Resource, fields
-from app.services.facade import HBnBFacade
+from app.services import facade
 
 api = Namespace('users', description='User operations')
-facade = HBnBFacade()
 
 # Output model (includes read-only id)
 user_model = api.model('User', {
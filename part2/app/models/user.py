@@ -1,4 +1,4 @@
-models/user.py import re
+import re
 from .base_model import BaseModel
 
 # Simple email regex: something@something.something
@@ -14,8 +14,6 @@ class User(BaseModel):
       email      (str): required, valid format, unique.
       is_admin   (bool): defaults to False.
     """
-    _used_emails = set()
-
     def __init__(self, first_name, last_name, email, is_admin=False):
         super().__init__()
 
@@ -32,10 +30,7 @@ class User(BaseModel):
         # 2. Format
         if not _EMAIL_RE.match(email):
             raise ValueError("Invalid email format.")
-        # 3. Uniqueness
-        if email in User._used_emails:
-            raise ValueError("Email must be unique.")
-        User._used_emails.add(email)
+        # Uniqueness is checked by the user repository's unique index
 
         # Assign attributes
         self.first_name = first_name
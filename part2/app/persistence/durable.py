@@ -0,0 +1,345 @@
+"""
+Optional durability for the in-memory repositories.
+
+A `DurableStore` keeps an append-only log of every add/update/delete made
+through the repositories attached to it, and now and then writes a
+compact snapshot of their contents. On start-up `recover()` maps the
+newest snapshot and replays the log written after it, so the in-memory
+backend survives a restart while reads stay plain dict lookups.
+
+Files in the store's directory, for generation G:
+
+    snapshot-G.bin   every object as of (at least) the moment wal-G began
+    wal-G.log        the writes made since then
+
+Log records are framed as (length, crc32, pickle); a record torn by a
+crash fails its check and the log is cut there on recovery. Each record
+carries the whole state of an object, so replaying one the snapshot
+already reflects changes nothing: snapshots are taken while writes go on.
+
+`sync` sets when a write returns:
+
+    'group'   after an fsync; one fsync covers every record appended
+              while the previous one ran (group commit)
+    'always'  after an fsync of its own
+    'none'    at once; the OS writes the log back (a power loss can drop
+              the last few seconds, a crashed process loses nothing)
+
+The files hold pickles: only open directories this application wrote.
+"""
+import gc
+import glob
+import mmap
+import os
+import pickle
+import re
+import struct
+import threading
+import zlib
+from contextlib import contextmanager
+
+from app.models.base_model import BaseModel
+
+SYNC_MODES = ('group', 'always', 'none')
+SNAPSHOT_MAGIC = b'HBNBSNP1'
+_FRAME = struct.Struct('<II')       # payload length, crc32
+_SNAPSHOT_HEADER = struct.Struct('<8sQ')  # magic, index length
+_FILE = re.compile(r'(wal|snapshot)-(\d+)\.(log|bin)$')
+_fsync = getattr(os, 'fdatasync', os.fsync)
+
+
+@contextmanager
+def _gc_paused():
+    # Recovery allocates millions of containers, none of them garbage: left
+    # on, the cyclic collector would rescan them over and over (half the time)
+    enabled = gc.isenabled()
+    gc.disable()
+    try:
+        yield
+    finally:
+        if enabled:
+            gc.enable()
+
+
+def _encode(obj):
+    """(class, plain attributes, {attribute: id or [ids]} of related objects)"""
+    plain, refs = {}, {}
+    for key, value in vars(obj).items():
+        if isinstance(value, BaseModel):
+            refs[key] = value.id
+        elif isinstance(value, list) and value and isinstance(value[0], BaseModel):
+            refs[key] = [item.id for item in value]
+        else:
+            plain[key] = value
+    return type(obj), plain, refs
+
+
+class WriteLog:
+    """One append-only log file. Callers serialize `write`; `wait_durable` is thread-safe."""
+
+    def __init__(self, path, sync='group'):
+        self.path = path
+        self.sync = sync
+        self._fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_APPEND, 0o644)
+        self._sync_lock = threading.Lock()
+        self._written = 0
+        self._synced = 0
+        self.fsyncs = 0
+
+    def write(self, payload):
+        """Append one record; returns its sequence number for `wait_durable`."""
+        os.write(self._fd, _FRAME.pack(len(payload), zlib.crc32(payload)) + payload)
+        self._written += 1
+        if self.sync == 'always':
+            self._fsync(self._written)
+        return self._written
+
+    def wait_durable(self, seq):
+        """Return once record `seq` is on disk, joining an fsync under way if possible."""
+        if self.sync != 'group' or self._synced >= seq:
+            return
+        with self._sync_lock:
+            # Whoever held the lock may have synced our record already
+            if self._synced < seq:
+                self._fsync(self._written)
+
+    def _fsync(self, upto):
+        _fsync(self._fd)
+        self._synced = upto
+        self.fsyncs += 1
+
+    def close(self):
+        with self._sync_lock:
+            if self.sync != 'none' and self._synced < self._written:
+                self._fsync(self._written)
+            self._synced = self._written
+        os.close(self._fd)
+
+
+def read_log(path):
+    """
+    Yield the records of a log file, stopping at the first torn or corrupt
+    one; returns (via StopIteration.value) the offset where valid data ends.
+    """
+    with open(path, 'rb') as stream:
+        data = stream.read()
+    offset, size = 0, len(data)
+    while offset + _FRAME.size <= size:
+        length, crc = _FRAME.unpack_from(data, offset)
+        start, end = offset + _FRAME.size, offset + _FRAME.size + length
+        if end > size or zlib.crc32(data[start:end]) != crc:
+            break
+        yield pickle.loads(data[start:end])
+        offset = end
+    return offset
+
+
+class DurableStore:
+    """
+    Write log plus snapshots behind named in-memory repositories. Attach
+    every repository, call `recover()` once, then writes are logged.
+    """
+
+    def __init__(self, directory, sync='group', snapshot_every=100_000):
+        if sync not in SYNC_MODES:
+            raise ValueError(f"sync must be one of {', '.join(SYNC_MODES)}")
+        os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+        self.sync = sync
+        self.snapshot_every = snapshot_every
+        self.generation = None
+        self._repos = {}
+        self._log = None
+        self._lock = threading.Lock()
+        self._snapshotting = threading.Lock()
+        self._since_snapshot = 0
+
+    def attach(self, name, repo):
+        self._repos[name] = repo
+        repo._store, repo._store_name = self, name
+
+    # Writing
+
+    def put(self, name, obj):
+        self._append(pickle.dumps(('put', name, obj.id, *_encode(obj)), pickle.HIGHEST_PROTOCOL))
+
+    def delete(self, name, obj_id):
+        self._append(pickle.dumps(('delete', name, obj_id), pickle.HIGHEST_PROTOCOL))
+
+    def _append(self, payload):
+        if self._log is None:
+            raise RuntimeError("DurableStore.recover() must run before writes")
+        with self._lock:
+            log = self._log
+            seq = log.write(payload)
+            self._since_snapshot += 1
+            due = self.snapshot_every and self._since_snapshot >= self.snapshot_every
+        log.wait_durable(seq)
+        if due and self._snapshotting.acquire(blocking=False):
+            threading.Thread(target=self._snapshot_locked, name='snapshot', daemon=True).start()
+
+    # Snapshots
+
+    def snapshot(self):
+        """Write a snapshot now (waiting for one under way); returns its path."""
+        self._snapshotting.acquire()
+        return self._snapshot_locked()
+
+    def _snapshot_locked(self):
+        try:
+            with self._lock:
+                # New writes go to the next generation; the snapshot covers the rest
+                self._log.close()
+                self.generation += 1
+                generation = self.generation
+                self._log = WriteLog(self._path('wal', generation), self.sync)
+                self._since_snapshot = 0
+            path = self._write_snapshot(generation)
+            self._remove_before(generation)
+            return path
+        finally:
+            self._snapshotting.release()
+
+    def _write_snapshot(self, generation):
+        sections = {
+            name: pickle.dumps(
+                [(obj.id, *_encode(obj)) for obj in list(repo._storage.values())],
+                pickle.HIGHEST_PROTOCOL
+            )
+            for name, repo in self._repos.items()
+        }
+        index, offset = {}, 0
+        for name, data in sections.items():
+            index[name] = (offset, len(data), zlib.crc32(data))
+            offset += len(data)
+        header = pickle.dumps({'generation': generation, 'sections': index})
+
+        path = self._path('snapshot', generation)
+        temporary = path + '.tmp'
+        with open(temporary, 'wb') as stream:
+            stream.write(_SNAPSHOT_HEADER.pack(SNAPSHOT_MAGIC, len(header)) + header)
+            for data in sections.values():
+                stream.write(data)
+            stream.flush()
+            os.fsync(stream.fileno())
+        os.replace(temporary, path)
+        self._sync_directory()
+        return path
+
+    def _load_snapshot(self, path):
+        """{name: {id: (class, plain, refs)}} from a snapshot file, or None if it is damaged."""
+        with open(path, 'rb') as stream:
+            if os.fstat(stream.fileno()).st_size < _SNAPSHOT_HEADER.size:
+                return None
+            with mmap.mmap(stream.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                view = memoryview(mapped)
+                try:
+                    magic, header_length = _SNAPSHOT_HEADER.unpack_from(view)
+                    if magic != SNAPSHOT_MAGIC:
+                        return None
+                    base = _SNAPSHOT_HEADER.size + header_length
+                    header = pickle.loads(view[_SNAPSHOT_HEADER.size:base])
+                    states = {}
+                    for name, (offset, length, crc) in header['sections'].items():
+                        section = view[base + offset:base + offset + length]
+                        if len(section) != length or zlib.crc32(section) != crc:
+                            return None
+                        states[name] = {entry[0]: entry[1:] for entry in pickle.loads(section)}
+                        section.release()
+                    return states
+                finally:
+                    view.release()
+
+    # Recovery
+
+    def recover(self):
+        """
+        Load the newest intact snapshot and replay the logs written after
+        it into the attached repositories, then open the log for writes.
+        Returns {name: object count}.
+        """
+        with _gc_paused():
+            return self._recover()
+
+    def _recover(self):
+        snapshots, logs = self._files('snapshot'), self._files('wal')
+        states, start = {}, 0
+        for generation in sorted(snapshots, reverse=True):
+            states = self._load_snapshot(snapshots[generation])
+            if states is not None:
+                start = generation
+                break
+        states = {name: (states or {}).get(name, {}) for name in self._repos}
+
+        replayed = [generation for generation in sorted(logs) if generation >= start]
+        for generation in replayed:
+            path = logs[generation]
+            records = read_log(path)
+            while True:
+                try:
+                    record = next(records)
+                except StopIteration as end:
+                    if end.value < os.path.getsize(path):
+                        # Cut the torn tail so new records follow valid ones
+                        os.truncate(path, end.value)
+                    break
+                if record[0] == 'put':
+                    _, name, obj_id, *state = record
+                    states.setdefault(name, {})[obj_id] = state
+                else:
+                    states.get(record[1], {}).pop(record[2], None)
+
+        objects = {}
+        for entries in states.values():
+            for obj_id, (cls, plain, refs) in entries.items():
+                obj = cls.__new__(cls)
+                obj.__dict__ = plain
+                objects[obj_id] = obj
+        for entries in states.values():
+            for obj_id, (_, _, refs) in entries.items():
+                attributes = objects[obj_id].__dict__
+                for key, ref in refs.items():
+                    if isinstance(ref, list):
+                        attributes[key] = [objects[item] for item in ref if item in objects]
+                    else:
+                        attributes[key] = objects.get(ref)
+        for name, repo in self._repos.items():
+            repo.load(objects[obj_id] for obj_id in states.get(name, ()))
+
+        self.generation = max(replayed or [start])
+        self._log = WriteLog(self._path('wal', self.generation), self.sync)
+        return {name: len(states.get(name, ())) for name in self._repos}
+
+    def close(self):
+        with self._lock:
+            if self._log is not None:
+                self._log.close()
+                self._log = None
+
+    # Files
+
+    def _path(self, kind, generation):
+        extension = 'log' if kind == 'wal' else 'bin'
+        return os.path.join(self.directory, f'{kind}-{generation:08d}.{extension}')
+
+    def _files(self, kind):
+        found = {}
+        for path in glob.glob(os.path.join(self.directory, f'{kind}-*')):
+            match = _FILE.search(os.path.basename(path))
+            if match and match.group(1) == kind:
+                found[int(match.group(2))] = path
+        return found
+
+    def _remove_before(self, generation):
+        for kind in ('snapshot', 'wal'):
+            for old, path in self._files(kind).items():
+                if old < generation:
+                    os.remove(path)
+
+    def _sync_directory(self):
+        if hasattr(os, 'O_DIRECTORY'):
+            fd = os.open(self.directory, os.O_RDONLY | os.O_DIRECTORY)
+            try:
+                os.fsync(fd)
+            finally:
+                os.close(fd)
@@ -25,13 +25,69 @@ class Repository(ABC):
     def get_by_attribute(self, attr_name, attr_value):
         pass
 
+    @abstractmethod
+    def get_all_by_attribute(self, attr_name, attr_value):
+        pass
+
 
 class InMemoryRepository(Repository):
     def __init__(self):
         self._storage = {}
+        # Secondary hash indexes: attr_name -> {value: set of ids}
+        self._indexes = {}
+        self._unique = set()
+        # Values each object was indexed under, to unindex after mutation
+        self._indexed_values = {}
+        # Set by DurableStore.attach: writes are then logged to disk
+        self._store = None
+        self._store_name = None
+
+    def add_index(self, attr_name, unique=False):
+        """
+        Maintain a hash index on `attr_name` so lookups by that attribute
+        are O(1). A unique index rejects a second object with the same value.
+        """
+        index = {}
+        for obj in self._storage.values():
+            value = getattr(obj, attr_name)
+            if unique and index.get(value):
+                raise ValueError(f"Duplicate value for unique attribute '{attr_name}'")
+            index.setdefault(value, set()).add(obj.id)
+        self._indexes[attr_name] = index
+        if unique:
+            self._unique.add(attr_name)
+        for obj in self._storage.values():
+            self._indexed_values.setdefault(obj.id, {})[attr_name] = getattr(obj, attr_name)
+
+    def _check_unique(self, obj_id, values):
+        for attr_name in self._unique:
+            holders = self._indexes[attr_name].get(values[attr_name], ())
+            if any(holder != obj_id for holder in holders):
+                raise ValueError(f"Duplicate value for unique attribute '{attr_name}'")
+
+    def _unindex(self, obj_id):
+        for attr_name, value in self._indexed_values.pop(obj_id, {}).items():
+            holders = self._indexes[attr_name].get(value)
+            if holders is not None:
+                holders.discard(obj_id)
+                if not holders:
+                    del self._indexes[attr_name][value]
+
+    def _index(self, obj_id, values):
+        for attr_name, value in values.items():
+            self._indexes[attr_name].setdefault(value, set()).add(obj_id)
+        self._indexed_values[obj_id] = values
 
     def add(self, obj):
+        # Also called again after an object was mutated in place,
+        # so the index entries are refreshed rather than appended.
+        values = {attr_name: getattr(obj, attr_name) for attr_name in self._indexes}
+        self._check_unique(obj.id, values)
+        self._unindex(obj.id)
         self._storage[obj.id] = obj
+        self._index(obj.id, values)
+        if self._store is not None:
+            self._store.put(self._store_name, obj)
 
     def get(self, obj_id):
         return self._storage.get(obj_id)
@@ -42,11 +98,35 @@ class InMemoryRepository(Repository):
     def update(self, obj_id, data):
         obj = self.get(obj_id)
         if obj:
+            values = {
+                attr_name: data.get(attr_name, getattr(obj, attr_name))
+                for attr_name in self._indexes
+            }
+            self._check_unique(obj_id, values)
             obj.update(data)
+            self.add(obj)
 
     def delete(self, obj_id):
         if obj_id in self._storage:
+            self._unindex(obj_id)
             del self._storage[obj_id]
+            if self._store is not None:
+                self._store.delete(self._store_name, obj_id)
+
+    def load(self, objects):
+        """Replace the contents with `objects` (recovered from disk), rebuilding the indexes."""
+        self._storage = {obj.id: obj for obj in objects}
+        self._indexed_values = {}
+        for attr_name in list(self._indexes):
+            self.add_index(attr_name, unique=attr_name in self._unique)
 
     def get_by_attribute(self, attr_name, attr_value):
+        if attr_name in self._indexes:
+            ids = self._indexes[attr_name].get(attr_value)
+            return self._storage[next(iter(ids))] if ids else None
         return next((obj for obj in self._storage.values() if getattr(obj, attr_name) == attr_value), None)
+
+    def get_all_by_attribute(self, attr_name, attr_value):
+        if attr_name in self._indexes:
+            return [self._storage[obj_id] for obj_id in self._indexes[attr_name].get(attr_value, ())]
+        return [obj for obj in self._storage.values() if getattr(obj, attr_name) == attr_value]
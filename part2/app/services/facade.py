@@ -7,15 +7,32 @@ from app.persistence.repository import InMemoryRepository
 class HBnBFacade:
     def __init__(self):
         self.user_repo = InMemoryRepository()
+        self.user_repo.add_index('email', unique=True)
         self.amenity_repo = InMemoryRepository()
         self.place_repo = InMemoryRepository()
         self.review_repo = InMemoryRepository()
 
+    def open_store(self, store):
+        """
+        Keep the repositories on disk through `store` (a DurableStore):
+        loads what it holds, then logs every write. Returns object counts.
+        """
+        for name in ('user', 'amenity', 'place', 'review'):
+            store.attach(name, getattr(self, f'{name}_repo'))
+        return store.recover()
+
     def create_user(self, user_data):
         user = User(**user_data)
+        self._check_email(user.email)
         self.user_repo.add(user)
         return user
 
+    def _check_email(self, email, user_id=None):
+        # The unique index answers in O(1) and forgets deleted users' emails
+        holder = self.user_repo.get_by_attribute('email', email)
+        if holder is not None and holder.id != user_id:
+            raise ValueError("Email must be unique.")
+
     def get_user(self, user_id):
         return self.user_repo.get(user_id)
 
@@ -30,11 +47,12 @@ class HBnBFacade:
         if not user:
             return None
 
-        for field in ('first_name', 'last_name', 'email'):
-            if field in data:
-                setattr(user, field, data[field])
-
-        self.user_repo.add(user)
+        # Goes through the repository so the email index is checked
+        # before the user is modified
+        if 'email' in data:
+            self._check_email(data['email'], user_id)
+        changes = {f: data[f] for f in ('first_name', 'last_name', 'email') if f in data}
+        self.user_repo.update(user_id, changes)
         return user
 
     def create_amenity(self, amenity_data):
@@ -134,6 +152,8 @@ class HBnBFacade:
         )
         self.review_repo.add(review)
         place.add_review(review)
+        # Re-added so a durable store logs the place's new review list
+        self.place_repo.add(place)
         return review
 
     def get_review(self, review_id):
@@ -170,5 +190,6 @@ class HBnBFacade:
             return False
 
         review.place.reviews = [r for r in review.place.reviews if r.id != review_id]
+        self.place_repo.add(review.place)
         self.review_repo.delete(review_id)
         return True
@@ -0,0 +1,143 @@
+"""
+Durable in-memory store: recovery time and write latency.
+
+    python -m benchmarks.bench_recovery --objects 1000000
+    python -m benchmarks.bench_recovery --objects 100000 --writes 2000 --threads 8
+
+Builds a data set through the facade (40% users, 30% places with two
+amenities each, 30% reviews) and times start-up recovery:
+
+- log only: replaying every record ever written
+- snapshot: mapping one compact snapshot
+- snapshot + tail: the snapshot plus a log of 10% more writes
+
+then the latency of a logged write under each `sync` mode, with
+`--threads` writers sharing the log so group commit has company.
+"""
+import argparse
+import gc
+import os
+import shutil
+import statistics
+import tempfile
+import threading
+import time
+
+from app.persistence.durable import DurableStore
+from app.services.facade import HBnBFacade
+
+
+def open_facade(directory, sync='none'):
+    facade = HBnBFacade()
+    started = time.perf_counter()
+    counts = facade.open_store(DurableStore(directory, sync=sync, snapshot_every=0))
+    return facade, time.perf_counter() - started, sum(counts.values())
+
+
+def populate(facade, objects):
+    users, places = [], []
+    amenities = [facade.create_amenity({'name': f'Amenity {i}'}).id for i in range(20)]
+    for i in range(int(objects * 0.4)):
+        users.append(facade.create_user({'first_name': 'Bench', 'last_name': f'User{i}',
+                                         'email': f'user{i}@example.com'}).id)
+    for i in range(int(objects * 0.3)):
+        places.append(facade.create_place({
+            'title': f'Place {i}', 'description': 'A place', 'price': 50 + i % 200,
+            'latitude': (i % 180) - 90.0, 'longitude': (i % 360) - 180.0,
+            'owner_id': users[i % len(users)], 'amenities': amenities[i % 19:i % 19 + 2],
+        }).id)
+    for i in range(objects - len(users) - len(places) - len(amenities)):
+        facade.create_review({'text': 'Nice stay', 'rating': 1 + i % 5,
+                              'user_id': users[(i * 7) % len(users)], 'place_id': places[i % len(places)]})
+    return users
+
+
+def size_mb(directory):
+    return sum(os.path.getsize(os.path.join(directory, name)) for name in os.listdir(directory)) / 1e6
+
+
+def recovery(directory, objects):
+    rows = []
+    facade, _, _ = open_facade(directory)
+    started = time.perf_counter()
+    users = populate(facade, objects)
+    print(f"wrote {objects} objects in {time.perf_counter() - started:.1f} s (sync='none')")
+    facade.user_repo._store.close()
+    del facade
+    gc.collect()
+
+    facade, seconds, count = open_facade(directory)
+    rows.append(('log only', count, seconds, size_mb(directory)))
+
+    started = time.perf_counter()
+    facade.user_repo._store.snapshot()
+    print(f"snapshot written in {time.perf_counter() - started:.1f} s")
+    facade.user_repo._store.close()
+    del facade
+    gc.collect()
+
+    facade, seconds, count = open_facade(directory)
+    rows.append(('snapshot', count, seconds, size_mb(directory)))
+
+    for i in range(objects // 10):
+        facade.update_user(users[i % len(users)], {'last_name': f'Renamed{i}'})
+    facade.user_repo._store.close()
+    del facade
+    gc.collect()
+
+    facade, seconds, count = open_facade(directory)
+    rows.append(('snapshot + tail', count, seconds, size_mb(directory)))
+    facade.user_repo._store.close()
+
+    print(f"\n{'recovery':<18}{'objects':>10}{'seconds':>10}{'obj/s':>12}{'on disk MB':>12}")
+    for name, count, seconds, megabytes in rows:
+        print(f"{name:<18}{count:>10}{seconds:>10.2f}{count / seconds:>12.0f}{megabytes:>12.1f}")
+
+
+def latency(directory, writes, threads):
+    print(f"\n{'sync':<8}{'threads':>8}{'p50 us':>10}{'p99 us':>10}{'writes/s':>10}{'fsyncs':>8}")
+    for sync in ('none', 'group', 'always'):
+        path = os.path.join(directory, sync)
+        facade, _, _ = open_facade(path, sync)
+        samples = []
+
+        def writer(count):
+            for i in range(count):
+                started = time.perf_counter()
+                facade.create_amenity({'name': f'Amenity {i}'})
+                samples.append(time.perf_counter() - started)
+
+        workers = [threading.Thread(target=writer, args=(writes // threads,)) for _ in range(threads)]
+        started = time.perf_counter()
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+        elapsed = time.perf_counter() - started
+        fsyncs = facade.user_repo._store._log.fsyncs
+        facade.user_repo._store.close()
+        samples.sort()
+        p99 = samples[int(len(samples) * 0.99)]
+        print(f"{sync:<8}{threads:>8}{statistics.median(samples) * 1e6:>10.0f}{p99 * 1e6:>10.0f}"
+              f"{len(samples) / elapsed:>10.0f}{fsyncs:>8}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Recovery time and write latency of the durable store")
+    parser.add_argument('--objects', type=int, default=1_000_000)
+    parser.add_argument('--writes', type=int, default=2000, help="writes per sync mode")
+    parser.add_argument('--threads', type=int, default=8)
+    parser.add_argument('--dir', help="where to put the data (default: a temporary directory)")
+    args = parser.parse_args()
+
+    directory = args.dir or tempfile.mkdtemp(prefix='hbnb-bench-')
+    try:
+        recovery(os.path.join(directory, 'recovery'), args.objects)
+        latency(directory, args.writes, args.threads)
+    finally:
+        if not args.dir:
+            shutil.rmtree(directory, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    main()
@@ -3,6 +3,13 @@ import os
 class Config:
     SECRET_KEY = os.getenv('SECRET_KEY', 'default_secret_key')
     DEBUG = False
+    # Directory for the write log and snapshots (app/persistence/durable.py);
+    # unset keeps everything in memory only
+    DATA_DIR = os.getenv('HBNB_DATA_DIR')
+    # 'group' (fsync, shared between concurrent writes), 'always' or 'none'
+    DATA_SYNC = os.getenv('HBNB_DATA_SYNC', 'group')
+    # Writes logged between background snapshots (0: only on shutdown)
+    SNAPSHOT_EVERY = int(os.getenv('HBNB_SNAPSHOT_EVERY', 100000))
 
 class DevelopmentConfig(Config):
     DEBUG = True
@@ -20,7 +20,6 @@ def test_base_model():
     assert a.updated_at > old
 
 def test_user_valid_and_invalid():
-    User._used_emails.clear()
     u1 = User("Alice", "Smith", "alice@example.com")
     assert u1.first_name == "Alice"
     assert not u1.is_admin
@@ -53,13 +52,8 @@ def test_user_valid_and_invalid():
     except ValueError as e:
         assert "Invalid email format" in str(e)
 
-    # Duplicate email
-    u2 = User("Carol", "Lee", "carol@example.com")
-    try:
-        User("Carol", "Lee", "carol@example.com")
-        assert False
-    except ValueError as e:
-        assert "must be unique" in str(e)
+    # Duplicate emails are rejected by the user repository's unique index
+    # (test_repository.py::test_facade_rejects_duplicate_emails)
 
 def test_place_and_relationships():
     owner = User("Owner", "One", "owner1@example.com")
@@ -0,0 +1,116 @@
+# test_repository.py
+
+from app.models.user import User
+from app.persistence.repository import InMemoryRepository
+from app.services.facade import HBnBFacade
+
+
+def test_unique_index_lookup_and_maintenance():
+    repo = InMemoryRepository()
+    repo.add_index('email', unique=True)
+    alice = User("Alice", "Smith", "alice@example.com")
+    bob = User("Bob", "Smith", "bob@example.com")
+    repo.add(alice)
+    repo.add(bob)
+    assert repo.get_by_attribute('email', 'alice@example.com') is alice
+
+    # A mutated object re-added under a taken value is rejected
+    bob.email = 'alice@example.com'
+    try:
+        repo.add(bob)
+        assert False
+    except ValueError as e:
+        assert "unique" in str(e)
+    bob.email = 'bob@example.com'
+
+    repo.update(bob.id, {'email': 'robert@example.com'})
+    assert repo.get_by_attribute('email', 'bob@example.com') is None
+    assert repo.get_by_attribute('email', 'robert@example.com') is bob
+
+    repo.delete(alice.id)
+    assert repo.get_by_attribute('email', 'alice@example.com') is None
+
+
+def test_non_unique_index():
+    repo = InMemoryRepository()
+    repo.add_index('last_name')
+    users = [User("U", "Smith", f"u{i}@example.com") for i in range(3)]
+    for user in users:
+        repo.add(user)
+    repo.update(users[0].id, {'last_name': 'Jones'})
+    assert set(repo.get_all_by_attribute('last_name', 'Smith')) == set(users[1:])
+    assert repo.get_all_by_attribute('last_name', 'Jones') == [users[0]]
+
+
+def test_facade_email_lookup_uses_unique_index():
+    facade = HBnBFacade()
+    user = facade.create_user({'first_name': 'Eve', 'last_name': 'Adams',
+                               'email': 'eve@example.com'})
+    assert facade.get_user_by_email('eve@example.com') is user
+    facade.update_user(user.id, {'email': 'eve.adams@example.com'})
+    assert facade.get_user_by_email('eve@example.com') is None
+    assert facade.get_user_by_email('eve.adams@example.com') is user
+
+
+def test_facade_rejects_duplicate_emails():
+    facade = HBnBFacade()
+    carol = facade.create_user({'first_name': 'Carol', 'last_name': 'Lee',
+                                'email': 'carol@example.com'})
+    dave = facade.create_user({'first_name': 'Dave', 'last_name': 'Lee',
+                               'email': 'dave@example.com'})
+    for attempt in (lambda: facade.create_user({'first_name': 'C', 'last_name': 'L',
+                                                'email': 'carol@example.com'}),
+                    lambda: facade.update_user(dave.id, {'email': 'carol@example.com'})):
+        try:
+            attempt()
+            assert False
+        except ValueError as e:
+            assert "must be unique" in str(e)
+    assert dave.email == 'dave@example.com'
+
+    # No process-global state: a fresh facade starts with no emails taken
+    assert HBnBFacade().create_user({'first_name': 'C', 'last_name': 'L',
+                                     'email': 'carol@example.com'})
+
+    # An email given up is free again
+    facade.update_user(carol.id, {'email': 'carol.lee@example.com'})
+    assert facade.create_user({'first_name': 'C', 'last_name': 'L', 'email': 'carol@example.com'})
+
+
+def test_durable_store_recovers_log_and_snapshot(tmp_path):
+    from app.persistence.durable import DurableStore
+
+    def reopen():
+        facade = HBnBFacade()
+        facade.open_store(DurableStore(str(tmp_path), sync='always', snapshot_every=0))
+        return facade
+
+    facade = reopen()
+    owner = facade.create_user({'first_name': 'Ann', 'last_name': 'Lee', 'email': 'ann@example.com'})
+    wifi = facade.create_amenity({'name': 'Wifi'})
+    place = facade.create_place({'title': 'Loft', 'price': 80, 'latitude': 1.0,
+                                 'longitude': 2.0, 'owner_id': owner.id, 'amenities': [wifi.id]})
+    kept = facade.create_review({'text': 'Great', 'rating': 5, 'user_id': owner.id, 'place_id': place.id})
+    dropped = facade.create_review({'text': 'Meh', 'rating': 2, 'user_id': owner.id, 'place_id': place.id})
+    facade.delete_review(dropped.id)
+    facade.user_repo._store.snapshot()
+    facade.update_user(owner.id, {'email': 'ann.lee@example.com'})
+    facade.user_repo._store.close()
+
+    # A record torn by a crash is cut off; everything before it survives
+    wal = sorted(tmp_path.glob('wal-*.log'))[-1]
+    with open(wal, 'ab') as stream:
+        stream.write(b'\x40\x00\x00\x00torn')
+
+    facade = reopen()
+    recovered = facade.get_place(place.id)
+    assert recovered.title == 'Loft' and recovered.owner is facade.get_user(owner.id)
+    assert [a.name for a in recovered.amenities] == ['Wifi']
+    assert [r.id for r in recovered.reviews] == [kept.id]
+    assert recovered.reviews[0].place is recovered
+    assert facade.get_review(dropped.id) is None
+    assert facade.get_user_by_email('ann.lee@example.com').id == owner.id
+    assert facade.get_user_by_email('ann@example.com') is None
+    facade.create_amenity({'name': 'Pool'})
+    facade.user_repo._store.close()
+    assert len(reopen().get_all_amenities()) == 2
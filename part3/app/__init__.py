@@ -1,31 +1,96 @@
 from flask import Flask
-from flask_restx import Api
 from config import config
-from app.extensions import db, jwt, bcrypt
-
-# Import namespaces (API Blueprints)
-from app.api.v1.users import api as users_ns
-from app.api.v1.amenities import api as amenities_ns
-from app.api.v1.places import api as places_ns
-from app.api.v1.reviews import api as reviews_ns
-from app.api.v1.auth import api as auth_ns
+from app import metrics, services
+from app.extensions import db, jwt, bcrypt, password_hasher
+from app.commands import register_commands
+from app.persistence import query_audit, replicas
+from app.persistence.engine import configure_engine, engine_options
+from app.services.signals import data_changed
+# Every mapped class, so relationships resolve whichever model is used first
+from app.models import amenity, place, place_amenity, review, user  # noqa: F401
 
 def create_app(config_class=config['default']):
+    # Deferred until an app is built: the API stack (flask-restx, namespaces,
+    # compiled serializers), which `import app` (CLI scripts, tests of the
+    # models) doesn't need. The facade is built on first use.
+    from flask_restx import Api
+    from app.api.cache import ResponseCache
+    from app.password_hashing import HasherBusy
+    from app.persistence.migrations import check_schema
+
     app = Flask(__name__)
     app.config.from_object(config_class)
 
     # Initialize extensions
+    app.config['SQLALCHEMY_ENGINE_OPTIONS'] = engine_options(app.config)
+    replica_binds = replicas.replica_binds(app.config)
+    app.config['SQLALCHEMY_BINDS'] = {**(app.config.get('SQLALCHEMY_BINDS') or {}), **replica_binds}
     db.init_app(app)
+    for key in replica_binds:
+        # init_app registers a MetaData per bind on the process-wide `db`.
+        # Replicas map no models, and left there they would send every
+        # later app's create_all()/drop_all() looking for these binds
+        if not db.metadatas[key].tables:
+            del db.metadatas[key]
+    with app.app_context():
+        for engine in db.engines.values():
+            configure_engine(engine, app.config)
+            if app.config.get('METRICS_ENABLED'):
+                metrics.instrument_engine(engine)
+            if app.config.get('QUERY_AUDIT'):
+                query_audit.instrument_engine(engine)
+        # Safe reads go to the replicas, everything else to the primary
+        replicas.init_app(app, [db.engines[key] for key in replica_binds])
     jwt.init_app(app)
     bcrypt.init_app(app)
+    password_hasher.init_app(app)
+
+    # One facade per app, built on first use
+    services.init_app(app)
+
+    # CLI commands (`flask --app run <command>`)
+    register_commands(app)
+
+    if app.config.get('SCHEMA_CHECK_ON_STARTUP'):
+        with app.app_context():
+            check_schema(app.logger)
+
+    # Request latency, status and SQL counters, served at /metrics
+    if app.config.get('METRICS_ENABLED'):
+        metrics.init_app(app)
+
+    # Statement log per request: N+1 warnings and QUERY_BUDGETS checks
+    if app.config.get('QUERY_AUDIT'):
+        query_audit.init_app(app)
+
+    # Response cache, emptied by the facade's write notifications
+    if app.config.get('RESPONSE_CACHE_SIZE'):
+        cache = ResponseCache(app.config['RESPONSE_CACHE_SIZE'], app.config['RESPONSE_CACHE_TTL'])
+        data_changed.connect(cache.on_data_changed)
+        app.extensions['response_cache'] = cache
 
     # Register API namespaces
     api = Api(app, version='1.0', title='HBnB API', description='HBnB Application API')
 
+    @api.errorhandler(HasherBusy)
+    def handle_hasher_busy(error):
+        """Shed load instead of queueing more bcrypt work"""
+        return {'message': str(error)}, 503, {'Retry-After': '1'}
+
+    from app.api.v1.users import api as users_ns
+    from app.api.v1.amenities import api as amenities_ns
+    from app.api.v1.places import api as places_ns
+    from app.api.v1.reviews import api as reviews_ns
+    from app.api.v1.auth import api as auth_ns
+    from app.api.v1.admin import api as admin_ns
+    from app.api.v1.export import api as export_ns
+
     api.add_namespace(users_ns, path='/api/v1/users')
     api.add_namespace(amenities_ns, path='/api/v1/amenities')
     api.add_namespace(places_ns, path='/api/v1/places')
     api.add_namespace(reviews_ns, path='/api/v1/reviews')
     api.add_namespace(auth_ns, path='/api/v1/auth')
+    api.add_namespace(admin_ns, path='/api/v1/admin')
+    api.add_namespace(export_ns, path='/api/v1/export')
 
     return app
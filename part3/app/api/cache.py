@@ -0,0 +1,128 @@
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from functools import wraps
+
+from flask import Response, current_app, request
+from flask_restx.utils import unpack
+
+from app.api.serializers import encode
+
+
+class CacheEntry:
+    def __init__(self, body, etag, headers, tags, expires):
+        self.body = body
+        self.etag = etag
+        self.headers = headers
+        self.tags = tags
+        self.expires = expires
+
+
+class ResponseCache:
+    """
+    Bounded LRU of rendered GET responses keyed by path + query string.
+    Entries are tagged with the entity kinds they were built from and are
+    dropped when `data_changed` reports a write to one of those kinds.
+    """
+
+    def __init__(self, max_entries=1024, ttl=30):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry.expires < time.monotonic():
+                del self._entries[key]
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry
+
+    def put(self, key, body, headers, tags):
+        etag = hashlib.sha1(body).hexdigest()
+        entry = CacheEntry(body, etag, headers, frozenset(tags), time.monotonic() + self.ttl)
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+        return entry
+
+    def invalidate(self, kinds=None):
+        """Drop the entries built from any of `kinds` (everything if None)."""
+        with self._lock:
+            if kinds is None:
+                stale = list(self._entries)
+            else:
+                kinds = set(kinds)
+                stale = [key for key, entry in self._entries.items() if entry.tags & kinds]
+            for key in stale:
+                del self._entries[key]
+            self.invalidations += len(stale)
+
+    def on_data_changed(self, sender, kinds=None, **extra):
+        self.invalidate(kinds)
+
+    def stats(self):
+        with self._lock:
+            return {
+                'entries': len(self._entries),
+                'max_entries': self.max_entries,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'invalidations': self.invalidations
+            }
+
+
+def cached_response(*tags):
+    """
+    Serve a GET handler from the app's ResponseCache. Only 200 responses are
+    stored; each carries a strong ETag (hash of the body) and conditional
+    requests with a matching If-None-Match get a 304. Put it above the
+    marshalling decorators so the cached body is the marshalled output;
+    handlers may also return an already encoded Response (serialize_with).
+    """
+    def decorator(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            cache = current_app.extensions.get('response_cache')
+            if cache is None:
+                return func(*args, **kwargs)
+
+            key = request.full_path
+            entry = cache.get(key)
+            if entry is None:
+                result = func(*args, **kwargs)
+                if isinstance(result, Response):
+                    if result.status_code != 200:
+                        return result
+                    body = result.get_data()
+                    headers = {name: value for name, value in result.headers.items()
+                               if name not in ('Content-Type', 'Content-Length')}
+                else:
+                    data, code, headers = unpack(result)
+                    if code != 200:
+                        return data, code, headers
+                    body = encode(data)
+                    headers = dict(headers or {})
+                entry = cache.put(key, body, headers, tags)
+
+            response = Response(entry.body, mimetype='application/json', headers=entry.headers)
+            response.set_etag(entry.etag)
+            response.headers['Cache-Control'] = 'no-cache'
+            return response.make_conditional(request)
+        return wrapper
+    return decorator
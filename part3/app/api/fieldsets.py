@@ -0,0 +1,67 @@
+"""
+Sparse fieldsets: `?fields=` picks the keys of a response and `?expand=`
+the related objects nested in it.
+
+A `Fieldset` knows, for one output model, which model columns each key is
+read from and which relationship (and which of its columns) each
+expandable key needs. From the request it builds both the serializer for
+the chosen keys and the `Projection` the repository loads, so columns and
+relationships nobody asked for are never read from the database.
+"""
+from flask import request
+
+from app.api.serializers import compile_serializer
+from app.persistence.query import Projection
+
+
+def _names(value):
+    return [name.strip() for name in (value or '').split(',') if name.strip()]
+
+
+class Fieldset:
+    """
+    `columns`: {key: model columns it is read from}; `relationships`:
+    {key: (relationship name, columns of the related rows)}; `expanded`:
+    the relationship keys rendered when the request names no fields.
+    """
+
+    def __init__(self, model, columns, relationships, expanded=()):
+        self.model = model
+        self.columns = columns
+        self.relationships = relationships
+        self.expanded = tuple(expanded)
+        self.params = {
+            'fields': f"Comma-separated keys to return ({', '.join(columns)})",
+            'expand': f"Comma-separated related objects to nest ({', '.join(relationships) or 'none'})",
+        }
+
+    def keys(self):
+        """
+        The keys the current request asked for, or None for the default
+        representation. Raises ValueError for unknown names.
+        """
+        fields = _names(request.args.get('fields'))
+        expand = _names(request.args.get('expand'))
+        if not fields and not expand:
+            return None
+        unknown = [name for name in fields if name not in self.columns and name not in self.relationships]
+        unknown += [name for name in expand if name not in self.relationships]
+        if unknown:
+            raise ValueError(f"Unknown field(s): {', '.join(unknown)}")
+        scalars = [key for key in self.columns if not fields or key in fields]
+        related = [key for key in self.relationships if key in fields or key in expand]
+        return tuple(scalars + related)
+
+    def profile(self, default=None):
+        """The `Projection` to load for the current request, else `default`."""
+        keys = self.keys()
+        if keys is None:
+            return default
+        columns = {column: None for key in keys if key in self.columns for column in self.columns[key]}
+        return Projection(columns, dict(self.relationships[key] for key in keys if key in self.relationships))
+
+    def serializer(self):
+        keys = self.keys()
+        if keys is None:
+            keys = tuple(self.columns) + self.expanded
+        return compile_serializer(self.model, keys)
@@ -0,0 +1,30 @@
+from urllib.parse import urlencode
+from flask import current_app, request
+
+
+def parse_page_args():
+    """Read `limit`, `after` and `offset` from the query string."""
+    config = current_app.config
+    try:
+        limit = int(request.args.get('limit', config['PAGE_SIZE_DEFAULT']))
+        offset = int(request.args.get('offset', 0))
+    except ValueError:
+        raise ValueError("limit and offset must be integers")
+    if limit < 1 or offset < 0:
+        raise ValueError("limit must be positive and offset non-negative")
+
+    return {
+        'limit': min(limit, config['PAGE_SIZE_MAX']),
+        'after': request.args.get('after'),
+        'offset': offset
+    }
+
+
+def page_headers(page):
+    """Return a `Link` header pointing at the page after `page`, if any."""
+    if not page.next_cursor:
+        return {}
+    args = request.args.to_dict()
+    args.pop('offset', None)
+    args['after'] = page.next_cursor
+    return {'Link': f'<{request.base_url}?{urlencode(args)}>; rel="next"'}
@@ -0,0 +1,128 @@
+"""
+Serializers compiled from flask-restx models.
+
+`api.marshal_with` walks the model's fields for every object it renders,
+calling a formatter per field; on a page of places with nested owners,
+amenities and reviews that walk costs more than the queries. Here each
+model is turned once into a flat function (generated source, one dict
+literal per model) that reads the attributes directly, and the result is
+encoded straight to bytes with orjson when it is installed.
+
+Fields are read as stored: models hold the declared types, so the
+String/Integer/Float formatters marshal would apply are skipped.
+"""
+import json
+from functools import wraps
+from itertools import count
+
+from flask import Response
+from flask_restx import fields
+from flask_restx.utils import unpack
+
+try:
+    import orjson
+except ImportError:  # the stdlib encoder is the fallback
+    orjson = None
+
+_compiled = {}
+_names = count()
+
+
+def _source_name(field, key):
+    attribute = field.attribute or key
+    if not isinstance(attribute, str) or not attribute.isidentifier():
+        raise TypeError(f"cannot compile attribute {attribute!r} of field {key!r}")
+    return attribute
+
+
+def _expression(field, value, helpers):
+    """Python source rendering `value` (source of the raw value) as `field`."""
+    if isinstance(field, fields.Nested):
+        name = f'_nested{next(_names)}'
+        helpers[name] = compile_serializer(field.nested)
+        return f'{name}({value})'
+    if isinstance(field, fields.List):
+        item = field.container
+        if isinstance(item, (fields.Nested, fields.List)):
+            inner = _expression(item, '_item', helpers)
+            return f'(None if {value} is None else [{inner} for _item in {value}])'
+        return f'(None if {value} is None else list({value}))'
+    if isinstance(field, fields.DateTime):
+        return f'(None if {value} is None else {value}.isoformat())'
+    if type(field) in (fields.String, fields.Integer, fields.Float, fields.Boolean, fields.Raw):
+        return value
+    raise TypeError(f"cannot compile {type(field).__name__} fields")
+
+
+def compile_serializer(model, keys=None):
+    """
+    The function rendering an object as `model` (or None as None), the same
+    dict `marshal(obj, model)` would build; with `keys`, only those keys
+    are rendered (and only their attributes read). Compiled once per model
+    and key set.
+    """
+    if keys is not None:
+        keys = tuple(key for key in model.resolved if key in keys)
+    serializer = _compiled.get((model.name, keys))
+    if serializer is not None:
+        return serializer
+
+    helpers = {}
+    items = []
+    for key, field in model.resolved.items():
+        if keys is not None and key not in keys:
+            continue
+        if isinstance(field, type):
+            field = field()
+        value = f'obj.{_source_name(field, key)}'
+        items.append(f'        {key!r}: {_expression(field, value, helpers)},')
+    source = '\n'.join([
+        'def serialize(obj):',
+        '    if obj is None:',
+        '        return None',
+        '    return {',
+        *items,
+        '    }',
+    ])
+    namespace = dict(helpers)
+    exec(compile(source, f'<serializer {model.name}>', 'exec'), namespace)
+    serializer = _compiled[(model.name, keys)] = namespace['serialize']
+    serializer.__doc__ = f"Render an object as the {model.name} model."
+    return serializer
+
+
+def encode(data):
+    """`data` as JSON bytes."""
+    if orjson is not None:
+        return orjson.dumps(data)
+    return json.dumps(data, separators=(',', ':')).encode('utf-8')
+
+
+def json_response(data, code=200, headers=None):
+    return Response(encode(data), status=code, headers=headers, mimetype='application/json')
+
+
+def serialize_with(api, model, many=False, fieldset=None):
+    """
+    Drop-in for `api.marshal_with(model)` / `api.marshal_list_with(model)` on
+    read endpoints: successful results are rendered by the compiled
+    serializer and encoded to a Response, anything else (error dicts) is
+    encoded as is. Documents `model` as the 200 response. With a
+    `fieldset` (app/api/fieldsets.py) the request's ?fields= and ?expand=
+    pick the keys rendered.
+    """
+    serialize = compile_serializer(model)
+
+    def decorator(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            data, code, headers = unpack(func(*args, **kwargs))
+            if 200 <= code < 300:
+                render = serialize if fieldset is None else fieldset.serializer()
+                data = [render(item) for item in data] if many else render(data)
+            return json_response(data, code, headers)
+        wrapper = api.response(200, 'Success', [model] if many else model)(wrapper)
+        if fieldset is not None:
+            wrapper = api.doc(params=fieldset.params)(wrapper)
+        return wrapper
+    return decorator
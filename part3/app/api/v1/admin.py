@@ -0,0 +1,90 @@
+import io
+from flask import current_app, request
+from flask_restx import Namespace, Resource, fields
+from flask_jwt_extended import jwt_required, get_jwt_identity
+from app.extensions import db
+from app.persistence.engine import pool_status
+from app.services import facade
+from app.services.bulk_import import FORMATS, KINDS, read_rows
+
+api = Namespace('admin', description='Administrative operations')
+
+import_error_model = api.model('ImportError', {
+    'line': fields.Integer(description='Line number in the uploaded file'),
+    'error': fields.String(description='Why the row was rejected')
+})
+
+import_report_model = api.model('ImportReport', {
+    'kind': fields.String(description='Imported entity type'),
+    'inserted': fields.Integer(description='Rows inserted'),
+    'failed': fields.Integer(description='Rows rejected'),
+    'errors': fields.List(fields.Nested(import_error_model), description='First rejected rows'),
+    'seconds': fields.Float(description='Wall-clock duration'),
+    'rows_per_second': fields.Integer(description='Insert throughput')
+})
+
+
+@api.route('/import/<string:kind>')
+@api.param('kind', f"One of: {', '.join(KINDS)}")
+class BulkImport(Resource):
+    @api.doc(params={'format': f"One of: {', '.join(FORMATS)} (defaults from Content-Type)"})
+    @api.marshal_with(import_report_model)
+    @api.response(400, 'Invalid import request')
+    @api.response(403, 'Admin privileges required')
+    @jwt_required()
+    def post(self, kind):
+        """Admin: stream an NDJSON or CSV request body into the database"""
+        current_user = get_jwt_identity()
+        if not current_user.get('is_admin'):
+            api.abort(403, 'Admin privileges required')
+        if kind not in KINDS:
+            api.abort(400, f"Unknown import kind '{kind}'")
+
+        fmt = request.args.get('format')
+        if fmt is None:
+            fmt = 'csv' if request.mimetype == 'text/csv' else 'ndjson'
+        if fmt not in FORMATS:
+            api.abort(400, f"Unsupported format '{fmt}'")
+
+        stream = io.TextIOWrapper(request.stream, encoding='utf-8', newline='')
+        report = facade.bulk_import(kind, read_rows(stream, fmt))
+        return report.to_dict(), 200
+
+
+@api.route('/db-pool')
+class DatabasePoolStats(Resource):
+    @api.response(403, 'Admin privileges required')
+    @jwt_required()
+    def get(self):
+        """Admin: connection pool occupancy and checkout wait times"""
+        current_user = get_jwt_identity()
+        if not current_user.get('is_admin'):
+            api.abort(403, 'Admin privileges required')
+        return pool_status(db.engine), 200
+
+
+@api.route('/cache')
+class ResponseCacheStats(Resource):
+    @api.response(403, 'Admin privileges required')
+    @jwt_required()
+    def get(self):
+        """Admin: response cache size and hit/miss counters"""
+        current_user = get_jwt_identity()
+        if not current_user.get('is_admin'):
+            api.abort(403, 'Admin privileges required')
+        cache = current_app.extensions.get('response_cache')
+        if cache is None:
+            return {'enabled': False}, 200
+        return dict(cache.stats(), enabled=True), 200
+
+    @api.response(403, 'Admin privileges required')
+    @jwt_required()
+    def delete(self):
+        """Admin: empty the response cache"""
+        current_user = get_jwt_identity()
+        if not current_user.get('is_admin'):
+            api.abort(403, 'Admin privileges required')
+        cache = current_app.extensions.get('response_cache')
+        if cache is not None:
+            cache.invalidate()
+        return {'message': 'Response cache cleared'}, 200
@@ -1,6 +1,9 @@
 from flask_restx import Namespace, Resource, fields
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from app.services import facade
+from app.api.pagination import parse_page_args, page_headers
+from app.api.cache import cached_response
+from app.api.serializers import serialize_with
 
 api = Namespace('amenities', description='Amenity operations')
 
@@ -33,15 +36,22 @@ class AmenityList(Resource):
         except ValueError as ve:
             return {'error': str(ve)}, 400
 
-    @api.marshal_list_with(amenity_model)
+    @cached_response('amenities')
+    @serialize_with(api, amenity_model, many=True)
+    @api.response(400, 'Invalid pagination parameters')
     def get(self):
-        """Retrieve a list of all amenities"""
-        return facade.get_all_amenities()
+        """Retrieve a page of amenities (`limit`, `after` cursor, `offset`)"""
+        try:
+            page = facade.get_all_amenities(**parse_page_args())
+        except ValueError as ve:
+            api.abort(400, str(ve))
+        return page.items, 200, page_headers(page)
 
 
 @api.route('/<string:amenity_id>')
 class AmenityResource(Resource):
-    @api.marshal_with(amenity_model)
+    @cached_response('amenities')
+    @serialize_with(api, amenity_model)
     @api.response(404, 'Amenity not found')
     def get(self, amenity_id):
         """Get amenity details by ID"""
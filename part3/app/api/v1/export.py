@@ -0,0 +1,69 @@
+import json
+from datetime import datetime
+from flask import Response, request, stream_with_context
+from flask_restx import Namespace, Resource
+from flask_jwt_extended import jwt_required, get_jwt_identity
+from app.services import facade
+
+api = Namespace('export', description='Streaming NDJSON exports')
+
+export_params = {
+    'since': 'Only rows with updated_at at or after this ISO-8601 timestamp',
+    'chunk_size': 'Rows fetched per database round trip (default 1000)'
+}
+
+
+def _json_default(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    raise TypeError(f"{type(value).__name__} is not JSON serializable")
+
+
+def ndjson_response(chunks):
+    """Stream chunks of dicts as NDJSON, one write per chunk."""
+    def generate():
+        for chunk in chunks:
+            yield ''.join(json.dumps(row, default=_json_default) + '\n' for row in chunk)
+    return Response(stream_with_context(generate()), mimetype='application/x-ndjson')
+
+
+def export_args():
+    since = request.args.get('since')
+    chunk_size = request.args.get('chunk_size', '1000')
+    try:
+        since = datetime.fromisoformat(since) if since else None
+    except ValueError:
+        api.abort(400, "'since' must be an ISO-8601 timestamp")
+    if not chunk_size.isdigit() or not 1 <= int(chunk_size) <= 10000:
+        api.abort(400, "'chunk_size' must be between 1 and 10000")
+    return since, int(chunk_size)
+
+
+def require_admin():
+    current_user = get_jwt_identity()
+    if not current_user.get('is_admin'):
+        api.abort(403, 'Admin privileges required')
+
+
+@api.route('/places')
+class PlaceExport(Resource):
+    @api.doc(params=export_params)
+    @api.response(403, 'Admin privileges required')
+    @jwt_required()
+    def get(self):
+        """Admin: stream every place as NDJSON"""
+        require_admin()
+        since, chunk_size = export_args()
+        return ndjson_response(facade.export_places(since, chunk_size))
+
+
+@api.route('/reviews')
+class ReviewExport(Resource):
+    @api.doc(params=export_params)
+    @api.response(403, 'Admin privileges required')
+    @jwt_required()
+    def get(self):
+        """Admin: stream every review as NDJSON"""
+        require_admin()
+        since, chunk_size = export_args()
+        return ndjson_response(facade.export_reviews(since, chunk_size))
@@ -1,6 +1,12 @@
+import math
+from flask import request
 from flask_restx import Namespace, Resource, fields
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from app.services import facade
+from app.api.pagination import parse_page_args, page_headers
+from app.api.cache import cached_response
+from app.api.fieldsets import Fieldset
+from app.api.serializers import compile_serializer, json_response, serialize_with
 
 api = Namespace('places', description='Place operations')
 
@@ -31,11 +37,36 @@ place_output = api.model('PlaceOut', {
     'price': fields.Float(description='Price'),
     'latitude': fields.Float(description='Latitude'),
     'longitude': fields.Float(description='Longitude'),
+    'review_count': fields.Integer(description='Number of reviews'),
+    'average_rating': fields.Float(description='Average rating (null when unreviewed)'),
+    'rating_histogram': fields.List(fields.Integer, description='Review counts for ratings 1-5'),
     'owner': fields.Nested(user_model),
     'amenities': fields.List(fields.Nested(amenity_model)),
     'reviews': fields.List(fields.Nested(review_model))
 })
 
+place_nearby_output = api.inherit('PlaceNearby', place_output, {
+    'distance_km': fields.Float(description='Distance from the search point in km')
+})
+
+# ?fields= / ?expand=: the columns behind each key, the relationships behind
+# the nested ones; everything is expanded by default
+place_fields = Fieldset(place_output, columns={
+    'id': ('id',),
+    'title': ('title',),
+    'description': ('description',),
+    'price': ('price',),
+    'latitude': ('latitude',),
+    'longitude': ('longitude',),
+    'review_count': ('review_count',),
+    'average_rating': ('review_count', 'rating_sum'),
+    'rating_histogram': ('rating_1', 'rating_2', 'rating_3', 'rating_4', 'rating_5'),
+}, relationships={
+    'owner': ('owner', ('first_name', 'last_name', 'email')),
+    'amenities': ('amenities', ('name',)),
+    'reviews': ('reviews', ('comment', 'rating', 'user_id', 'place_id')),
+}, expanded=('owner', 'amenities', 'reviews'))
+
 place_input = api.model('PlaceIn', {
     'title': fields.String(required=True),
     'description': fields.String(),
@@ -48,12 +79,38 @@ place_input = api.model('PlaceIn', {
 
 
 # Routes
+# Everything serialize_place reads from
+PLACE_TAGS = ('places', 'users', 'amenities', 'reviews')
+
+
 @api.route('/')
 class PlaceList(Resource):
-    @api.marshal_list_with(place_output)
+    @cached_response(*PLACE_TAGS)
+    @serialize_with(api, place_output, many=True, fieldset=place_fields)
+    @api.response(400, 'Invalid pagination parameters')
+    @api.doc(params={
+        'min_price': 'Lowest price', 'max_price': 'Highest price',
+        'owner_id': 'Only places of this owner',
+        'min_rating': 'Lowest average rating (unreviewed places are excluded)',
+        'amenities': 'Comma-separated amenity ids; only places having all of them',
+        'sort': 'created_at (default), price, title or rating; prefix with - for descending'
+    })
     def get(self):
-        """Public: Get all places"""
-        return [serialize_place(p) for p in facade.get_all_places()]
+        """Public: Get a page of places (`limit`, `after` cursor, `offset`)"""
+        try:
+            page = facade.get_all_places(
+                **parse_page_args(),
+                min_price=float_arg('min_price', required=False),
+                max_price=float_arg('max_price', required=False),
+                owner_id=request.args.get('owner_id'),
+                min_rating=float_arg('min_rating', required=False),
+                amenity_ids=list_arg('amenities'),
+                sort=request.args.get('sort', 'created_at'),
+                profile=place_fields.profile('place_list')
+            )
+        except ValueError as ve:
+            api.abort(400, str(ve))
+        return page, 200, page_headers(page)
 
     @api.expect(place_input)
     @api.marshal_with(place_output, code=201)
@@ -78,15 +135,97 @@ class PlaceList(Resource):
             return {'error': str(ve)}, 400
 
 
+@api.route('/nearby')
+class PlaceNearby(Resource):
+    @api.response(200, 'Success', [place_nearby_output])
+    @api.response(400, 'Invalid search parameters')
+    @api.doc(params=place_fields.params)
+    @api.doc(params={
+        'lat': 'Latitude of the search point',
+        'lon': 'Longitude of the search point',
+        'radius_km': 'Search radius in kilometres',
+        'limit': 'Maximum number of places',
+        'offset': 'Number of nearest places to skip'
+    })
+    def get(self):
+        """Public: Places within radius_km of (lat, lon), nearest first"""
+        try:
+            page = parse_page_args()
+            hits = facade.get_places_nearby(
+                float_arg('lat'), float_arg('lon'), float_arg('radius_km'),
+                limit=page['limit'], offset=page['offset'],
+                profile=place_fields.profile('place_list')
+            )
+        except ValueError as ve:
+            api.abort(400, str(ve))
+        serialize = place_fields.serializer()
+        return json_response([dict(serialize(p), distance_km=d) for p, d in hits])
+
+
+@api.route('/search')
+class PlaceSearch(Resource):
+    @cached_response(*PLACE_TAGS)
+    @serialize_with(api, place_output, many=True, fieldset=place_fields)
+    @api.response(400, 'Invalid search parameters')
+    @api.doc(params={
+        'q': 'Words to find in the title or description (prefixes match)',
+        'limit': 'Maximum number of places',
+        'offset': 'Number of matches to skip'
+    })
+    def get(self):
+        """Public: Full-text search over places, best match first"""
+        try:
+            page = parse_page_args()
+            places = facade.search_places(
+                request.args.get('q', ''), limit=page['limit'], offset=page['offset'],
+                profile=place_fields.profile('place_list')
+            )
+        except ValueError as ve:
+            api.abort(400, str(ve))
+        return places
+
+
+@api.route('/within')
+class PlaceWithinBox(Resource):
+    @api.response(200, 'Success', [place_nearby_output])
+    @api.response(400, 'Invalid search parameters')
+    @api.doc(params=place_fields.params)
+    @api.doc(params={
+        'min_lat': 'Southern edge', 'max_lat': 'Northern edge',
+        'min_lon': 'Western edge', 'max_lon': 'Eastern edge (less than min_lon to wrap)',
+        'limit': 'Maximum number of places',
+        'offset': 'Number of places to skip'
+    })
+    def get(self):
+        """Public: Places inside a bounding box, nearest to its centre first"""
+        try:
+            page = parse_page_args()
+            hits = facade.get_places_in_box(
+                float_arg('min_lat'), float_arg('min_lon'),
+                float_arg('max_lat'), float_arg('max_lon'),
+                limit=page['limit'], offset=page['offset'],
+                profile=place_fields.profile('place_list')
+            )
+        except ValueError as ve:
+            api.abort(400, str(ve))
+        serialize = place_fields.serializer()
+        return json_response([dict(serialize(p), distance_km=d) for p, d in hits])
+
+
 @api.route('/<string:place_id>')
 class PlaceResource(Resource):
-    @api.marshal_with(place_output)
+    @cached_response(*PLACE_TAGS)
+    @serialize_with(api, place_output, fieldset=place_fields)
+    @api.response(400, 'Invalid fields')
     def get(self, place_id):
         """Public: Get place details"""
-        place = facade.get_place(place_id)
+        try:
+            place = facade.get_place(place_id, profile=place_fields.profile('place_detail'))
+        except ValueError as ve:
+            api.abort(400, str(ve))
         if not place:
             api.abort(404, "Place not found")
-        return serialize_place(place)
+        return place
 
     @api.expect(place_input)
     @jwt_required()
@@ -96,11 +235,11 @@ class PlaceResource(Resource):
         is_admin = current_user.get('is_admin', False)
         user_id = current_user['id']
 
-        place = facade.get_place(place_id)
+        place = facade.get_place(place_id, profile=None)
         if not place:
             api.abort(404, "Place not found")
 
-        if not is_admin and str(place.owner.id) != user_id:
+        if not is_admin and str(place.user_id) != user_id:
             return {'error': 'Unauthorized action'}, 403
 
         payload = api.payload
@@ -111,29 +250,27 @@ class PlaceResource(Resource):
             return {'error': str(ve)}, 400
 
 
-# Serialization helper
-def serialize_place(place):
-    return {
-        'id': place.id,
-        'title': place.title,
-        'description': place.description,
-        'price': place.price,
-        'latitude': place.latitude,
-        'longitude': place.longitude,
-        'owner': {
-            'id': place.owner.id,
-            'first_name': place.owner.first_name,
-            'last_name': place.owner.last_name,
-            'email': place.owner.email
-        },
-        'amenities': [{'id': a.id, 'name': a.name} for a in place.amenities],
-        'reviews': [
-            {
-                'id': r.id,
-                'text': r.text,
-                'rating': r.rating,
-                'user_id': r.user.id if r.user else None
-            }
-            for r in getattr(place, 'reviews', [])
-        ]
-    }
+def float_arg(name, required=True):
+    """Read a finite float from the query string (None if optional and absent)."""
+    value = request.args.get(name)
+    if value is None:
+        if not required:
+            return None
+        raise ValueError(f"'{name}' is required")
+    try:
+        number = float(value)
+    except ValueError:
+        raise ValueError(f"'{name}' must be a number")
+    if not math.isfinite(number):
+        raise ValueError(f"'{name}' must be a finite number")
+    return number
+
+
+def list_arg(name):
+    """Read an optional comma-separated list from the query string."""
+    value = request.args.get(name, '')
+    return [item.strip() for item in value.split(',') if item.strip()]
+
+
+# Serialization helper (also used by the writes, which still marshal)
+serialize_place = compile_serializer(place_output)
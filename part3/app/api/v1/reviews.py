@@ -1,6 +1,10 @@
+from flask import request
 from flask_restx import Namespace, Resource, fields
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from app.services import facade
+from app.api.pagination import parse_page_args, page_headers
+from app.api.fieldsets import Fieldset
+from app.api.serializers import serialize_with
 
 api = Namespace('reviews', description='Review operations')
 
@@ -15,6 +19,35 @@ review_output = api.inherit('ReviewOut', review_model, {
     'id': fields.String(description='Review ID')
 })
 
+review_user_model = api.model('ReviewUser', {
+    'id': fields.String(description='User ID'),
+    'first_name': fields.String(description='First name'),
+    'last_name': fields.String(description='Last name')
+})
+
+review_place_model = api.model('ReviewPlace', {
+    'id': fields.String(description='Place ID'),
+    'title': fields.String(description='Title')
+})
+
+# What ?expand=user,place can add to a review
+review_expanded_output = api.inherit('ReviewExpanded', review_output, {
+    'user': fields.Nested(review_user_model, attribute='reviewer'),
+    'place': fields.Nested(review_place_model)
+})
+
+# ?fields= / ?expand=: nothing is expanded by default
+review_fields = Fieldset(review_expanded_output, columns={
+    'id': ('id',),
+    'text': ('comment',),
+    'rating': ('rating',),
+    'user_id': ('user_id',),
+    'place_id': ('place_id',),
+}, relationships={
+    'user': ('reviewer', ('first_name', 'last_name')),
+    'place': ('place', ('title',)),
+})
+
 @api.route('/')
 class ReviewList(Resource):
     @api.expect(review_model)
@@ -35,16 +68,26 @@ class ReviewList(Resource):
         except ValueError as ve:
             return {'error': str(ve)}, 400
 
-    @api.marshal_list_with(review_output)
+    @serialize_with(api, review_output, many=True, fieldset=review_fields)
+    @api.response(400, 'Invalid pagination parameters')
     def get(self):
-        return facade.get_all_reviews()
+        """Retrieve a page of reviews (`limit`, `after` cursor, `offset`)"""
+        try:
+            page = facade.get_all_reviews(**parse_page_args(), profile=review_fields.profile())
+        except ValueError as ve:
+            api.abort(400, str(ve))
+        return page.items, 200, page_headers(page)
 
 
 @api.route('/<string:review_id>')
 class ReviewResource(Resource):
-    @api.marshal_with(review_output)
+    @serialize_with(api, review_output, fieldset=review_fields)
+    @api.response(400, 'Invalid fields')
     def get(self, review_id):
-        review = facade.get_review(review_id)
+        try:
+            review = facade.get_review(review_id, profile=review_fields.profile())
+        except ValueError as ve:
+            api.abort(400, str(ve))
         if not review:
             api.abort(404, "Review not found")
         return review
@@ -86,9 +129,21 @@ class ReviewResource(Resource):
 
 @api.route('/places/<string:place_id>/reviews')
 class PlaceReviewList(Resource):
-    @api.marshal_list_with(review_output)
+    @serialize_with(api, review_output, many=True, fieldset=review_fields)
+    @api.response(400, 'Invalid pagination or filter parameters')
+    @api.response(404, 'Place not found')
+    @api.doc(params={'min_rating': 'Only reviews rated at least this (1-5)'})
     def get(self, place_id):
+        """Retrieve a page of a place's reviews (`limit`, `after` cursor, `offset`)"""
+        if not facade.get_place(place_id, profile=None):
+            api.abort(404, "Place not found")
         try:
-            return facade.get_reviews_by_place(place_id)
+            min_rating = request.args.get('min_rating')
+            page = facade.get_reviews_by_place(
+                place_id, **parse_page_args(),
+                min_rating=None if min_rating is None else int(min_rating),
+                profile=review_fields.profile()
+            )
         except ValueError as ve:
-            return {'error': str(ve)}, 404
+            api.abort(400, str(ve))
+        return page.items, 200, page_headers(page)
@@ -1,9 +1,10 @@
 from flask_restx import Namespace, Resource, fields
 from flask_jwt_extended import jwt_required, get_jwt_identity
-from app.services.facade import HBnBFacade
+from app.services import facade
+from app.api.pagination import parse_page_args, page_headers
+from app.api.serializers import serialize_with
 
 api = Namespace('users', description='User operations')
-facade = HBnBFacade()
 
 # Output model (excludes password)
 user_model = api.model('User', {
@@ -24,21 +25,25 @@ create_user_model = api.model('CreateUser', {
 
 @api.route('/')
 class UserList(Resource):
-    @api.marshal_list_with(user_model)
+    @serialize_with(api, user_model, many=True)
+    @api.response(400, 'Invalid pagination parameters')
     def get(self):
-        """List all users"""
-        users = facade.get_all_users()
-        return [user.to_dict() for user in users]
+        """List a page of users (`limit`, `after` cursor, `offset`)"""
+        try:
+            page = facade.get_all_users(**parse_page_args())
+        except ValueError as ve:
+            api.abort(400, str(ve))
+        return page, 200, page_headers(page)
 
     @api.expect(create_user_model, validate=True)
     @api.marshal_with(user_model, code=201)
     @api.response(400, 'Email already registered')
     def post(self):
         """Register a new user (public registration)"""
-        payload = api.payload
-        if facade.get_user_by_email(payload['email']):
-            return {'error': 'Email already registered'}, 400
-        new_user = facade.create_user(payload)
+        try:
+            new_user = facade.create_user(api.payload)
+        except ValueError as ve:
+            return {'error': str(ve)}, 400
         return new_user.to_dict(), 201
 
 
@@ -55,24 +60,23 @@ class AdminUserCreate(Resource):
         if not current_user.get("is_admin"):
             return {'error': 'Admin privileges required'}, 403
 
-        payload = api.payload
-        if facade.get_user_by_email(payload['email']):
-            return {'error': 'Email already registered'}, 400
-
-        new_user = facade.create_user(payload)
+        try:
+            new_user = facade.create_user(api.payload)
+        except ValueError as ve:
+            return {'error': str(ve)}, 400
         return new_user.to_dict(), 201
 
 
 @api.route('/<string:user_id>')
 class UserResource(Resource):
-    @api.marshal_with(user_model)
+    @serialize_with(api, user_model)
     @api.response(404, 'User not found')
     def get(self, user_id):
         """Get user details by ID"""
         user = facade.get_user(user_id)
         if not user:
             api.abort(404, 'User not found')
-        return user.to_dict()
+        return user
 
     @api.expect(create_user_model, validate=True)
     @api.marshal_with(user_model)
@@ -90,17 +94,15 @@ class UserResource(Resource):
 
         payload = api.payload
 
-        # Check email uniqueness if it's being changed
-        if 'email' in payload:
-            existing = facade.get_user_by_email(payload['email'])
-            if existing and existing.id != user_id:
-                return {'error': 'Email already in use'}, 400
-
         # Only admin can change email or password
         if not is_admin and ('email' in payload or 'password' in payload):
             return {'error': 'You cannot modify email or password.'}, 400
 
-        updated = facade.update_user(user_id, payload)
+        # The facade checks that a changed email is still free
+        try:
+            updated = facade.update_user(user_id, payload)
+        except ValueError as ve:
+            return {'error': str(ve)}, 400
         if not updated:
             api.abort(404, 'User not found')
         return updated.to_dict()
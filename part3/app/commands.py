@@ -0,0 +1,59 @@
+import click
+
+
+def register_commands(app):
+    """Attach the maintenance commands to `app.cli`."""
+
+    @app.cli.command('rebuild-ratings')
+    def rebuild_ratings():
+        """Recompute the denormalized rating aggregates of every place."""
+        from app.services import facade
+        count = facade.rebuild_rating_aggregates()
+        click.echo(f"Rebuilt rating aggregates for {count} reviewed place(s).")
+
+    @app.cli.command('rebuild-search-index')
+    def rebuild_search_index():
+        """Create the full-text place index if needed and repopulate it."""
+        from app.services import facade
+        count = facade.rebuild_search_index()
+        click.echo(f"Indexed {count} place(s) for search.")
+
+    @app.cli.command('db-upgrade')
+    @click.option('--to', 'target', type=int, default=None, help='Stop after this version.')
+    def db_upgrade(target):
+        """Apply pending schema migrations."""
+        from app.persistence import migrations
+        applied = migrations.upgrade(target)
+        for version, name in applied:
+            click.echo(f"Applied {version:04d} {name}")
+        if not applied:
+            click.echo("Schema is up to date.")
+
+    @app.cli.command('db-status')
+    def db_status():
+        """List pending migrations and missing indexes."""
+        from app.extensions import db
+        from app.persistence import migrations
+        with db.engine.connect() as connection:
+            pending = migrations.pending_migrations(connection)
+            missing = migrations.missing_indexes(connection)
+        for version, name in pending:
+            click.echo(f"Pending {version:04d} {name}")
+        for table, name in missing:
+            click.echo(f"Missing index {name} on {table}")
+        if not pending and not missing:
+            click.echo("Schema is up to date.")
+
+    @app.cli.command('db-sync-replicas')
+    def db_sync_replicas():
+        """Copy a SQLite primary into its SQLite replicas (local stand-in for replication)."""
+        from app.persistence.replicas import sync_sqlite_replicas
+        uris = app.config.get('SQLALCHEMY_REPLICA_URIS')
+        if not uris:
+            raise click.ClickException("No SQLALCHEMY_REPLICA_URIS configured.")
+        try:
+            paths = sync_sqlite_replicas(app.config['SQLALCHEMY_DATABASE_URI'], uris)
+        except ValueError as error:
+            raise click.ClickException(str(error))
+        for path in paths:
+            click.echo(f"Synced {path}")
@@ -1,7 +1,11 @@
 from flask_sqlalchemy import SQLAlchemy
 from flask_bcrypt import Bcrypt
 from flask_jwt_extended import JWTManager
+from app.password_hashing import PasswordHasher
+from app.persistence.replicas import RoutingSession
 
-db = SQLAlchemy()
+# RoutingSession sends repository reads to SQLALCHEMY_REPLICA_URIS, if any
+db = SQLAlchemy(session_options={'class_': RoutingSession})
 bcrypt = Bcrypt()
 jwt = JWTManager()
+password_hasher = PasswordHasher()
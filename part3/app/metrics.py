@@ -0,0 +1,276 @@
+import ipaddress
+import threading
+import time
+import weakref
+from bisect import bisect_left
+
+from flask import Response, abort, request
+
+# Upper bounds of the latency histograms, in seconds (Prometheus defaults)
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+STATEMENT_BUCKETS = (0, 1, 2, 5, 10, 25, 50, 100, 250)
+HASH_BUCKETS = (0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+
+class _Shard:
+    """One thread's counters: {(metric name, label values): value}."""
+    __slots__ = ('data', '__weakref__')
+
+    def __init__(self):
+        self.data = {}
+
+
+class Registry:
+    """
+    Counters and histograms aggregated per thread. Recording only touches
+    the calling thread's shard, so the hot path takes no lock; a scrape
+    merges the shards. A thread's shard is folded into `_retired` when the
+    thread exits, so short-lived request threads don't accumulate.
+    """
+
+    def __init__(self):
+        self._families = {}  # name -> (kind, help, label names, buckets)
+        self._local = threading.local()
+        self._lock = threading.RLock()
+        self._shards = weakref.WeakSet()
+        self._retired = {}
+
+    def counter(self, name, help, labels=()):
+        self._families[name] = ('counter', help, tuple(labels), None)
+        return Counter(self, name)
+
+    def histogram(self, name, help, labels=(), buckets=LATENCY_BUCKETS):
+        self._families[name] = ('histogram', help, tuple(labels), tuple(buckets))
+        return Histogram(self, name, tuple(buckets))
+
+    def _data(self):
+        shard = getattr(self._local, 'shard', None)
+        if shard is None:
+            shard = self._local.shard = _Shard()
+            with self._lock:
+                self._shards.add(shard)
+            weakref.finalize(shard, self._retire, shard.data)
+        return shard.data
+
+    def _retire(self, data):
+        with self._lock:
+            _merge(self._retired, data)
+
+    def snapshot(self):
+        """{(name, label values): value} summed over every thread."""
+        with self._lock:
+            merged = {}
+            _merge(merged, self._retired)
+            for shard in list(self._shards):
+                _merge(merged, shard.data)
+        return merged
+
+    def reset(self):
+        with self._lock:
+            self._retired.clear()
+            for shard in list(self._shards):
+                shard.data.clear()
+
+    def render(self):
+        """The Prometheus text exposition of every family."""
+        values = self.snapshot()
+        lines = []
+        for name, (kind, help, label_names, buckets) in sorted(self._families.items()):
+            lines.append(f"# HELP {name} {help}")
+            lines.append(f"# TYPE {name} {kind}")
+            series = sorted((key[1], value) for key, value in values.items() if key[0] == name)
+            for label_values, value in series:
+                labels = dict(zip(label_names, label_values))
+                if kind == 'counter':
+                    lines.append(f"{name}{_labels(labels)} {_number(value)}")
+                    continue
+                cumulative = 0
+                for bound, count in zip(buckets + (float('inf'),), value):
+                    cumulative += count
+                    lines.append(f"{name}_bucket{_labels(labels, le=_number(bound))} {cumulative}")
+                lines.append(f"{name}_sum{_labels(labels)} {_number(value[-1])}")
+                lines.append(f"{name}_count{_labels(labels)} {cumulative}")
+        return '\n'.join(lines) + '\n'
+
+
+class Counter:
+    def __init__(self, registry, name):
+        self._registry = registry
+        self._name = name
+
+    def inc(self, labels=(), amount=1):
+        data = self._registry._data()
+        key = (self._name, labels)
+        data[key] = data.get(key, 0) + amount
+
+
+class Histogram:
+    def __init__(self, registry, name, buckets):
+        self._registry = registry
+        self._name = name
+        self._buckets = buckets
+
+    def observe(self, value, labels=()):
+        data = self._registry._data()
+        key = (self._name, labels)
+        cell = data.get(key)
+        if cell is None:
+            # One count per bucket plus +Inf, then the sum
+            cell = data[key] = [0] * (len(self._buckets) + 1) + [0.0]
+        cell[bisect_left(self._buckets, value)] += 1
+        cell[-1] += value
+
+
+def _merge(into, data):
+    for key, value in list(data.items()):
+        current = into.get(key)
+        if current is None:
+            into[key] = list(value) if isinstance(value, list) else value
+        elif isinstance(value, list):
+            for i, item in enumerate(value):
+                current[i] += item
+        else:
+            into[key] = current + value
+
+
+def _number(value):
+    if value == float('inf'):
+        return '+Inf'
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value)) if abs(value) < 1e15 else repr(value)
+    return repr(value)
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _labels(labels, **extra):
+    labels = dict(labels, **extra)
+    if not labels:
+        return ''
+    return '{' + ','.join(f'{key}="{_escape(value)}"' for key, value in labels.items()) + '}'
+
+
+registry = Registry()
+
+http_requests = registry.counter(
+    'hbnb_http_requests_total', 'HTTP requests by endpoint, method and status.',
+    ('endpoint', 'method', 'status'))
+http_duration = registry.histogram(
+    'hbnb_http_request_duration_seconds', 'Time from request start until the response was sent.',
+    ('endpoint', 'method'))
+request_statements = registry.histogram(
+    'hbnb_http_request_sql_statements', 'SQL statements issued per request.',
+    ('endpoint', 'method'), STATEMENT_BUCKETS)
+request_sql_time = registry.histogram(
+    'hbnb_http_request_sql_seconds', 'Time spent executing SQL per request.',
+    ('endpoint', 'method'))
+sql_statements = registry.counter(
+    'hbnb_sql_statements_total', 'SQL statements issued, inside requests or not.')
+password_hash_time = registry.histogram(
+    'hbnb_password_hash_seconds', 'Wall time of bcrypt operations, queueing included.',
+    ('operation',), HASH_BUCKETS)
+
+# The request being served by this thread: [start, statements, SQL seconds, status]
+_current = threading.local()
+
+
+def _before_request():
+    _current.request = [time.perf_counter(), 0, 0.0, None]
+
+
+def _after_request(response):
+    state = getattr(_current, 'request', None)
+    if state is not None:
+        state[3] = response.status_code
+    return response
+
+
+def _teardown_request(error):
+    # Runs after a streamed body is exhausted, so exports are timed in full
+    state = getattr(_current, 'request', None)
+    if state is None:
+        return
+    _current.request = None
+    start, statements, sql_seconds, status = state
+    labels = (request.endpoint or 'unmatched', request.method)
+    status = 500 if error is not None else status or 500
+    http_requests.inc(labels + (str(status),))
+    http_duration.observe(time.perf_counter() - start, labels)
+    request_statements.observe(statements, labels)
+    request_sql_time.observe(sql_seconds, labels)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault('metrics_started', []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    started = conn.info.get('metrics_started')
+    elapsed = time.perf_counter() - started.pop() if started else 0.0
+    sql_statements.inc()
+    state = getattr(_current, 'request', None)
+    if state is not None:
+        state[1] += 1
+        state[2] += elapsed
+
+
+def _handle_error(context):
+    if context.connection is not None:
+        started = context.connection.info.get('metrics_started')
+        if started:
+            started.pop()
+
+
+def instrument_engine(engine):
+    """Count and time every statement `engine` executes."""
+    from sqlalchemy import event
+    event.listen(engine, 'before_cursor_execute', _before_cursor_execute)
+    event.listen(engine, 'after_cursor_execute', _after_cursor_execute)
+    event.listen(engine, 'handle_error', _handle_error)
+
+
+def _pool_lines():
+    """Connection pool gauges and the checkout wait histogram (app/persistence/engine.py)."""
+    from app.extensions import db
+    from app.persistence.engine import WAIT_BUCKETS, pool_status
+    status = pool_status(db.engine)
+    lines = []
+    for key in ('size', 'checked_out', 'overflow', 'idle'):
+        if key in status:
+            name = f'hbnb_db_pool_{key}'
+            lines += [f"# HELP {name} Connection pool {key.replace('_', ' ')} connections.",
+                      f"# TYPE {name} gauge", f"{name} {status[key]}"]
+    name = 'hbnb_db_pool_checkout_wait_seconds'
+    lines += [f"# HELP {name} Time spent waiting for a pooled connection.", f"# TYPE {name} histogram"]
+    for bound in WAIT_BUCKETS:
+        lines.append(f'{name}_bucket{{le="{_number(bound)}"}} {status["wait_buckets"][str(bound)]}')
+    lines.append(f'{name}_bucket{{le="+Inf"}} {status["checkouts"]}')
+    lines.append(f"{name}_sum {_number(status['wait_seconds_total'])}")
+    lines.append(f"{name}_count {status['checkouts']}")
+    return '\n'.join(lines) + '\n'
+
+
+def init_app(app):
+    """
+    Time every request of `app` and serve the registry at /metrics, to
+    clients in the METRICS_ALLOW_FROM networks only.
+    """
+    app.before_request(_before_request)
+    app.after_request(_after_request)
+    app.teardown_request(_teardown_request)
+    allowed = [ipaddress.ip_network(network) for network in app.config.get('METRICS_ALLOW_FROM') or ()]
+
+    def metrics_view():
+        try:
+            client = ipaddress.ip_address(request.remote_addr)
+        except ValueError:
+            client = None
+        if client is None or not any(client in network for network in allowed):
+            abort(403)
+        return Response(registry.render() + _pool_lines(), content_type=CONTENT_TYPE)
+
+    app.add_url_rule('/metrics', 'metrics', metrics_view)
@@ -12,9 +12,14 @@ class Amenity(BaseModel):
 
     def __init__(self, name):
         super().__init__()
+        Amenity.validate(name)
+        self.name = name
+
+    @staticmethod
+    def validate(name):
+        """Field rules shared by the constructor and the bulk importer."""
         if not isinstance(name, str) or not name.strip():
             raise ValueError("name must be a non-empty string")
-        self.name = name
 
     # Many-to-many explicit back_populates
     places = relationship(
@@ -15,13 +15,15 @@ class BaseModel(db.Model):
     created_at = db.Column(
         db.DateTime,
         nullable=False,
-        default=datetime.utcnow
+        default=datetime.utcnow,
+        index=True  # keyset pagination orders by (created_at, id)
     )
     updated_at = db.Column(
         db.DateTime,
         nullable=False,
         default=datetime.utcnow,
-        onupdate=datetime.utcnow
+        onupdate=datetime.utcnow,
+        index=True  # incremental exports filter on updated_at
     )
 
     def __init__(self, *args, **kwargs):
@@ -4,17 +4,37 @@ from app.extensions import db
 from .base_model import BaseModel
 from .place_amenity import place_amenity
 from .user import User
-from sqlalchemy.orm import relationship
+from app.persistence import geo
+from sqlalchemy.orm import relationship, validates
+from sqlalchemy.ext.hybrid import hybrid_property
 
 class Place(BaseModel):
     __tablename__ = 'places'
+    __table_args__ = (
+        # Covers nearby/box searches: geohash prefix range, then the exact
+        # coordinates, without touching the table rows.
+        db.Index('ix_places_geohash_coords', 'geohash', 'latitude', 'longitude', 'id'),
+        # Price ranges and price-sorted keyset pages
+        db.Index('ix_places_price', 'price', 'id'),
+    )
 
     title       = db.Column(db.String(100), nullable=False)
     description = db.Column(db.Text, default='')
     price       = db.Column(db.Float, nullable=False)
     latitude    = db.Column(db.Float, nullable=False)
     longitude   = db.Column(db.Float, nullable=False)
-    user_id     = db.Column(db.String(36), db.ForeignKey('users.id'), nullable=False)
+    user_id     = db.Column(db.String(36), db.ForeignKey('users.id'), nullable=False, index=True)
+    geohash     = db.Column(db.String(geo.GEOHASH_PRECISION), nullable=True)
+
+    # Denormalized rating aggregates, kept in step by the facade's review
+    # methods and recomputable with `flask rebuild-ratings`.
+    review_count = db.Column(db.Integer, nullable=False, default=0)
+    rating_sum   = db.Column(db.Integer, nullable=False, default=0)
+    rating_1     = db.Column(db.Integer, nullable=False, default=0)
+    rating_2     = db.Column(db.Integer, nullable=False, default=0)
+    rating_3     = db.Column(db.Integer, nullable=False, default=0)
+    rating_4     = db.Column(db.Integer, nullable=False, default=0)
+    rating_5     = db.Column(db.Integer, nullable=False, default=0)
 
     # **This exact signature** so SQLAlchemy uses it:
     def __init__(self, title, description, price, latitude, longitude, owner):
@@ -28,11 +48,23 @@ class Place(BaseModel):
         self.latitude    = latitude
         self.longitude   = longitude
         self.owner       = owner
+        self.review_count = 0
+        self.rating_sum   = 0
+        for rating in range(1, 6):
+            setattr(self, f'rating_{rating}', 0)
 
     owner     = relationship("User", back_populates="places")
     reviews   = relationship("Review", back_populates="place", cascade="all, delete-orphan")
     amenities = relationship("Amenity", secondary=place_amenity, back_populates="places")
 
+    @validates('latitude', 'longitude')
+    def _update_geohash(self, key, value):
+        latitude = value if key == 'latitude' else self.latitude
+        longitude = value if key == 'longitude' else self.longitude
+        if latitude is not None and longitude is not None:
+            self.geohash = geo.encode(latitude, longitude)
+        return value
+
     def add_amenity(self, amenity):
         from .amenity import Amenity
         if not isinstance(amenity, Amenity):
@@ -46,3 +78,39 @@ class Place(BaseModel):
         if review not in self.reviews:
             review.place = self
             self.reviews.append(review)
+
+    @hybrid_property
+    def average_rating(self):
+        if not self.review_count:
+            return None
+        return self.rating_sum / self.review_count
+
+    @average_rating.expression
+    def average_rating(cls):
+        return db.case(
+            (cls.review_count == 0, None),
+            else_=db.cast(cls.rating_sum, db.Float) / cls.review_count
+        )
+
+    @hybrid_property
+    def rating_score(self):
+        """The average rating, 0 for a place without reviews: a non-null sort key."""
+        return self.average_rating or 0.0
+
+    @rating_score.expression
+    def rating_score(cls):
+        return db.func.coalesce(cls.average_rating, 0.0)
+
+    @property
+    def rating_histogram(self):
+        """Review counts for ratings 1 through 5."""
+        return [getattr(self, f'rating_{rating}') or 0 for rating in range(1, 6)]
+
+    def record_rating(self, rating, delta=1):
+        """Add one rating to the aggregates (or remove it with delta=-1)."""
+        if rating not in range(1, 6):
+            raise ValueError("Rating must be between 1 and 5")
+        column = f'rating_{rating}'
+        self.review_count = (self.review_count or 0) + delta
+        self.rating_sum = (self.rating_sum or 0) + delta * rating
+        setattr(self, column, (getattr(self, column) or 0) + delta)
@@ -5,20 +5,32 @@ from .base_model import BaseModel
 
 class Review(BaseModel):
     __tablename__ = 'reviews'
+    __table_args__ = (
+        # A place's reviews, paged in (created_at, id) order
+        db.Index('ix_reviews_place_created', 'place_id', 'created_at', 'id'),
+    )
 
     rating   = db.Column(db.Integer, nullable=False)
     comment  = db.Column(db.Text, nullable=True)
-    user_id  = db.Column(db.String(36), db.ForeignKey('users.id'), nullable=False)
+    user_id  = db.Column(db.String(36), db.ForeignKey('users.id'), nullable=False, index=True)
     place_id = db.Column(db.String(36), db.ForeignKey('places.id'), nullable=False)
 
+    # The API calls the review body `text`
+    text = db.synonym('comment')
+
     reviewer = db.relationship("User", back_populates="reviews")
     place    = db.relationship("Place", back_populates="reviews")
 
     def __init__(self, comment, rating, place, user):
-        if not isinstance(rating, int) or not (0 <= rating <= 5):
-            raise ValueError("rating must be an integer between 0 and 5")
+        Review.validate(rating)
         super().__init__()
         self.comment = comment
         self.rating = rating
         self.place = place
         self.reviewer = user
+
+    @staticmethod
+    def validate(rating):
+        """Field rules shared by the constructor and the bulk importer."""
+        if not isinstance(rating, int) or not (1 <= rating <= 5):
+            raise ValueError("rating must be an integer between 1 and 5")
@@ -1,12 +1,11 @@
 # app/models/user.py
 
-from app.extensions import db
+from app.extensions import db, password_hasher
 from .base_model import BaseModel
 from sqlalchemy.orm import relationship
 
 class User(BaseModel):
     __tablename__ = 'users'
-    _used_emails = set()
 
     first_name = db.Column(db.String(50), nullable=False)
     last_name  = db.Column(db.String(50), nullable=False)
@@ -18,6 +17,24 @@ class User(BaseModel):
     reviews = relationship("Review", back_populates="reviewer", cascade="all, delete-orphan")
 
     def __init__(self, first_name, last_name, email):
+        # Uniqueness is the repository's job (unique index on email)
+        User.validate(first_name, last_name, email)
+        super().__init__()
+        self.first_name = first_name
+        self.last_name  = last_name
+        self.email      = email
+
+    def hash_password(self, password):
+        """Store the bcrypt hash of `password` (computed in the hashing pool)."""
+        self.password = password_hasher.hash(password)
+
+    def check_password(self, password):
+        """Verify `password` against the stored hash."""
+        return password_hasher.verify(self.password, password)
+
+    @staticmethod
+    def validate(first_name, last_name, email):
+        """Field rules shared by the constructor and the bulk importer."""
         if len(first_name) > 50:
             raise ValueError("first_name must be 50 characters or fewer")
         if len(last_name) > 50:
@@ -26,10 +43,3 @@ class User(BaseModel):
             raise ValueError("Email is required")
         if '@' not in email:
             raise ValueError("Invalid email format")
-        if email in User._used_emails:
-            raise ValueError("email must be unique")
-        super().__init__()
-        self.first_name = first_name
-        self.last_name  = last_name
-        self.email      = email
-        User._used_emails.add(email)
@@ -0,0 +1,142 @@
+import hashlib
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, TimeoutError as FuturesTimeout
+
+import bcrypt as _bcrypt
+
+from app.metrics import password_hash_time
+
+
+class HasherBusy(Exception):
+    """Raised when too many hash/verify requests are already queued."""
+
+
+def _prepare(password, handle_long):
+    # Same encoding rules as flask_bcrypt, so existing hashes keep verifying
+    if isinstance(password, str):
+        password = password.encode('utf-8')
+    if handle_long:
+        password = hashlib.sha256(password).hexdigest().encode('utf-8')
+    return password
+
+
+def _hash(password, rounds, prefix, handle_long):
+    salt = _bcrypt.gensalt(rounds=rounds, prefix=prefix)
+    return _bcrypt.hashpw(_prepare(password, handle_long), salt).decode('utf-8')
+
+
+def _hash_with(item):
+    password, settings = item
+    return _hash(password, *settings)
+
+
+def _verify(pw_hash, password, handle_long):
+    return _bcrypt.checkpw(_prepare(password, handle_long), pw_hash.encode('utf-8'))
+
+
+class PasswordHasher:
+    """
+    Runs bcrypt hashing and verification in a process pool so slow hashes
+    do not hold request threads or the GIL. At most `max_pending` calls may
+    be queued or running; past that `HasherBusy` is raised immediately so
+    the API can answer 503 instead of piling up requests.
+
+    Configured from the app (`PASSWORD_HASH_WORKERS`, `PASSWORD_HASH_MAX_PENDING`,
+    `PASSWORD_HASH_TIMEOUT` and flask_bcrypt's `BCRYPT_*` settings).
+    With zero workers hashing runs inline in the calling thread.
+    """
+
+    def __init__(self, app=None):
+        self.workers = 0
+        self.max_pending = 1
+        self.timeout = None
+        self.rounds = 12
+        self.prefix = b'2b'
+        self.handle_long = False
+        self._executor = None
+        self._executor_lock = threading.Lock()
+        self._slots = threading.BoundedSemaphore(1)
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        config = app.config
+        workers = config.get('PASSWORD_HASH_WORKERS')
+        self.workers = (os.cpu_count() or 1) if workers is None else workers
+        self.max_pending = config.get('PASSWORD_HASH_MAX_PENDING') or max(self.workers, 1) * 4
+        self.timeout = config.get('PASSWORD_HASH_TIMEOUT')
+        self.rounds = config.get('BCRYPT_LOG_ROUNDS', 12)
+        self.prefix = config.get('BCRYPT_HASH_PREFIX', '2b').encode('utf-8')
+        self.handle_long = config.get('BCRYPT_HANDLE_LONG_PASSWORDS', False)
+        self._slots = threading.BoundedSemaphore(self.max_pending)
+        self.shutdown()
+        app.extensions['password_hasher'] = self
+
+    def _pool(self):
+        with self._executor_lock:
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(max_workers=self.workers)
+            return self._executor
+
+    def _run(self, operation, func, *args):
+        slots = self._slots
+        if not slots.acquire(blocking=False):
+            raise HasherBusy("Password hashing queue is full")
+        start = time.perf_counter()
+        try:
+            if not self.workers:
+                try:
+                    return func(*args)
+                finally:
+                    slots.release()
+            try:
+                future = self._pool().submit(func, *args)
+            except BaseException:
+                slots.release()
+                raise
+            # The slot stays taken until the worker is done with the hash,
+            # not just until this caller stops waiting for it
+            future.add_done_callback(lambda _: slots.release())
+            try:
+                return future.result(timeout=self.timeout)
+            except FuturesTimeout:
+                future.cancel()
+                raise HasherBusy("Password hashing timed out")
+        finally:
+            password_hash_time.observe(time.perf_counter() - start, (operation,))
+
+    def hash(self, password):
+        """Return the bcrypt hash of `password` as a str."""
+        if not password:
+            raise ValueError("Password must be non-empty")
+        return self._run('hash', _hash, password, self.rounds, self.prefix, self.handle_long)
+
+    def verify(self, pw_hash, password):
+        """Check `password` against a stored bcrypt hash."""
+        if not pw_hash or not password:
+            return False
+        return self._run('verify', _verify, pw_hash, password, self.handle_long)
+
+    def hash_many(self, passwords):
+        """
+        Hash a batch (e.g. a bulk import chunk) across every worker.
+        Not subject to the queue limit: callers are admin tools, not requests.
+        """
+        if any(not p for p in passwords):
+            raise ValueError("Password must be non-empty")
+        settings = (self.rounds, self.prefix, self.handle_long)
+        start = time.perf_counter()
+        try:
+            if not self.workers or not passwords:
+                return [_hash(p, *settings) for p in passwords]
+            return list(self._pool().map(_hash_with, [(p, settings) for p in passwords], chunksize=16))
+        finally:
+            password_hash_time.observe(time.perf_counter() - start, ('hash_many',))
+
+    def shutdown(self):
+        with self._executor_lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=False, cancel_futures=True)
+                self._executor = None
@@ -0,0 +1,112 @@
+"""
+Columnar side-store for the numeric attributes of in-memory objects.
+
+A `ColumnStore` keeps one flat array('d') per attribute (8 bytes a value,
+NaN for None) next to the id of each row. Range filters are evaluated over
+whole columns at once, vectorized with NumPy when it is installed and with
+C-level `map`/`compress` loops otherwise, and sorting reads the same
+arrays, so a query only touches the objects on the page it returns.
+
+Rows are dense: removing an object moves the last row into its slot.
+"""
+import operator
+import threading
+from array import array
+from itertools import compress, repeat
+
+try:
+    import numpy as np
+except ImportError:  # the array-scanning fallback below is used
+    np = None
+
+RANGE_OPERATORS = ('<', '<=', '>', '>=')
+_COMPARISONS = {'<': operator.lt, '<=': operator.le, '>': operator.gt, '>=': operator.ge}
+
+
+def _float(value):
+    return float('nan') if value is None else float(value)
+
+
+class ColumnStore:
+    """Float columns `names` for a set of objects, addressed by object id."""
+
+    def __init__(self, names):
+        self.names = tuple(names)
+        self._columns = {name: array('d') for name in self.names}
+        self._ids = []      # row number -> obj_id
+        self._rows = {}     # obj_id -> row number
+        # NumPy views sharing each column's memory, so queries copy nothing.
+        # An array exporting its buffer cannot grow or shrink, so the views
+        # are dropped before every resize (under the lock queries hold)
+        self._views = {}
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._ids)
+
+    def set(self, obj_id, values):
+        """Insert or overwrite the row of `obj_id` from {name: value}."""
+        values = [_float(values[name]) for name in self.names]
+        with self._lock:
+            row = self._rows.get(obj_id)
+            if row is None:
+                self._views.clear()
+                self._rows[obj_id] = len(self._ids)
+                self._ids.append(obj_id)
+                for name, value in zip(self.names, values):
+                    self._columns[name].append(value)
+            else:
+                # Written in place: the views see the new values, and the
+                # lock keeps a query from reading a half-updated row
+                for name, value in zip(self.names, values):
+                    self._columns[name][row] = value
+
+    def remove(self, obj_id):
+        with self._lock:
+            row = self._rows.pop(obj_id, None)
+            if row is None:
+                return
+            self._views.clear()
+            last = len(self._ids) - 1
+            if row != last:
+                moved = self._ids[last]
+                self._ids[row] = moved
+                self._rows[moved] = row
+                for column in self._columns.values():
+                    column[row] = column[last]
+            self._ids.pop()
+            for column in self._columns.values():
+                column.pop()
+
+    def _view(self, name):
+        view = self._views.get(name)
+        if view is None:
+            view = self._views[name] = np.frombuffer(self._columns[name], dtype=np.float64)
+        return view
+
+    def select(self, filters):
+        """
+        Ids of the rows satisfying every range filter (attr, op, value); a
+        NaN (None) value satisfies none, as NULL does in SQL.
+        """
+        with self._lock:
+            if np is not None and self._ids:
+                mask = np.ones(len(self._ids), dtype=bool)
+                for f in filters:
+                    mask &= _COMPARISONS[f.op](self._view(f.attr), f.value)
+                return {self._ids[row] for row in np.flatnonzero(mask).tolist()}
+
+            mask = None
+            for f in filters:
+                hits = map(_COMPARISONS[f.op], self._columns[f.attr], repeat(f.value))
+                mask = hits if mask is None else map(operator.and_, mask, hits)
+            return set(compress(self._ids, mask)) if mask is not None else set(self._ids)
+
+    def keys(self, name, ids=None):
+        """(value, id) pairs for `ids` (default: every row), unordered."""
+        with self._lock:
+            column = self._columns[name]
+            if ids is None:
+                return list(zip(column, self._ids))
+            rows = self._rows
+            return [(column[rows[obj_id]], obj_id) for obj_id in ids]
@@ -0,0 +1,158 @@
+import threading
+import time
+from sqlalchemy import event
+from sqlalchemy.engine import make_url
+from sqlalchemy.pool import QueuePool
+
+# Upper bounds (seconds) of the pool checkout wait histogram
+WAIT_BUCKETS = (0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0)
+
+
+class PoolStats:
+    """How long checkouts waited for a pooled connection, process-wide."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.checkouts = 0
+            self.wait_total = 0.0
+            self.wait_max = 0.0
+            self.buckets = [0] * len(WAIT_BUCKETS)
+
+    def observe(self, seconds):
+        with self._lock:
+            self.checkouts += 1
+            self.wait_total += seconds
+            self.wait_max = max(self.wait_max, seconds)
+            for i, bound in enumerate(WAIT_BUCKETS):
+                if seconds <= bound:
+                    self.buckets[i] += 1
+
+    def to_dict(self):
+        with self._lock:
+            return {
+                'checkouts': self.checkouts,
+                'wait_seconds_total': round(self.wait_total, 6),
+                'wait_seconds_max': round(self.wait_max, 6),
+                'wait_seconds_avg': round(self.wait_total / self.checkouts, 6) if self.checkouts else 0.0,
+                # Cumulative, like a Prometheus histogram
+                'wait_buckets': {str(bound): count for bound, count in zip(WAIT_BUCKETS, self.buckets)}
+            }
+
+
+pool_stats = PoolStats()
+
+
+class TimedQueuePool(QueuePool):
+    """QueuePool that records how long each checkout waited in `pool_stats`."""
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            pool_stats.observe(time.perf_counter() - start)
+
+
+def _is_memory_sqlite(url):
+    return url.get_backend_name() == 'sqlite' and url.database in (None, '', ':memory:')
+
+
+def engine_options(config):
+    """
+    Build SQLALCHEMY_ENGINE_OPTIONS from the DB_* settings; explicit
+    SQLALCHEMY_ENGINE_OPTIONS entries win. In-memory SQLite keeps
+    Flask-SQLAlchemy's single shared connection.
+    """
+    options = {'pool_pre_ping': config.get('DB_POOL_PRE_PING', True)}
+    uri = config.get('SQLALCHEMY_DATABASE_URI')
+    if uri and not _is_memory_sqlite(make_url(uri)):
+        options.update(
+            poolclass=TimedQueuePool,
+            pool_size=config.get('DB_POOL_SIZE', 5),
+            max_overflow=config.get('DB_MAX_OVERFLOW', 10),
+            pool_timeout=config.get('DB_POOL_TIMEOUT', 30),
+            pool_recycle=config.get('DB_POOL_RECYCLE', 1800),
+        )
+    options.update(config.get('SQLALCHEMY_ENGINE_OPTIONS') or {})
+    return options
+
+
+def _sqlite_session_setup(pragmas, timeout_ms):
+    def on_connect(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        for name, value in pragmas.items():
+            cursor.execute(f"PRAGMA {name} = {value}")
+        cursor.close()
+        if timeout_ms:
+            # SQLite has no statement timeout: a progress handler, called
+            # every few thousand VM steps, interrupts past the deadline.
+            info = connection_record.info
+
+            def past_deadline():
+                deadline = info.get('statement_deadline')
+                return deadline is not None and time.monotonic() > deadline
+
+            dbapi_connection.set_progress_handler(past_deadline, 10000)
+    return on_connect
+
+
+def _server_session_setup(statement, timeout_ms):
+    def on_connect(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        cursor.execute(statement.format(timeout_ms=int(timeout_ms)))
+        cursor.close()
+    return on_connect
+
+
+_TIMEOUT_STATEMENTS = {
+    'mysql': "SET SESSION max_execution_time = {timeout_ms}",
+    'postgresql': "SET statement_timeout = {timeout_ms}",
+}
+
+
+def configure_engine(engine, config):
+    """
+    Attach the per-connection setup to `engine`: SQLite pragmas (WAL,
+    synchronous, busy_timeout) and the DB_STATEMENT_TIMEOUT_MS limit.
+    """
+    timeout_ms = config.get('DB_STATEMENT_TIMEOUT_MS')
+    backend = engine.dialect.name
+    if backend == 'sqlite':
+        pragmas = dict(config.get('SQLITE_PRAGMAS') or {})
+        if _is_memory_sqlite(engine.url):
+            pragmas.pop('journal_mode', None)  # WAL needs a file
+        event.listen(engine, 'connect', _sqlite_session_setup(pragmas, timeout_ms))
+        if timeout_ms:
+            @event.listens_for(engine, 'before_cursor_execute')
+            def start_deadline(conn, cursor, statement, parameters, context, executemany):
+                conn.info['statement_deadline'] = time.monotonic() + timeout_ms / 1000
+
+            @event.listens_for(engine, 'after_cursor_execute')
+            def clear_deadline(conn, cursor, statement, parameters, context, executemany):
+                conn.info.pop('statement_deadline', None)
+
+            @event.listens_for(engine, 'handle_error')
+            def clear_deadline_on_error(context):
+                if context.connection is not None:
+                    context.connection.info.pop('statement_deadline', None)
+    elif timeout_ms and backend in _TIMEOUT_STATEMENTS:
+        event.listen(engine, 'connect', _server_session_setup(_TIMEOUT_STATEMENTS[backend], timeout_ms))
+
+
+def pool_status(engine):
+    """Current occupancy of `engine`'s pool plus the checkout wait stats."""
+    pool = engine.pool
+    status = {'pool': type(pool).__name__}
+    if isinstance(pool, QueuePool):
+        status.update(
+            size=pool.size(),
+            checked_out=pool.checkedout(),
+            overflow=max(pool.overflow(), 0),
+            idle=pool.checkedin()
+        )
+    status.update(pool_stats.to_dict())
+    return status
@@ -0,0 +1,198 @@
+import math
+from collections import defaultdict
+
+EARTH_RADIUS_KM = 6371.0088
+KM_PER_DEGREE = 111.32
+GEOHASH_PRECISION = 12
+
+_BASE32 = '0123456789bcdefghjkmnpqrstuvwxyz'
+
+
+def validate_point(latitude, longitude):
+    if not -90.0 <= latitude <= 90.0:
+        raise ValueError("Latitude must be between -90 and 90")
+    if not -180.0 <= longitude <= 180.0:
+        raise ValueError("Longitude must be between -180 and 180")
+
+
+def encode(latitude, longitude, precision=GEOHASH_PRECISION):
+    """Return the geohash of a point, `precision` characters long."""
+    lat_lo, lat_hi = -90.0, 90.0
+    lon_lo, lon_hi = -180.0, 180.0
+    chars, bits, bit_count, even = [], 0, 0, True
+    while len(chars) < precision:
+        if even:
+            mid = (lon_lo + lon_hi) / 2
+            if longitude >= mid:
+                bits, lon_lo = bits * 2 + 1, mid
+            else:
+                bits, lon_hi = bits * 2, mid
+        else:
+            mid = (lat_lo + lat_hi) / 2
+            if latitude >= mid:
+                bits, lat_lo = bits * 2 + 1, mid
+            else:
+                bits, lat_hi = bits * 2, mid
+        even = not even
+        bit_count += 1
+        if bit_count == 5:
+            chars.append(_BASE32[bits])
+            bits = bit_count = 0
+    return ''.join(chars)
+
+
+def haversine_km(lat1, lon1, lat2, lon2):
+    """Great-circle distance between two points, in kilometres."""
+    phi1, phi2 = math.radians(lat1), math.radians(lat2)
+    d_phi = phi2 - phi1
+    d_lambda = math.radians(lon2 - lon1)
+    a = (math.sin(d_phi / 2) ** 2
+         + math.cos(phi1) * math.cos(phi2) * math.sin(d_lambda / 2) ** 2)
+    return 2 * EARTH_RADIUS_KM * math.asin(min(1.0, math.sqrt(a)))
+
+
+def bounding_box(latitude, longitude, radius_km):
+    """
+    Return the (min_lat, min_lon, max_lat, max_lon) box enclosing a circle.
+    min_lon > max_lon means the box wraps across the antimeridian.
+    """
+    if radius_km <= 0:
+        raise ValueError("Radius must be positive")
+    d_lat = radius_km / KM_PER_DEGREE
+    min_lat, max_lat = latitude - d_lat, latitude + d_lat
+    if min_lat <= -90.0 or max_lat >= 90.0:
+        # The circle covers a pole: every longitude is in range
+        return max(min_lat, -90.0), -180.0, min(max_lat, 90.0), 180.0
+
+    d_lon = radius_km / (KM_PER_DEGREE * math.cos(math.radians(latitude)))
+    if d_lon >= 180.0:
+        return min_lat, -180.0, max_lat, 180.0
+    min_lon, max_lon = longitude - d_lon, longitude + d_lon
+    if min_lon < -180.0:
+        min_lon += 360.0
+    if max_lon > 180.0:
+        max_lon -= 360.0
+    return min_lat, min_lon, max_lat, max_lon
+
+
+def longitude_spans(box):
+    """Split a box's longitude range into non-wrapping (lo, hi) spans."""
+    _, min_lon, _, max_lon = box
+    if min_lon <= max_lon:
+        return [(min_lon, max_lon)]
+    return [(min_lon, 180.0), (-180.0, max_lon)]
+
+
+def box_contains(box, latitude, longitude):
+    min_lat, _, max_lat, _ = box
+    if not min_lat <= latitude <= max_lat:
+        return False
+    return any(lo <= longitude <= hi for lo, hi in longitude_spans(box))
+
+
+def _cell_size(precision):
+    """(lat_step, lon_step) in degrees of a geohash cell."""
+    bits = 5 * precision
+    return 180.0 / 2 ** (bits // 2), 360.0 / 2 ** ((bits + 1) // 2)
+
+
+def _cell_range(lo, hi, origin, step, count):
+    first = min(int((lo - origin) // step), count - 1)
+    last = min(int((hi - origin) // step), count - 1)
+    return range(first, last + 1)
+
+
+def cover(box, max_cells=16):
+    """
+    Return the geohash prefixes of the finest grid that covers `box` in at
+    most `max_cells` cells. Every point inside the box has a geohash
+    starting with one of them; [''] means the box is too large to narrow.
+    """
+    min_lat, _, max_lat, _ = box
+    for precision in range(GEOHASH_PRECISION, 0, -1):
+        lat_step, lon_step = _cell_size(precision)
+        rows = _cell_range(min_lat, max_lat, -90.0, lat_step, round(180.0 / lat_step))
+        cols = [
+            col
+            for lo, hi in longitude_spans(box)
+            for col in _cell_range(lo, hi, -180.0, lon_step, round(360.0 / lon_step))
+        ]
+        if len(rows) * len(cols) > max_cells:
+            continue
+        return sorted({
+            encode(-90.0 + (row + 0.5) * lat_step,
+                   -180.0 + (col + 0.5) * lon_step,
+                   precision)
+            for row in rows
+            for col in cols
+        })
+    return ['']
+
+
+class GridIndex:
+    """
+    Uniform lat/lon grid of object ids for the in-memory backend.
+    Box queries only visit the cells overlapping the box.
+    """
+
+    def __init__(self, cell_degrees=0.25):
+        self.cell_degrees = cell_degrees
+        self._cells = defaultdict(set)
+        self._points = {}
+
+    def _cell(self, latitude, longitude):
+        return (int((latitude + 90.0) // self.cell_degrees),
+                int((longitude + 180.0) // self.cell_degrees))
+
+    def __len__(self):
+        return len(self._points)
+
+    def insert(self, obj_id, latitude, longitude):
+        if self._points.get(obj_id) == (latitude, longitude):
+            return
+        self.remove(obj_id)
+        self._points[obj_id] = (latitude, longitude)
+        self._cells[self._cell(latitude, longitude)].add(obj_id)
+
+    def remove(self, obj_id):
+        point = self._points.pop(obj_id, None)
+        if point is None:
+            return
+        cell = self._cell(*point)
+        self._cells[cell].discard(obj_id)
+        if not self._cells[cell]:
+            del self._cells[cell]
+
+    def query(self, box):
+        """Return [(id, lat, lon)] of every point inside `box`."""
+        min_lat, _, max_lat, _ = box
+        lat_lo, _ = self._cell(min_lat, 0.0)
+        lat_hi, _ = self._cell(max_lat, 0.0)
+        col_ranges = []
+        for lo, hi in longitude_spans(box):
+            col_ranges.append(range(self._cell(0.0, lo)[1], self._cell(0.0, hi)[1] + 1))
+        cell_count = (lat_hi - lat_lo + 1) * sum(len(cols) for cols in col_ranges)
+
+        if cell_count > len(self._cells):
+            # Sparser to walk the occupied cells than the box's cells
+            candidates = (
+                obj_id
+                for (row, col), ids in self._cells.items()
+                if lat_lo <= row <= lat_hi and any(col in cols for cols in col_ranges)
+                for obj_id in ids
+            )
+        else:
+            candidates = (
+                obj_id
+                for row in range(lat_lo, lat_hi + 1)
+                for cols in col_ranges
+                for col in cols
+                for obj_id in self._cells.get((row, col), ())
+            )
+
+        hits = []
+        for obj_id in candidates:
+            latitude, longitude = self._points[obj_id]
+            if box_contains(box, latitude, longitude):
+                hits.append((obj_id, latitude, longitude))
+        return hits
@@ -0,0 +1,212 @@
+"""
+Versioned schema migrations for the part3 models.
+
+Each migration is a function of a Core connection registered with
+`@migration(version, name)`. `upgrade()` runs the pending ones in version
+order, each in its own transaction, and records it in `schema_migrations`.
+Migrations only add what is missing, so they are safe on databases first
+built with `db.create_all()`.
+"""
+from datetime import datetime
+from sqlalchemy import (
+    Boolean, Column, DateTime, Float, ForeignKey, Integer, MetaData, String, Table,
+    Text, inspect, select, text
+)
+from sqlalchemy.exc import SQLAlchemyError
+from app.extensions import db
+from app.persistence import geo
+
+MIGRATIONS = []
+
+_version_table = Table(
+    'schema_migrations', MetaData(),
+    Column('version', Integer, primary_key=True),
+    Column('name', String(100), nullable=False),
+    Column('applied_at', DateTime, nullable=False)
+)
+
+
+def migration(version, name):
+    def register(func):
+        MIGRATIONS.append((version, name, func))
+        MIGRATIONS.sort(key=lambda entry: entry[0])
+        return func
+    return register
+
+
+def _columns(connection, table):
+    return {column['name'] for column in inspect(connection).get_columns(table)}
+
+
+def _add_column(connection, table, name, ddl):
+    if name not in _columns(connection, table):
+        connection.execute(text(f"ALTER TABLE {table} ADD COLUMN {name} {ddl}"))
+
+
+def _create_indexes(connection, *names):
+    """Create the model-declared indexes called `names` that don't exist yet."""
+    for table in db.metadata.sorted_tables:
+        for index in table.indexes:
+            if index.name in names:
+                index.create(connection, checkfirst=True)
+
+
+@migration(1, 'Initial schema')
+def _initial_schema(connection):
+    # The tables as first shipped; later migrations evolve them
+    metadata = MetaData()
+
+    def timestamps():
+        return [
+            Column('id', String(36), primary_key=True),
+            Column('created_at', DateTime, nullable=False),
+            Column('updated_at', DateTime, nullable=False),
+        ]
+
+    Table('users', metadata, *timestamps(),
+          Column('first_name', String(50), nullable=False),
+          Column('last_name', String(50), nullable=False),
+          Column('email', String(128), nullable=False, unique=True),
+          Column('password', String(128), nullable=True),
+          Column('is_admin', Boolean, nullable=False))
+    Table('amenities', metadata, *timestamps(),
+          Column('name', String(50), nullable=False))
+    Table('places', metadata, *timestamps(),
+          Column('title', String(100), nullable=False),
+          Column('description', Text),
+          Column('price', Float, nullable=False),
+          Column('latitude', Float, nullable=False),
+          Column('longitude', Float, nullable=False),
+          Column('user_id', String(36), ForeignKey('users.id'), nullable=False))
+    Table('reviews', metadata, *timestamps(),
+          Column('rating', Integer, nullable=False),
+          Column('comment', Text, nullable=True),
+          Column('user_id', String(36), ForeignKey('users.id'), nullable=False),
+          Column('place_id', String(36), ForeignKey('places.id'), nullable=False))
+    Table('place_amenity', metadata,
+          Column('place_id', String(36), ForeignKey('places.id'), primary_key=True),
+          Column('amenity_id', String(36), ForeignKey('amenities.id'), primary_key=True))
+    metadata.create_all(connection, checkfirst=True)
+
+
+@migration(2, 'Index foreign keys and pagination keys')
+def _foreign_key_indexes(connection):
+    _create_indexes(
+        connection,
+        'ix_users_created_at', 'ix_users_updated_at',
+        'ix_amenities_created_at', 'ix_amenities_updated_at',
+        'ix_places_created_at', 'ix_places_updated_at', 'ix_places_user_id', 'ix_places_price',
+        'ix_reviews_created_at', 'ix_reviews_updated_at', 'ix_reviews_user_id',
+        'ix_reviews_place_created',
+        'ix_place_amenity_amenity',
+    )
+
+
+@migration(3, 'Rating aggregates and geohash on places')
+def _place_aggregates(connection):
+    _add_column(connection, 'places', 'geohash', f'VARCHAR({geo.GEOHASH_PRECISION})')
+    for name in ['review_count', 'rating_sum'] + [f'rating_{r}' for r in range(1, 6)]:
+        _add_column(connection, 'places', name, 'INTEGER NOT NULL DEFAULT 0')
+
+    # Backfill from the reviews, one correlated statement over ix_reviews_place_created
+    counts = {
+        'review_count': "SELECT COUNT(*) FROM reviews WHERE reviews.place_id = places.id",
+        'rating_sum': "SELECT COALESCE(SUM(rating), 0) FROM reviews WHERE reviews.place_id = places.id",
+    }
+    for rating in range(1, 6):
+        counts[f'rating_{rating}'] = (
+            "SELECT COUNT(*) FROM reviews "
+            f"WHERE reviews.place_id = places.id AND reviews.rating = {rating}"
+        )
+    assignments = ', '.join(f"{column} = ({query})" for column, query in counts.items())
+    connection.execute(text(f"UPDATE places SET {assignments}"))
+
+    rows = connection.execute(text(
+        "SELECT id, latitude, longitude FROM places WHERE geohash IS NULL"
+    )).all()
+    if rows:
+        connection.execute(
+            text("UPDATE places SET geohash = :geohash WHERE id = :place_id"),
+            [{'place_id': place_id, 'geohash': geo.encode(lat, lon)} for place_id, lat, lon in rows]
+        )
+    _create_indexes(connection, 'ix_places_geohash_coords')
+
+
+@migration(4, 'Full-text search index for places')
+def _search_index(connection):
+    from app.services.repositories.place_repository import SEARCH_INDEX_DDL
+    if connection.dialect.name != 'sqlite':
+        return
+    for statement in SEARCH_INDEX_DDL:
+        connection.execute(text(statement))
+    connection.execute(text("INSERT INTO places_fts(places_fts) VALUES ('rebuild')"))
+
+
+def applied_versions(connection):
+    if not inspect(connection).has_table('schema_migrations'):
+        return set()
+    return set(connection.scalars(select(_version_table.c.version)))
+
+
+def pending_migrations(connection):
+    applied = applied_versions(connection)
+    return [(version, name) for version, name, _ in MIGRATIONS if version not in applied]
+
+
+def upgrade(target=None):
+    """Apply every pending migration up to `target`; returns the (version, name) applied."""
+    with db.engine.begin() as connection:
+        _version_table.create(connection, checkfirst=True)
+        applied = applied_versions(connection)
+    done = []
+    for version, name, func in MIGRATIONS:
+        if version in applied or (target is not None and version > target):
+            continue
+        with db.engine.begin() as connection:
+            func(connection)
+            connection.execute(_version_table.insert().values(
+                version=version, name=name, applied_at=datetime.utcnow()
+            ))
+        done.append((version, name))
+    return done
+
+
+def missing_indexes(connection):
+    """
+    [(table, index name)] declared on the models but absent from existing
+    tables. Missing tables are the business of the pending migrations.
+    """
+    inspector = inspect(connection)
+    tables = set(inspector.get_table_names())
+    missing = []
+    for table in db.metadata.sorted_tables:
+        if table.name not in tables:
+            continue
+        live = {index['name'] for index in inspector.get_indexes(table.name)}
+        missing.extend(
+            (table.name, index.name) for index in table.indexes if index.name not in live
+        )
+    return missing
+
+
+def check_schema(logger):
+    """
+    Warn about pending migrations and missing indexes. Never raises: an
+    unreachable database is reported and left to fail on first use.
+    Returns the missing [(table, index name)].
+    """
+    try:
+        with db.engine.connect() as connection:
+            pending = pending_migrations(connection)
+            missing = missing_indexes(connection)
+    except SQLAlchemyError as e:
+        logger.warning("Schema check skipped, database unavailable: %s", e)
+        return []
+    if pending:
+        logger.warning(
+            "%d schema migration(s) pending (%s); run `flask --app run db-upgrade`",
+            len(pending), ', '.join(name for _, name in pending)
+        )
+    for table, name in missing:
+        logger.warning("Index %s on %s is missing; queries on it will scan the table", name, table)
+    return missing
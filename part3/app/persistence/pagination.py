@@ -0,0 +1,50 @@
+import base64
+import binascii
+import json
+from datetime import datetime
+
+
+class Page:
+    """One slice of a listing plus the cursor pointing at the next slice."""
+
+    def __init__(self, items, next_cursor=None):
+        self.items = items
+        self.next_cursor = next_cursor
+
+    def __iter__(self):
+        return iter(self.items)
+
+    def __len__(self):
+        return len(self.items)
+
+
+def _encode_value(value):
+    if isinstance(value, datetime):
+        return {'dt': value.isoformat()}
+    return value
+
+
+def _decode_value(value):
+    if isinstance(value, dict):
+        return datetime.fromisoformat(value['dt'])
+    return value
+
+
+def encode_cursor(obj, query):
+    """Build an opaque cursor from the sort key of `obj` under `query`."""
+    values = [_encode_value(getattr(obj, column)) for column in query.sort_columns]
+    raw = json.dumps([query.signature] + values, separators=(',', ':'))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+
+def decode_cursor(cursor, query):
+    """Return the sort key stored in `cursor` as a tuple."""
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        raw = json.loads(base64.urlsafe_b64decode(padded.encode()).decode())
+        if (not isinstance(raw, list) or len(raw) != len(query.sort_columns) + 1
+                or raw[0] != query.signature):
+            raise ValueError
+        return tuple(_decode_value(value) for value in raw[1:])
+    except (ValueError, KeyError, TypeError, binascii.Error, UnicodeDecodeError):
+        raise ValueError("Invalid pagination cursor")
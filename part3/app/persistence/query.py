@@ -0,0 +1,66 @@
+from collections import namedtuple
+
+OPERATORS = ('==', '!=', '<', '<=', '>', '>=', 'in', 'all')
+
+Filter = namedtuple('Filter', 'attr op value')
+
+
+class Query:
+    """
+    Backend-agnostic description of a page of objects: predicates that must
+    all hold, a sort order, and the window (limit plus `after` cursor or
+    `offset`). Repositories translate it in `find`, so filtering, sorting and
+    limiting happen in the storage layer rather than over `get_all()`.
+
+    Operators: ==, !=, <, <=, >, >= compare an attribute with a value; `in`
+    tests membership in a collection of values; `all` holds when a
+    to-many relationship contains every id in the value.
+    Sort attributes are names, '-' prefixed for descending; `id` is always
+    appended as the tie-breaker, and sort attributes must be non-null.
+    """
+
+    def __init__(self, order_by=('created_at',), limit=None, after=None, offset=None):
+        self.filters = []
+        self.order_by = []
+        for name in order_by:
+            descending = name.startswith('-')
+            self.order_by.append((name.lstrip('-'), descending))
+        if not any(name == 'id' for name, _ in self.order_by):
+            # Same direction as the last column, so the whole key is one
+            # row-value comparison the database can seek an index with
+            self.order_by.append(('id', self.order_by[-1][1] if self.order_by else False))
+        self.limit = limit
+        self.after = after
+        self.offset = offset
+
+    def where(self, attr, op, value):
+        """Add a predicate; returns the query so calls can be chained."""
+        if op not in OPERATORS:
+            raise ValueError(f"Unsupported filter operator '{op}'")
+        self.filters.append(Filter(attr, op, value))
+        return self
+
+    @property
+    def sort_columns(self):
+        return [name for name, _ in self.order_by]
+
+    @property
+    def signature(self):
+        """Identifies the sort order, so a cursor can't be replayed under another."""
+        return ','.join(('-' if descending else '') + name for name, descending in self.order_by)
+
+
+class Projection:
+    """
+    The part of a model a caller will read, passed to a repository as its
+    loading `profile`: column attributes, plus {relationship: columns of the
+    related rows} for the relationships to load eagerly. Every other column
+    is deferred and unlisted relationships are not queried at all.
+    """
+
+    def __init__(self, columns=(), relationships=None):
+        self.columns = tuple(columns)
+        self.relationships = dict(relationships or {})
+
+    def __repr__(self):
+        return f"Projection({self.columns!r}, {self.relationships!r})"
@@ -0,0 +1,147 @@
+"""
+Statement recording for debugging and tests.
+
+`record_statements()` captures every statement an engine runs inside a
+`with` block; `query_budget(n)` additionally fails when the block issues
+more than `n` statements or repeats one statement with different
+parameters (the signature of an N+1 loop). With `QUERY_AUDIT` enabled,
+`init_app` does the same for every request and checks the per-endpoint
+limits in `QUERY_BUDGETS`.
+"""
+import threading
+from contextlib import contextmanager
+
+from flask import current_app, request
+from sqlalchemy import event
+
+# Executions of one statement (with differing parameters) that count as N+1
+REPEAT_THRESHOLD = 3
+
+
+class QueryBudgetExceeded(AssertionError):
+    """A request or block issued more statements than allowed, or an N+1 loop."""
+
+
+class StatementLog:
+    """The (sql, parameters) pairs executed while recording, in order."""
+
+    def __init__(self):
+        self.statements = []
+
+    def __len__(self):
+        return len(self.statements)
+
+    def record(self, statement, parameters):
+        self.statements.append((statement, parameters))
+
+    def repeated(self, threshold=REPEAT_THRESHOLD):
+        """
+        [(sql, executions)] of the statements run at least `threshold` times
+        with at least two distinct parameter sets, most executions first.
+        """
+        executions = {}
+        for statement, parameters in self.statements:
+            executions.setdefault(statement, []).append(repr(parameters))
+        repeats = [
+            (statement, len(params)) for statement, params in executions.items()
+            if len(params) >= threshold and len(set(params)) > 1
+        ]
+        return sorted(repeats, key=lambda item: -item[1])
+
+    def report(self, threshold=REPEAT_THRESHOLD):
+        lines = [f"{len(self)} statement(s)"]
+        for statement, count in self.repeated(threshold):
+            lines.append(f"  repeated {count}x: {' '.join(statement.split())[:200]}")
+        return '\n'.join(lines)
+
+
+def _engine(engine):
+    if engine is None:
+        from app.extensions import db
+        engine = db.engine
+    return engine
+
+
+@contextmanager
+def record_statements(engine=None):
+    """Yield a StatementLog of everything `engine` (default: db.engine) runs in the block."""
+    engine = _engine(engine)
+    log = StatementLog()
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        log.record(statement, parameters)
+
+    event.listen(engine, 'before_cursor_execute', before_cursor_execute)
+    try:
+        yield log
+    finally:
+        event.remove(engine, 'before_cursor_execute', before_cursor_execute)
+
+
+@contextmanager
+def query_budget(max_statements, engine=None, allow_repeats=False, threshold=REPEAT_THRESHOLD):
+    """
+    Fail with QueryBudgetExceeded when the block issues more than
+    `max_statements` statements or, unless `allow_repeats`, an N+1 loop.
+    """
+    with record_statements(engine) as log:
+        yield log
+    problems = []
+    if len(log) > max_statements:
+        problems.append(f"budget is {max_statements}")
+    if not allow_repeats and log.repeated(threshold):
+        problems.append("N+1 pattern")
+    if problems:
+        raise QueryBudgetExceeded(f"{', '.join(problems)}: {log.report(threshold)}")
+
+
+# The StatementLog of the request this thread is serving
+_current = threading.local()
+
+
+def _record(conn, cursor, statement, parameters, context, executemany):
+    log = getattr(_current, 'log', None)
+    if log is not None:
+        log.record(statement, parameters)
+
+
+def _start_request():
+    _current.log = StatementLog()
+
+
+def _check_request(response):
+    # Statements of a streamed body run after this and are not audited
+    log = getattr(_current, 'log', None)
+    _current.log = None
+    if log is None:
+        return response
+    config = current_app.config
+    threshold = config.get('QUERY_REPEAT_THRESHOLD', REPEAT_THRESHOLD)
+    endpoint = request.endpoint or 'unmatched'
+    response.headers['X-Query-Count'] = str(len(log))
+
+    problems = []
+    repeats = log.repeated(threshold)
+    if repeats:
+        response.headers['X-Query-Repeats'] = str(len(repeats))
+        problems.append("N+1 pattern")
+    budget = (config.get('QUERY_BUDGETS') or {}).get(f"{request.method} {endpoint}")
+    if budget is not None and len(log) > budget:
+        problems.append(f"budget is {budget}")
+    if problems:
+        message = f"{request.method} {endpoint}: {', '.join(problems)}: {log.report(threshold)}"
+        if config.get('QUERY_BUDGET_STRICT'):
+            raise QueryBudgetExceeded(message)
+        current_app.logger.warning(message)
+    return response
+
+
+def instrument_engine(engine):
+    """Feed the statements `engine` runs into the current request's log."""
+    event.listen(engine, 'before_cursor_execute', _record)
+
+
+def init_app(app):
+    """Record the statements of every request of `app` and check them."""
+    app.before_request(_start_request)
+    app.after_request(_check_request)
@@ -0,0 +1,161 @@
+"""
+Read replicas.
+
+Each URI in SQLALCHEMY_REPLICA_URIS becomes a Flask-SQLAlchemy bind
+('replica0', 'replica1', ...). Repository reads run inside `reading()`,
+and `RoutingSession.get_bind` sends their SELECTs to a replica when it is
+safe to: the request is a GET/HEAD/OPTIONS, the session has not written
+anything and no `transaction()` is open. Everything else, writes and any
+read after a write included, goes to the primary. A request keeps the
+replica it was first given, so its reads see one consistent snapshot.
+
+Replicas are picked round-robin or, with REPLICA_SELECTION =
+'least_busy', by fewest connections in use (ties rotate).
+"""
+import itertools
+import sqlite3
+import threading
+from contextlib import contextmanager
+
+from flask import current_app, has_app_context, has_request_context, request
+from flask_sqlalchemy.session import Session
+from sqlalchemy import event
+from sqlalchemy.engine import make_url
+
+READ_ONLY_METHODS = ('GET', 'HEAD', 'OPTIONS')
+STRATEGIES = ('round_robin', 'least_busy')
+
+
+class ReplicaRouter:
+    """Chooses the replica engine for a request's reads."""
+
+    def __init__(self, engines, strategy='round_robin'):
+        if strategy not in STRATEGIES:
+            raise ValueError(f"REPLICA_SELECTION must be one of {', '.join(STRATEGIES)}")
+        self.engines = list(engines)
+        self.strategy = strategy
+        self._turn = itertools.count()
+        self._busy = {engine: 0 for engine in self.engines}
+        self._lock = threading.Lock()
+        for engine in self.engines:
+            event.listen(engine, 'checkout', self._checked_out(engine))
+            event.listen(engine, 'checkin', self._checked_in(engine))
+
+    def _checked_out(self, engine):
+        def on_checkout(dbapi_connection, connection_record, connection_proxy):
+            with self._lock:
+                self._busy[engine] += 1
+        return on_checkout
+
+    def _checked_in(self, engine):
+        def on_checkin(dbapi_connection, connection_record):
+            with self._lock:
+                self._busy[engine] -= 1
+        return on_checkin
+
+    def pick(self):
+        start = next(self._turn) % len(self.engines)
+        rotated = self.engines[start:] + self.engines[:start]
+        if self.strategy == 'round_robin':
+            return rotated[0]
+        with self._lock:
+            return min(rotated, key=self._busy.__getitem__)
+
+    def busy(self):
+        """{engine url: connections in use}"""
+        with self._lock:
+            return {engine.url.render_as_string(): count for engine, count in self._busy.items()}
+
+
+class RoutingSession(Session):
+    """Flask-SQLAlchemy's session, sending safe reads to a replica."""
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if bind is None and clause is not None and getattr(clause, 'is_select', False):
+            replica = _replica_for(self)
+            if replica is not None:
+                return replica
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+
+@event.listens_for(RoutingSession, 'after_flush')
+def _pin_to_primary(session, flush_context):
+    # Read-your-writes: once this session has written, replicas may lag it
+    session.info['wrote'] = True
+
+
+def _replica_for(session):
+    info = session.info
+    if not info.get('reading') or info.get('wrote') or info.get('transaction_depth'):
+        return None
+    if not has_request_context() or request.method not in READ_ONLY_METHODS:
+        return None
+    router = current_app.extensions.get('replicas')
+    if router is None:
+        return None
+    replica = info.get('replica')
+    if replica is None:
+        replica = info['replica'] = router.pick()
+    return replica
+
+
+@contextmanager
+def reading():
+    """Mark the block's queries as reads a replica may answer."""
+    if not has_app_context():
+        yield
+        return
+    from app.extensions import db
+    info = db.session.info
+    info['reading'] = info.get('reading', 0) + 1
+    try:
+        yield
+    finally:
+        info['reading'] -= 1
+
+
+def replica_binds(config):
+    """SQLALCHEMY_BINDS entries for the configured replicas."""
+    return {f'replica{i}': uri for i, uri in enumerate(config.get('SQLALCHEMY_REPLICA_URIS') or ())}
+
+
+def _query_only(dbapi_connection, connection_record):
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA query_only = ON")
+    cursor.close()
+
+
+def init_app(app, engines):
+    """Route reads of `app` to the replica `engines` (none: everything stays on the primary)."""
+    engines = list(engines)
+    if not engines:
+        return
+    for engine in engines:
+        if engine.dialect.name == 'sqlite':
+            # A stand-in replica must never be written to by mistake
+            event.listen(engine, 'connect', _query_only)
+    app.extensions['replicas'] = ReplicaRouter(engines, app.config.get('REPLICA_SELECTION', 'round_robin'))
+
+
+def sync_sqlite_replicas(primary_uri, replica_uris):
+    """
+    Copy a SQLite primary into SQLite replicas with the online backup API:
+    the local stand-in for replication. Returns the replica paths written.
+    """
+    paths = []
+    for uri in (primary_uri, *replica_uris):
+        url = make_url(uri)
+        if url.get_backend_name() != 'sqlite' or url.database in (None, '', ':memory:'):
+            raise ValueError(f"Only SQLite files can be synced locally, not {uri}")
+        paths.append(url.database)
+    source = sqlite3.connect(paths[0])
+    try:
+        for path in paths[1:]:
+            target = sqlite3.connect(path)
+            try:
+                source.backup(target)
+            finally:
+                target.close()
+    finally:
+        source.close()
+    return paths[1:]
@@ -1,5 +1,42 @@
+import operator
 from abc import ABC, abstractmethod
+from bisect import bisect_left, bisect_right, insort
+from contextlib import contextmanager
+from itertools import islice
+from sqlalchemy import and_, or_, select, tuple_
+from sqlalchemy.orm import joinedload, load_only, selectinload
 from app.extensions import db
+from app.persistence.pagination import Page, decode_cursor, encode_cursor
+from app.persistence.query import Projection, Query
+from app.persistence.replicas import reading
+
+_COMPARISONS = {
+    '==': operator.eq, '!=': operator.ne,
+    '<': operator.lt, '<=': operator.le,
+    '>': operator.gt, '>=': operator.ge,
+}
+
+@contextmanager
+def transaction():
+    """
+    Unit of work for SQLAlchemy repositories: writes made inside the block
+    are only flushed, and a single commit happens when the outermost block
+    exits. Any exception rolls the whole unit back.
+    """
+    session = db.session
+    depth = session.info.get('transaction_depth', 0)
+    session.info['transaction_depth'] = depth + 1
+    try:
+        yield session
+        if depth == 0:
+            session.commit()
+    except Exception:
+        if depth == 0:
+            session.rollback()
+        raise
+    finally:
+        session.info['transaction_depth'] = depth
+
 
 class Repository(ABC):
     @abstractmethod
@@ -7,11 +44,41 @@ class Repository(ABC):
         pass
 
     @abstractmethod
-    def get(self, obj_id):
+    def get(self, obj_id, profile=None):
+        pass
+
+    @abstractmethod
+    def get_many(self, obj_ids, profile=None):
+        """Return the objects with the given ids, in no particular order."""
+        pass
+
+    @abstractmethod
+    def get_all(self, profile=None):
         pass
 
     @abstractmethod
-    def get_all(self):
+    def find(self, query, profile=None):
+        """
+        Return a `Page` of the objects matching `query` (see `Query`).
+
+        `query.after` is a cursor taken from a previous page's
+        `next_cursor`; `query.offset` is only honoured when no cursor is
+        given. `profile` names the relationships to load eagerly (see
+        `SQLAlchemyRepository.load_profiles`) or is a `Projection`.
+        """
+        pass
+
+    def get_page(self, limit=None, after=None, offset=None, profile=None):
+        """Return a `Page` of every object, ordered by (created_at, id)."""
+        return self.find(Query(limit=limit, after=after, offset=offset), profile=profile)
+
+    @abstractmethod
+    def iter_rows(self, columns, since=None, chunk_size=1000):
+        """
+        Yield lists of up to `chunk_size` {column: value} dicts ordered by
+        (updated_at, id), optionally only rows updated at or after `since`.
+        Memory use does not grow with the table size.
+        """
         pass
 
     @abstractmethod
@@ -26,59 +93,394 @@ class Repository(ABC):
     def get_by_attribute(self, attr_name, attr_value):
         pass
 
+    @abstractmethod
+    def get_all_by_attribute(self, attr_name, attr_value):
+        pass
+
 
 class InMemoryRepository(Repository):
     def __init__(self):
         self._storage = {}
+        # (created_at, id) keys kept sorted for keyset pagination
+        self._order = []
+        # Secondary hash indexes: attr_name -> {value: set of ids}
+        self._indexes = {}
+        self._unique = set()
+        # Values each object was indexed under, to unindex after mutation
+        self._indexed_values = {}
+
+    def add_index(self, attr_name, unique=False):
+        """
+        Maintain a hash index on `attr_name` so lookups by that attribute
+        are O(1). A unique index rejects a second object with the same value.
+        """
+        index = {}
+        for obj in self._storage.values():
+            value = getattr(obj, attr_name)
+            if unique and index.get(value):
+                raise ValueError(f"Duplicate value for unique attribute '{attr_name}'")
+            index.setdefault(value, set()).add(obj.id)
+        self._indexes[attr_name] = index
+        if unique:
+            self._unique.add(attr_name)
+        for obj in self._storage.values():
+            self._indexed_values.setdefault(obj.id, {})[attr_name] = getattr(obj, attr_name)
+
+    def _check_unique(self, obj_id, values):
+        for attr_name in self._unique:
+            holders = self._indexes[attr_name].get(values[attr_name], ())
+            if any(holder != obj_id for holder in holders):
+                raise ValueError(f"Duplicate value for unique attribute '{attr_name}'")
+
+    def _unindex(self, obj_id):
+        for attr_name, value in self._indexed_values.pop(obj_id, {}).items():
+            holders = self._indexes[attr_name].get(value)
+            if holders is not None:
+                holders.discard(obj_id)
+                if not holders:
+                    del self._indexes[attr_name][value]
+
+    def _index(self, obj_id, values):
+        for attr_name, value in values.items():
+            self._indexes[attr_name].setdefault(value, set()).add(obj_id)
+        self._indexed_values[obj_id] = values
 
     def add(self, obj):
+        # Also called again after an object was mutated in place,
+        # so the index entries are refreshed rather than appended.
+        values = {attr_name: getattr(obj, attr_name) for attr_name in self._indexes}
+        self._check_unique(obj.id, values)
+        if obj.id not in self._storage:
+            insort(self._order, (obj.created_at, obj.id))
+        self._unindex(obj.id)
         self._storage[obj.id] = obj
+        self._index(obj.id, values)
 
-    def get(self, obj_id):
+    def get(self, obj_id, profile=None):
         return self._storage.get(obj_id)
 
-    def get_all(self):
+    def get_many(self, obj_ids, profile=None):
+        return [self._storage[obj_id] for obj_id in obj_ids if obj_id in self._storage]
+
+    def get_all(self, profile=None):
         return list(self._storage.values())
 
+    def find(self, query, profile=None):
+        ids, filters = self._candidates(query.filters)
+        descending = query.order_by[0][1]
+        if not filters and query.order_by == [('created_at', descending), ('id', descending)]:
+            # The maintained (created_at, id) list already is the order
+            return self._walk_page(self._order, ids, query, descending)
+
+        if ids is None:
+            objects = self._storage.values()
+        else:
+            objects = (self._storage[obj_id] for obj_id in ids if obj_id in self._storage)
+        directions = [descending for _, descending in query.order_by]
+        try:
+            keys = sorted(
+                _SortKey([getattr(obj, name) for name in query.sort_columns], directions)
+                for obj in objects
+                if all(_matches(obj, f) for f in filters)
+            )
+        except AttributeError as e:
+            raise ValueError(f"Unknown field: {e}")
+        return self._page(keys, query, lambda values: _SortKey(values, directions))
+
+    def _candidates(self, filters):
+        """
+        Answer what the hash indexes can: returns (set of candidate ids, or
+        None for every object; the filters still to check per object).
+        """
+        ids, remaining = None, []
+        for f in filters:
+            index = self._indexes.get(f.attr)
+            if index is None or f.op not in ('==', 'in'):
+                remaining.append(f)
+                continue
+            values = [f.value] if f.op == '==' else f.value
+            hits = set().union(*(index.get(value, ()) for value in values))
+            ids = hits if ids is None else ids & hits
+        return ids, remaining
+
+    def _page(self, keys, query, make_key):
+        """Cut the `query` window out of `keys`, sorted sort-key sequences."""
+        if query.after:
+            start = bisect_right(keys, make_key(decode_cursor(query.after, query)))
+        else:
+            start = query.offset or 0
+        end = len(keys) if query.limit is None else start + query.limit
+        id_position = query.sort_columns.index('id')
+        items = [self._storage[key[id_position]] for key in keys[start:end]]
+        next_cursor = None
+        if items and end < len(keys):
+            next_cursor = encode_cursor(items[-1], query)
+        return Page(items, next_cursor)
+
+    def _walk_page(self, keys, ids, query, descending):
+        """
+        Cut the `query` window out of `keys`, sorted (sort value, id) pairs,
+        keeping those in `ids` (None: all); stops once the page is full.
+        """
+        if query.after:
+            cursor = decode_cursor(query.after, query)
+            position = bisect_left(keys, cursor) if descending else bisect_right(keys, cursor)
+            skip = 0
+        else:
+            position = len(keys) if descending else 0
+            skip = query.offset or 0
+        positions = range(position - 1, -1, -1) if descending else range(position, len(keys))
+        walk = (keys[i] for i in positions)
+        if ids is not None:
+            walk = (key for key in walk if key[1] in ids)
+        stop = None if query.limit is None else skip + query.limit
+        return self._page_of(list(islice(walk, skip, stop)), next(walk, None) is not None, query)
+
+    def _page_of(self, keys, more, query):
+        """The `Page` of the objects of (sort value, id) `keys`; `more`: others follow."""
+        items = [self._storage[key[-1]] for key in keys]
+        return Page(items, encode_cursor(items[-1], query) if items and more else None)
+
+    def iter_rows(self, columns, since=None, chunk_size=1000):
+        objects = sorted(
+            (obj for obj in self._storage.values() if since is None or obj.updated_at >= since),
+            key=lambda obj: (obj.updated_at, obj.id)
+        )
+        for start in range(0, len(objects), chunk_size):
+            yield [
+                {column: getattr(obj, column) for column in columns}
+                for obj in objects[start:start + chunk_size]
+            ]
+
     def update(self, obj_id, data):
         obj = self.get(obj_id)
         if obj:
+            values = {
+                attr_name: data.get(attr_name, getattr(obj, attr_name))
+                for attr_name in self._indexes
+            }
+            self._check_unique(obj_id, values)
             obj.update(data)
+            self.add(obj)
 
     def delete(self, obj_id):
         if obj_id in self._storage:
-            del self._storage[obj_id]
+            self._unindex(obj_id)
+            obj = self._storage.pop(obj_id)
+            index = bisect_left(self._order, (obj.created_at, obj.id))
+            del self._order[index]
 
     def get_by_attribute(self, attr_name, attr_value):
+        if attr_name in self._indexes:
+            ids = self._indexes[attr_name].get(attr_value)
+            return self._storage[next(iter(ids))] if ids else None
         return next((obj for obj in self._storage.values() if getattr(obj, attr_name) == attr_value), None)
 
+    def get_all_by_attribute(self, attr_name, attr_value):
+        if attr_name in self._indexes:
+            return [self._storage[obj_id] for obj_id in self._indexes[attr_name].get(attr_value, ())]
+        return [obj for obj in self._storage.values() if getattr(obj, attr_name) == attr_value]
+
+
+class _SortKey:
+    """Sort key honouring a per-column ascending/descending direction."""
+    __slots__ = ('values', 'directions')
+
+    def __init__(self, values, directions):
+        self.values = values
+        self.directions = directions
+
+    def __getitem__(self, position):
+        return self.values[position]
+
+    def __lt__(self, other):
+        for mine, theirs, descending in zip(self.values, other.values, self.directions):
+            if mine != theirs:
+                return mine > theirs if descending else mine < theirs
+        return False
+
+
+def _matches(obj, f):
+    """Evaluate one `Query` filter against an object, with SQL semantics."""
+    value = getattr(obj, f.attr)
+    if f.op == 'in':
+        return value in f.value
+    if f.op == 'all':
+        return {item.id for item in value} >= set(f.value)
+    if value is None and f.op not in ('==', '!='):
+        return False  # NULL never satisfies a range comparison
+    return _COMPARISONS[f.op](value, f.value)
+
 
 class SQLAlchemyRepository(Repository):
+    # Named eager-loading profiles: profile name -> tuple of loader options.
+    # Subclasses fill this in for the relationships their callers walk.
+    load_profiles = {}
+    # Sortable SQL-expression attributes -> the columns computing them in
+    # Python reads, loaded with a projection so cursors cost no extra query
+    derived_columns = {}
+
     def __init__(self, model):
         self.model = model
 
+    def _loader_options(self, profile, keys=(), single=False):
+        if profile is None:
+            return ()
+        if isinstance(profile, Projection):
+            return self._projection_options(profile, keys, single)
+        try:
+            return self.load_profiles[profile]
+        except KeyError:
+            raise ValueError(f"Unknown loading profile '{profile}'")
+
+    def _projection_options(self, projection, keys=(), single=False):
+        """
+        load_only() the projected columns (plus the id and the sort `keys`
+        cursors are built from) and eagerly load the listed relationships:
+        many-to-one and, for a `single` row, the first collection are
+        joined, other collections get one IN query each.
+        """
+        keys = [column for key in keys for column in self.derived_columns.get(key, (key,))]
+        names = dict.fromkeys(('id', *keys, *projection.columns))
+        options = [load_only(*[self._column(name) for name in names])]
+        join_collection = single
+        for name, columns in projection.relationships.items():
+            relationship = self.model.__mapper__.relationships.get(name)
+            if relationship is None:
+                raise ValueError(f"Unknown relationship '{name}'")
+            attribute = getattr(self.model, name)
+            if not relationship.uselist or join_collection:
+                loader = joinedload(attribute)
+                join_collection = join_collection and not relationship.uselist
+            else:
+                loader = selectinload(attribute)
+            if columns:
+                related = relationship.mapper.class_
+                loader = loader.load_only(*[getattr(related, column) for column in columns])
+            options.append(loader)
+        return tuple(options)
+
+    def _query(self, profile=None, keys=()):
+        return self.model.query.options(*self._loader_options(profile, keys))
+
+    def _commit(self):
+        # Inside a `transaction()` block the commit is left to the block
+        if db.session.info.get('transaction_depth'):
+            db.session.flush()
+        else:
+            db.session.commit()
+
     def add(self, obj):
         db.session.add(obj)
-        db.session.commit()
+        self._commit()
+
+    # Reads run inside `reading()`: during GET requests that haven't
+    # written, a replica may answer them (app/persistence/replicas.py)
+
+    def get(self, obj_id, profile=None):
+        with reading():
+            return db.session.get(self.model, obj_id, options=self._loader_options(profile, single=True))
+
+    def get_many(self, obj_ids, profile=None):
+        obj_ids = list(obj_ids)
+        if not obj_ids:
+            return []
+        with reading():
+            return self._query(profile).filter(self.model.id.in_(obj_ids)).all()
+
+    def get_all(self, profile=None):
+        with reading():
+            return self._query(profile).all()
+
+    def find(self, query, profile=None):
+        statement = self._query(profile, query.sort_columns)
+        for f in query.filters:
+            statement = statement.filter(self._compile(f))
+        with reading():
+            return self._page(statement, query)
+
+    def _column(self, attr):
+        column = getattr(self.model, attr, None)
+        if not hasattr(column, '__clause_element__') or attr in self.model.__mapper__.relationships:
+            raise ValueError(f"Unknown field '{attr}'")
+        return column
 
-    def get(self, obj_id):
-        return self.model.query.get(obj_id)
+    def _compile(self, f):
+        """Translate one `Query` filter into a SQL expression."""
+        if f.op == 'all':
+            # Needs the association table; subclasses handle their relationships
+            raise ValueError(f"Filter 'all' is not supported on '{f.attr}'")
+        column = self._column(f.attr)
+        if f.op == 'in':
+            return column.in_(list(f.value))
+        return _COMPARISONS[f.op](column, f.value)
 
-    def get_all(self):
-        return self.model.query.all()
+    def _page(self, statement, query):
+        """Order `statement` by the query's sort key and keyset-paginate it."""
+        columns = [self._column(name) for name in query.sort_columns]
+        directions = [descending for _, descending in query.order_by]
+        statement = statement.order_by(*[
+            column.desc() if descending else column.asc()
+            for column, descending in zip(columns, directions)
+        ])
+        if query.after:
+            values = decode_cursor(query.after, query)
+            statement = statement.filter(_after(columns, directions, values))
+        elif query.offset:
+            statement = statement.offset(query.offset)
+        if query.limit is None:
+            return Page(statement.all())
+
+        # Fetch one extra row to learn whether another page exists
+        rows = statement.limit(query.limit + 1).all()
+        items = rows[:query.limit]
+        next_cursor = encode_cursor(items[-1], query) if len(rows) > query.limit else None
+        return Page(items, next_cursor)
+
+    def iter_rows(self, columns, since=None, chunk_size=1000):
+        # Plain rows instead of ORM objects: nothing accumulates in the
+        # session's identity map, and yield_per streams from the cursor.
+        model = self.model
+        query = select(*[getattr(model, column).label(column) for column in columns])
+        if since is not None:
+            query = query.where(model.updated_at >= since)
+        query = query.order_by(model.updated_at, model.id).execution_options(yield_per=chunk_size)
+        with reading():
+            partitions = db.session.execute(query).mappings().partitions()
+        for partition in partitions:
+            yield [dict(row) for row in partition]
 
     def update(self, obj_id, data):
         obj = self.get(obj_id)
         if obj:
             for key, value in data.items():
                 setattr(obj, key, value)
-            db.session.commit()
+            self._commit()
 
     def delete(self, obj_id):
         obj = self.get(obj_id)
         if obj:
             db.session.delete(obj)
-            db.session.commit()
+            self._commit()
 
     def get_by_attribute(self, attr_name, attr_value):
-        return self.model.query.filter_by(**{attr_name: attr_value}).first()
+        with reading():
+            return self.model.query.filter_by(**{attr_name: attr_value}).first()
+
+    def get_all_by_attribute(self, attr_name, attr_value):
+        with reading():
+            return self.model.query.filter_by(**{attr_name: attr_value}).all()
+
+
+def _after(columns, directions, values):
+    """Keyset predicate: rows strictly after `values` in the sort order."""
+    if len(set(directions)) == 1:
+        # One row-value comparison, which the database can seek an index with
+        compare = operator.lt if directions[0] else operator.gt
+        return compare(tuple_(*columns), tuple_(*values))
+    clauses = []
+    for position, (column, descending) in enumerate(zip(columns, directions)):
+        equal = [columns[i] == values[i] for i in range(position)]
+        beyond = column < values[position] if descending else column > values[position]
+        clauses.append(and_(*equal, beyond))
+    return or_(*clauses)
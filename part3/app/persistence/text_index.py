@@ -0,0 +1,134 @@
+import math
+import re
+import unicodedata
+from bisect import bisect_left, insort
+
+# Matches the SQLite FTS5 `unicode61 remove_diacritics 2` tokenizer closely
+# enough that both backends find the same places for the same query.
+_WORD = re.compile(r'\w+')
+
+# BM25 parameters and per-field weights, shared with the FTS5 ranking
+K1 = 1.2
+B = 0.75
+TITLE_WEIGHT = 10.0
+DESCRIPTION_WEIGHT = 1.0
+
+
+def tokenize(text):
+    """Lowercase, strip diacritics and split `text` into words."""
+    if not text:
+        return []
+    decomposed = unicodedata.normalize('NFKD', text.lower())
+    stripped = ''.join(ch for ch in decomposed if not unicodedata.combining(ch))
+    return _WORD.findall(stripped)
+
+
+def parse_query(query):
+    """
+    Turn free text into search terms. Every term must match, and matches
+    as a prefix ("lof" finds "loft").
+    """
+    terms = list(dict.fromkeys(tokenize(query)))
+    if not terms:
+        raise ValueError("Search query must contain at least one word")
+    return terms
+
+
+def fts5_query(terms):
+    """FTS5 MATCH expression for `terms`: quoted prefix terms, all required."""
+    return ' AND '.join(f'"{term}"*' for term in terms)
+
+
+class TextIndex:
+    """
+    Inverted index over the title and description of documents, for the
+    in-memory backend. Terms are kept sorted so prefix lookups are a bisect
+    plus a short scan; results are ranked with BM25.
+    """
+
+    def __init__(self):
+        self._postings = {}  # term -> {doc_id: weighted term frequency}
+        self._terms = []     # sorted keys of _postings
+        self._docs = {}      # doc_id -> (weighted length, terms)
+        self._total_length = 0.0
+
+    def __len__(self):
+        return len(self._docs)
+
+    def insert(self, doc_id, title, description):
+        frequencies = {}
+        for weight, text in ((TITLE_WEIGHT, title), (DESCRIPTION_WEIGHT, description)):
+            for term in tokenize(text):
+                frequencies[term] = frequencies.get(term, 0.0) + weight
+        length = sum(frequencies.values())
+        current = self._docs.get(doc_id)
+        if current is not None and current[1] == frequencies:
+            return
+        self.remove(doc_id)
+
+        for term, frequency in frequencies.items():
+            postings = self._postings.get(term)
+            if postings is None:
+                postings = self._postings[term] = {}
+                insort(self._terms, term)
+            postings[doc_id] = frequency
+        self._docs[doc_id] = (length, frequencies)
+        self._total_length += length
+
+    def remove(self, doc_id):
+        current = self._docs.pop(doc_id, None)
+        if current is None:
+            return
+        length, frequencies = current
+        self._total_length -= length
+        for term in frequencies:
+            postings = self._postings[term]
+            del postings[doc_id]
+            if not postings:
+                del self._postings[term]
+                del self._terms[bisect_left(self._terms, term)]
+
+    def _expand(self, prefix):
+        start = bisect_left(self._terms, prefix)
+        for term in self._terms[start:]:
+            if not term.startswith(prefix):
+                break
+            yield term
+
+    def search(self, terms, limit=None, offset=0):
+        """Return the ids of documents matching every term, best first."""
+        if not self._docs:
+            return []
+        matches = []
+        for prefix in terms:
+            frequencies = {}
+            for term in self._expand(prefix):
+                for doc_id, frequency in self._postings[term].items():
+                    frequencies[doc_id] = frequencies.get(doc_id, 0.0) + frequency
+            if not frequencies:
+                return []
+            matches.append(frequencies)
+
+        # Intersect starting from the rarest term
+        matches.sort(key=len)
+        candidates = set(matches[0])
+        for frequencies in matches[1:]:
+            candidates.intersection_update(frequencies)
+            if not candidates:
+                return []
+
+        doc_count = len(self._docs)
+        average_length = self._total_length / doc_count
+        scored = []
+        for doc_id in candidates:
+            norm = K1 * (1 - B + B * self._docs[doc_id][0] / average_length)
+            score = 0.0
+            for frequencies in matches:
+                df = len(frequencies)
+                idf = math.log((doc_count - df + 0.5) / (df + 0.5) + 1)
+                tf = frequencies[doc_id]
+                score += idf * tf * (K1 + 1) / (tf + norm)
+            scored.append((-score, doc_id))
+        scored.sort()
+        end = None if limit is None else offset + limit
+        return [doc_id for _, doc_id in scored[offset:end]]
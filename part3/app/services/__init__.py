@@ -1,3 +1,42 @@
-from app.services.facade import HBnBFacade
+"""
+The application's services, one set per app.
 
-facade = HBnBFacade()
+`init_app` attaches a `Services` registry to the app; the facade (and the
+repositories behind it) is only imported and built the first time a
+request or command uses it. `facade` is a proxy to the current app's
+facade, so modules can keep doing `from app.services import facade` at
+import time without building anything.
+"""
+import threading
+
+from flask import current_app
+from werkzeug.local import LocalProxy
+
+
+class Services:
+    """Lazily constructed, app-scoped service objects."""
+
+    def __init__(self):
+        self._facade = None
+        self._lock = threading.Lock()
+
+    @property
+    def facade(self):
+        if self._facade is None:
+            with self._lock:
+                if self._facade is None:
+                    from app.services.hbnb_facade import HBnBFacade
+                    self._facade = HBnBFacade()
+        return self._facade
+
+
+def init_app(app):
+    app.extensions['services'] = Services()
+
+
+def get_facade():
+    """The current app's HBnBFacade, built on first use."""
+    return current_app.extensions['services'].facade
+
+
+facade = LocalProxy(get_facade)
@@ -0,0 +1,343 @@
+import csv
+import json
+import uuid
+from collections import defaultdict
+from datetime import datetime
+from itertools import islice
+
+from sqlalchemy import bindparam, insert, select, update
+from sqlalchemy.exc import IntegrityError
+
+from app.extensions import db, password_hasher
+from app.models.amenity import Amenity
+from app.models.place import Place
+from app.models.place_amenity import place_amenity
+from app.models.review import Review
+from app.models.user import User
+from app.persistence import geo
+from app.persistence.repository import transaction
+
+KINDS = ('users', 'amenities', 'places', 'reviews')
+FORMATS = ('ndjson', 'csv')
+MAX_REPORTED_ERRORS = 1000
+
+
+class ImportReport:
+    """Outcome of one import: counts plus the first per-row errors."""
+
+    def __init__(self, kind):
+        self.kind = kind
+        self.inserted = 0
+        self.failed = 0
+        self.errors = []
+        self.started = datetime.utcnow()
+
+    def error(self, line, message):
+        self.failed += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append({'line': line, 'error': message})
+
+    def to_dict(self):
+        elapsed = (datetime.utcnow() - self.started).total_seconds()
+        return {
+            'kind': self.kind,
+            'inserted': self.inserted,
+            'failed': self.failed,
+            'errors': self.errors,
+            'seconds': round(elapsed, 3),
+            'rows_per_second': round(self.inserted / elapsed) if elapsed else None
+        }
+
+
+def read_rows(stream, fmt):
+    """
+    Yield (line_number, row) from a text stream of NDJSON or CSV.
+    Undecodable NDJSON lines are yielded as (line_number, ValueError).
+    """
+    if fmt == 'ndjson':
+        for line_number, line in enumerate(stream, start=1):
+            if not line.strip():
+                continue
+            try:
+                row = json.loads(line)
+            except ValueError as e:
+                yield line_number, ValueError(f"Invalid JSON: {e}")
+                continue
+            if not isinstance(row, dict):
+                yield line_number, ValueError("Each line must be a JSON object")
+                continue
+            yield line_number, row
+    elif fmt == 'csv':
+        # Line 1 is the header
+        for line_number, row in enumerate(csv.DictReader(stream), start=2):
+            yield line_number, row
+    else:
+        raise ValueError(f"Unsupported format '{fmt}', expected one of {', '.join(FORMATS)}")
+
+
+def _text(row, key, required=True):
+    value = row.get(key)
+    if value is None or (isinstance(value, str) and not value.strip()):
+        if required:
+            raise ValueError(f"'{key}' is required")
+        return None
+    return str(value)
+
+
+def _number(row, key, cast=float):
+    value = row.get(key)
+    if value is None or value == '':
+        raise ValueError(f"'{key}' is required")
+    try:
+        return cast(value)
+    except (TypeError, ValueError):
+        raise ValueError(f"'{key}' must be a number")
+
+
+def _integer(row, key):
+    # int() would truncate 4.7 to 4 and turn a bad row into a wrong one
+    value = _number(row, key)
+    if not value.is_integer():
+        raise ValueError(f"'{key}' must be a whole number")
+    return int(value)
+
+
+def _flag(row, key):
+    value = row.get(key, False)
+    if isinstance(value, str):
+        return value.strip().lower() in ('1', 'true', 'yes')
+    return bool(value)
+
+
+def _id_list(row, key):
+    value = row.get(key) or []
+    if isinstance(value, str):
+        # CSV cells hold ';'-separated ids
+        value = [part.strip() for part in value.split(';') if part.strip()]
+    return list(value)
+
+
+def _existing(column, values):
+    """One IN query: which of `values` are present in `column`."""
+    values = set(values)
+    if not values:
+        return set()
+    return set(db.session.scalars(select(column).where(column.in_(values))))
+
+
+class BulkImporter:
+    """
+    Streams rows into the database in chunks. Each chunk is validated with
+    the model rules, its references are resolved with one IN query per
+    referenced table, and it is written with executemany in one transaction.
+    A chunk that still hits a constraint is retried row by row so the
+    offending rows can be reported.
+    """
+
+    def __init__(self, chunk_size=5000):
+        self.chunk_size = chunk_size
+
+    def run(self, kind, rows):
+        if kind not in KINDS:
+            raise ValueError(f"Unknown import kind '{kind}', expected one of {', '.join(KINDS)}")
+        report = ImportReport(kind)
+        prepare = getattr(self, f'_prepare_{kind}')
+        write = getattr(self, f'_write_{kind}')
+        seen = set()  # unique keys already accepted during this run
+
+        rows = iter(rows)
+        while True:
+            chunk = list(islice(rows, self.chunk_size))
+            if not chunk:
+                break
+            parsed = []
+            for line_number, row in chunk:
+                if isinstance(row, Exception):
+                    report.error(line_number, str(row))
+                else:
+                    parsed.append((line_number, row))
+            self._write_chunk(write, list(prepare(parsed, seen, report)), report)
+        return report
+
+    def _write_chunk(self, write, valid, report):
+        if not valid:
+            return
+        try:
+            with transaction():
+                write([record for _, record in valid])
+            report.inserted += len(valid)
+            return
+        except IntegrityError:
+            pass
+        for line_number, record in valid:
+            try:
+                with transaction():
+                    write([record])
+                report.inserted += 1
+            except IntegrityError as e:
+                report.error(line_number, f"Constraint violation: {e.orig}")
+
+    # Users
+
+    def _prepare_users(self, chunk, seen, report):
+        emails = [row.get('email') for _, row in chunk if isinstance(row.get('email'), str)]
+        taken = _existing(User.email, emails)
+        now = datetime.utcnow()
+        accepted = []
+        for line_number, row in chunk:
+            try:
+                first_name = _text(row, 'first_name')
+                last_name = _text(row, 'last_name')
+                email = _text(row, 'email')
+                User.validate(first_name, last_name, email)
+                if email in taken or email in seen:
+                    raise ValueError("email must be unique")
+                # Pre-hashed passwords skip the deliberately slow bcrypt
+                pw_hash = _text(row, 'password_hash', required=False)
+                password = None if pw_hash else _text(row, 'password')
+            except ValueError as e:
+                report.error(line_number, str(e))
+                continue
+            seen.add(email)
+            accepted.append((line_number, row, first_name, last_name, email, pw_hash, password))
+
+        # Hash the chunk's plaintext passwords across the whole pool at once
+        plaintext = [entry[6] for entry in accepted if entry[6] is not None]
+        hashes = iter(password_hasher.hash_many(plaintext))
+        for line_number, row, first_name, last_name, email, pw_hash, password in accepted:
+            if password is not None:
+                pw_hash = next(hashes)
+            yield line_number, {
+                'id': _text(row, 'id', required=False) or str(uuid.uuid4()),
+                'first_name': first_name,
+                'last_name': last_name,
+                'email': email,
+                'password': pw_hash,
+                'is_admin': _flag(row, 'is_admin'),
+                'created_at': now,
+                'updated_at': now
+            }
+
+    def _write_users(self, records):
+        db.session.execute(insert(User.__table__), records)
+
+    # Amenities
+
+    def _prepare_amenities(self, chunk, seen, report):
+        now = datetime.utcnow()
+        for line_number, row in chunk:
+            try:
+                name = _text(row, 'name')
+                Amenity.validate(name)
+            except ValueError as e:
+                report.error(line_number, str(e))
+                continue
+            yield line_number, {
+                'id': _text(row, 'id', required=False) or str(uuid.uuid4()),
+                'name': name,
+                'created_at': now,
+                'updated_at': now
+            }
+
+    def _write_amenities(self, records):
+        db.session.execute(insert(Amenity.__table__), records)
+
+    # Places
+
+    def _prepare_places(self, chunk, seen, report):
+        owners = _existing(User.id, (row.get('owner_id') for _, row in chunk))
+        amenities = _existing(Amenity.id, (
+            amenity_id for _, row in chunk for amenity_id in _id_list(row, 'amenities')
+        ))
+        now = datetime.utcnow()
+        for line_number, row in chunk:
+            try:
+                title = _text(row, 'title')
+                price = _number(row, 'price')
+                latitude = _number(row, 'latitude')
+                longitude = _number(row, 'longitude')
+                geo.validate_point(latitude, longitude)
+                owner_id = _text(row, 'owner_id')
+                if owner_id not in owners:
+                    raise ValueError("Owner not found")
+                amenity_ids = _id_list(row, 'amenities')
+                for amenity_id in amenity_ids:
+                    if amenity_id not in amenities:
+                        raise ValueError(f"Amenity ID {amenity_id} not found")
+            except ValueError as e:
+                report.error(line_number, str(e))
+                continue
+            yield line_number, {
+                'id': _text(row, 'id', required=False) or str(uuid.uuid4()),
+                'title': title,
+                'description': row.get('description') or '',
+                'price': price,
+                'latitude': latitude,
+                'longitude': longitude,
+                'geohash': geo.encode(latitude, longitude),
+                'user_id': owner_id,
+                'created_at': now,
+                'updated_at': now,
+                'amenities': list(dict.fromkeys(amenity_ids))
+            }
+
+    def _write_places(self, records):
+        links = [
+            {'place_id': record['id'], 'amenity_id': amenity_id}
+            for record in records
+            for amenity_id in record['amenities']
+        ]
+        db.session.execute(insert(Place.__table__), [
+            {key: value for key, value in record.items() if key != 'amenities'}
+            for record in records
+        ])
+        if links:
+            db.session.execute(insert(place_amenity), links)
+
+    # Reviews
+
+    def _prepare_reviews(self, chunk, seen, report):
+        users = _existing(User.id, (row.get('user_id') for _, row in chunk))
+        places = _existing(Place.id, (row.get('place_id') for _, row in chunk))
+        now = datetime.utcnow()
+        for line_number, row in chunk:
+            try:
+                rating = _integer(row, 'rating')
+                Review.validate(rating)
+                user_id = _text(row, 'user_id')
+                place_id = _text(row, 'place_id')
+                if user_id not in users or place_id not in places:
+                    raise ValueError("User or Place not found")
+            except ValueError as e:
+                report.error(line_number, str(e))
+                continue
+            yield line_number, {
+                'id': _text(row, 'id', required=False) or str(uuid.uuid4()),
+                'comment': row.get('text', row.get('comment')),
+                'rating': rating,
+                'user_id': user_id,
+                'place_id': place_id,
+                'created_at': now,
+                'updated_at': now
+            }
+
+    def _write_reviews(self, records):
+        db.session.execute(insert(Review.__table__), records)
+
+        # Fold the chunk into the places' rating aggregates, one UPDATE
+        # per place executed as a single executemany
+        deltas = defaultdict(lambda: [0, 0, 0, 0, 0, 0, 0])
+        for record in records:
+            delta = deltas[record['place_id']]
+            delta[0] += 1
+            delta[1] += record['rating']
+            delta[1 + record['rating']] += 1
+        places = Place.__table__
+        columns = ['review_count', 'rating_sum'] + [f'rating_{r}' for r in range(1, 6)]
+        statement = update(places).where(places.c.id == bindparam('place_id')).values({
+            column: places.c[column] + bindparam(f'add_{column}') for column in columns
+        })
+        db.session.execute(statement, [
+            {'place_id': place_id, **{f'add_{c}': n for c, n in zip(columns, delta)}}
+            for place_id, delta in deltas.items()
+        ])
@@ -0,0 +1,368 @@
+import heapq
+from sqlalchemy.exc import IntegrityError
+from app.models.user import User
+from app.models.amenity import Amenity
+from app.models.place import Place
+from app.models.review import Review
+from app.persistence.repository import SQLAlchemyRepository, transaction
+from app.services.repositories.user_repository import UserRepository
+from app.services.repositories.place_repository import PlaceRepository
+from app.persistence import geo, text_index
+from app.persistence.query import Query
+from app.services.signals import data_changed
+
+PLACE_EXPORT_COLUMNS = (
+    'id', 'title', 'description', 'price', 'latitude', 'longitude', 'user_id',
+    'review_count', 'average_rating', 'created_at', 'updated_at'
+)
+REVIEW_EXPORT_COLUMNS = (
+    'id', 'place_id', 'user_id', 'text', 'rating', 'created_at', 'updated_at'
+)
+# Sort names a listing accepts ('-' for descending) and the non-null place
+# attribute each orders by; unreviewed places rank as rated 0
+PLACE_SORT_FIELDS = {
+    'created_at': 'created_at', 'price': 'price', 'title': 'title', 'rating': 'rating_score'
+}
+
+
+class HBnBFacade:
+    def __init__(self):
+        self.user_repo = UserRepository()
+        self.amenity_repo = SQLAlchemyRepository(Amenity)
+        self.place_repo = PlaceRepository()
+        self.review_repo = SQLAlchemyRepository(Review)
+
+    def transaction(self):
+        """Run several facade/repository writes as one atomic commit."""
+        return transaction()
+
+    def _changed(self, *kinds):
+        """Announce a completed write so caches of these kinds are dropped."""
+        data_changed.send(self, kinds=kinds)
+
+    def create_user(self, user_data):
+        password = user_data.pop('password', None)
+        if not password:
+            raise ValueError("Password is required")
+
+        user = User(**user_data)
+        # Before the costly hash; the unique constraint catches races
+        self._check_email(user.email)
+        user.hash_password(password)
+        self._save_user(user)
+        self._changed('users')
+        return user
+
+    def _check_email(self, email, user_id=None):
+        if self.user_repo.email_taken(email, exclude_id=user_id):
+            raise ValueError("Email already registered")
+
+    def _save_user(self, user):
+        try:
+            with self.transaction():
+                self.user_repo.add(user)
+        except IntegrityError:
+            # Taken by another worker after the check
+            raise ValueError("Email already registered")
+
+    def get_user(self, user_id):
+        return self.user_repo.get(user_id)
+
+    def get_user_by_email(self, email):
+        return self.user_repo.get_user_by_email(email)
+
+    def get_all_users(self, limit=None, after=None, offset=None):
+        return self.user_repo.get_page(limit=limit, after=after, offset=offset)
+
+    def update_user(self, user_id, data):
+        user = self.user_repo.get(user_id)
+        if not user:
+            return None
+
+        if 'email' in data and data['email'] != user.email:
+            self._check_email(data['email'], user_id)
+        for field in ('first_name', 'last_name', 'email'):
+            if field in data:
+                setattr(user, field, data[field])
+
+        if 'password' in data:
+            user.hash_password(data['password'])
+
+        self._save_user(user)
+        self._changed('users')
+        return user
+
+    def create_amenity(self, amenity_data):
+        amenity = Amenity(**amenity_data)
+        self.amenity_repo.add(amenity)
+        self._changed('amenities')
+        return amenity
+
+    def get_amenity(self, amenity_id):
+        return self.amenity_repo.get(amenity_id)
+
+    def get_all_amenities(self, limit=None, after=None, offset=None):
+        return self.amenity_repo.get_page(limit=limit, after=after, offset=offset)
+
+    def update_amenity(self, amenity_id, amenity_data):
+        amenity = self.amenity_repo.get(amenity_id)
+        if not amenity:
+            return None
+
+        if 'name' in amenity_data:
+            if len(amenity_data['name']) > 50:
+                raise ValueError("Name must be 50 characters or fewer.")
+            amenity.name = amenity_data['name']
+
+        self.amenity_repo.add(amenity)
+        self._changed('amenities', 'places')
+        return amenity
+
+    def create_place(self, place_data):
+        try:
+            with self.transaction():
+                owner = self.user_repo.get(place_data['owner_id'])
+                if not owner:
+                    raise ValueError("Owner not found")
+
+                amenities = self._get_amenities(place_data.get('amenities', []))
+
+                place = Place(
+                    title=place_data['title'],
+                    description=place_data.get('description', ''),
+                    price=place_data['price'],
+                    latitude=place_data['latitude'],
+                    longitude=place_data['longitude'],
+                    owner=owner
+                )
+                for am in amenities:
+                    place.add_amenity(am)
+
+                self.place_repo.add(place)
+            self._changed('places')
+            return place
+        except Exception as e:
+            raise ValueError(str(e))
+
+    def _get_amenities(self, amenity_ids):
+        """The amenities with `amenity_ids`, in order, fetched in one query."""
+        found = {amenity.id: amenity for amenity in self.amenity_repo.get_many(amenity_ids)}
+        for amenity_id in amenity_ids:
+            if amenity_id not in found:
+                raise ValueError(f"Amenity ID {amenity_id} not found")
+        return [found[amenity_id] for amenity_id in amenity_ids]
+
+    def get_place(self, place_id, profile='place_detail'):
+        return self.place_repo.get(place_id, profile=profile)
+
+    def get_all_places(self, limit=None, after=None, offset=None, profile='place_list',
+                       min_price=None, max_price=None, owner_id=None, min_rating=None,
+                       amenity_ids=None, sort='created_at'):
+        """
+        A page of places matching every given filter: a price range, an
+        owner, a minimum average rating and a set of amenities the place
+        must all have. `sort` is one of PLACE_SORT_FIELDS, '-' for descending.
+        """
+        name = sort.lstrip('-')
+        if name not in PLACE_SORT_FIELDS:
+            raise ValueError(f"sort must be one of {', '.join(PLACE_SORT_FIELDS)}")
+        order_by = sort[:len(sort) - len(name)] + PLACE_SORT_FIELDS[name]
+        query = Query(order_by=(order_by,), limit=limit, after=after, offset=offset)
+        if min_price is not None:
+            query.where('price', '>=', min_price)
+        if max_price is not None:
+            query.where('price', '<=', max_price)
+        if owner_id is not None:
+            query.where('user_id', '==', owner_id)
+        if min_rating is not None:
+            query.where('average_rating', '>=', min_rating)
+        if amenity_ids:
+            query.where('amenities', 'all', amenity_ids)
+        return self.place_repo.find(query, profile=profile)
+
+    def get_places_nearby(self, latitude, longitude, radius_km, limit=None, offset=0,
+                          profile='place_list'):
+        """
+        Places within `radius_km` of a point, nearest first, as
+        [(place, distance_km)].
+        """
+        geo.validate_point(latitude, longitude)
+        box = geo.bounding_box(latitude, longitude, radius_km)
+        hits = []
+        for place_id, lat, lon in self.place_repo.get_coordinates_within_box(box):
+            distance = geo.haversine_km(latitude, longitude, lat, lon)
+            if distance <= radius_km:
+                hits.append((distance, place_id))
+        return self._nearest_places(hits, limit, offset, profile)
+
+    def get_places_in_box(self, min_lat, min_lon, max_lat, max_lon, limit=None, offset=0,
+                          profile='place_list'):
+        """
+        Places inside a lat/lon box (min_lon > max_lon wraps across the
+        antimeridian), nearest to the box centre first, as [(place, distance_km)].
+        """
+        geo.validate_point(min_lat, min_lon)
+        geo.validate_point(max_lat, max_lon)
+        if min_lat > max_lat:
+            raise ValueError("min_lat must not exceed max_lat")
+        box = (min_lat, min_lon, max_lat, max_lon)
+        center_lat = (min_lat + max_lat) / 2
+        center_lon = (min_lon + max_lon) / 2
+        if min_lon > max_lon:
+            center_lon = center_lon + 180.0 if center_lon <= 0 else center_lon - 180.0
+        hits = [
+            (geo.haversine_km(center_lat, center_lon, lat, lon), place_id)
+            for place_id, lat, lon in self.place_repo.get_coordinates_within_box(box)
+        ]
+        return self._nearest_places(hits, limit, offset, profile)
+
+    def search_places(self, query, limit=None, offset=0, profile='place_list'):
+        """
+        Places whose title or description contains every word of `query`
+        (each as a prefix), best match first.
+        """
+        terms = text_index.parse_query(query)
+        ids = self.place_repo.search_ids(terms, limit=limit, offset=offset)
+        by_id = {place.id: place for place in self.place_repo.get_many(ids, profile=profile)}
+        return [by_id[place_id] for place_id in ids if place_id in by_id]
+
+    def rebuild_search_index(self):
+        return self.place_repo.rebuild_search_index()
+
+    def _nearest_places(self, hits, limit, offset, profile):
+        # Only the requested window of (distance, id) pairs gets hydrated
+        if limit is None:
+            window = sorted(hits)[offset:]
+        else:
+            window = heapq.nsmallest(offset + limit, hits)[offset:]
+        places = self.place_repo.get_many([place_id for _, place_id in window], profile=profile)
+        by_id = {place.id: place for place in places}
+        return [(by_id[place_id], distance) for distance, place_id in window if place_id in by_id]
+
+    def update_place(self, place_id, data):
+        place = self.place_repo.get(place_id)
+        if not place:
+            return None
+
+        with self.transaction():
+            for field in ['title', 'description', 'price', 'latitude', 'longitude']:
+                if field in data:
+                    setattr(place, field, data[field])
+
+            if 'amenities' in data:
+                place.amenities = []
+                for amenity in self._get_amenities(data['amenities']):
+                    place.add_amenity(amenity)
+
+            self.place_repo.add(place)
+        self._changed('places')
+        return place
+
+    def create_review(self, review_data):
+        user = self.user_repo.get(review_data['user_id'])
+        place = self.place_repo.get(review_data['place_id'])
+        if not user or not place:
+            raise ValueError("User or Place not found")
+
+        rating = int(review_data['rating'])
+        Review.validate(rating)
+
+        with self.transaction():
+            review = Review(
+                comment=review_data['text'],
+                rating=rating,
+                place=place,
+                user=user
+            )
+            # Review() already links itself to place.reviews; going through
+            # place.add_review would load every existing review of the place.
+            self.place_repo.record_rating(place, rating)
+            self.review_repo.add(review)
+        self._changed('reviews', 'places')
+        return review
+
+    def get_review(self, review_id, profile=None):
+        return self.review_repo.get(review_id, profile=profile)
+
+    def get_all_reviews(self, limit=None, after=None, offset=None, profile=None):
+        return self.review_repo.get_page(limit=limit, after=after, offset=offset, profile=profile)
+
+    def get_reviews_by_place(self, place_id, limit=None, after=None, offset=None, min_rating=None,
+                             profile=None):
+        """A page of a place's reviews, optionally only those rated at least `min_rating`."""
+        query = Query(limit=limit, after=after, offset=offset).where('place_id', '==', place_id)
+        if min_rating is not None:
+            query.where('rating', '>=', min_rating)
+        return self.review_repo.find(query, profile=profile)
+
+    def update_review(self, review_id, review_data):
+        review = self.review_repo.get(review_id)
+        if not review:
+            return None
+
+        with self.transaction():
+            # Ratings first: loading review.place autoflushes pending
+            # changes, which would write the review twice
+            if 'rating' in review_data:
+                rating = int(review_data['rating'])
+                Review.validate(rating)
+                if rating != review.rating:
+                    self.place_repo.record_rating(review.place, review.rating, delta=-1)
+                    self.place_repo.record_rating(review.place, rating)
+                review.rating = rating
+            if 'text' in review_data:
+                review.text = review_data['text']
+
+            self.review_repo.add(review)
+        self._changed('reviews', 'places')
+        return review
+
+    def delete_review(self, review_id):
+        review = self.review_repo.get(review_id)
+        if not review:
+            return False
+
+        with self.transaction():
+            place = review.place
+            self.place_repo.record_rating(place, review.rating, delta=-1)
+            # Only a collection already in memory needs the review removed;
+            # loading it just to filter it would read every review of the place.
+            if 'reviews' in vars(place):
+                place.reviews = [r for r in place.reviews if r.id != review_id]
+            self.review_repo.delete(review_id)
+        self._changed('reviews', 'places')
+        return True
+
+    def export_places(self, since=None, chunk_size=1000):
+        """
+        Yield chunks of place dicts (with owner_id and amenity ids) ordered
+        by (updated_at, id), optionally only those updated since `since`.
+        """
+        for chunk in self.place_repo.iter_rows(PLACE_EXPORT_COLUMNS, since, chunk_size):
+            amenity_ids = self.place_repo.get_amenity_ids([row['id'] for row in chunk])
+            for row in chunk:
+                row['owner_id'] = row.pop('user_id')
+                row['amenities'] = amenity_ids.get(row['id'], [])
+            yield chunk
+
+    def export_reviews(self, since=None, chunk_size=1000):
+        """Yield chunks of review dicts ordered by (updated_at, id)."""
+        yield from self.review_repo.iter_rows(REVIEW_EXPORT_COLUMNS, since, chunk_size)
+
+    def bulk_import(self, kind, rows, chunk_size=5000):
+        """
+        Insert (line_number, row) pairs of `kind` ('users', 'amenities',
+        'places' or 'reviews') in chunks; returns an ImportReport.
+        """
+        from app.services.bulk_import import BulkImporter
+        report = BulkImporter(chunk_size).run(kind, rows)
+        if kind == 'users':
+            self.user_repo.reset_email_filter()
+        self._changed(kind, 'places')
+        return report
+
+    def rebuild_rating_aggregates(self):
+        """Recompute every place's rating aggregates from its reviews."""
+        count = self.place_repo.rebuild_rating_aggregates()
+        self._changed('places')
+        return count
@@ -1,6 +1,307 @@
+import heapq
+
+from sqlalchemy import and_, event, func, or_, select, text, update
+from sqlalchemy.orm import joinedload, selectinload
+from app.extensions import db
 from app.models.place import Place
-from app.persistence.repository import SQLAlchemyRepository
+from app.models.place_amenity import place_amenity
+from app.models.review import Review
+from app.persistence import geo, text_index
+from app.persistence.bitmap import BitmapIndex
+from app.persistence.columns import RANGE_OPERATORS, ColumnStore
+from app.persistence.pagination import decode_cursor
+from app.persistence.replicas import reading
+from app.persistence.repository import InMemoryRepository, SQLAlchemyRepository, _matches
+
+# SQLite full-text index over places.title/description. It is an external
+# content table (the text is read back from `places`), kept in sync by
+# triggers so ORM writes, bulk imports and deletes all reach it.
+SEARCH_INDEX_DDL = (
+    """CREATE VIRTUAL TABLE IF NOT EXISTS places_fts USING fts5(
+        title, description, content='places', content_rowid='rowid',
+        tokenize='unicode61 remove_diacritics 2')""",
+    """CREATE TRIGGER IF NOT EXISTS places_fts_insert AFTER INSERT ON places BEGIN
+        INSERT INTO places_fts(rowid, title, description)
+        VALUES (new.rowid, new.title, new.description);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS places_fts_delete AFTER DELETE ON places BEGIN
+        INSERT INTO places_fts(places_fts, rowid, title, description)
+        VALUES ('delete', old.rowid, old.title, old.description);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS places_fts_update AFTER UPDATE OF title, description ON places BEGIN
+        INSERT INTO places_fts(places_fts, rowid, title, description)
+        VALUES ('delete', old.rowid, old.title, old.description);
+        INSERT INTO places_fts(rowid, title, description)
+        VALUES (new.rowid, new.title, new.description);
+    END""",
+)
+
+
+@event.listens_for(Place.__table__, 'after_create')
+def _create_search_index(target, connection, **kw):
+    if connection.dialect.name == 'sqlite':
+        for statement in SEARCH_INDEX_DDL:
+            connection.exec_driver_sql(statement)
+
+
+@event.listens_for(Place.__table__, 'before_drop')
+def _drop_search_index(target, connection, **kw):
+    if connection.dialect.name == 'sqlite':
+        connection.exec_driver_sql("DROP TABLE IF EXISTS places_fts")
+
 
 class PlaceRepository(SQLAlchemyRepository):
+    # Everything `serialize_place` touches, loaded in a fixed number of
+    # round trips whatever the number of places.
+    load_profiles = {
+        # One row: join owner and amenities, reviews in a second query
+        # (joining two collections would multiply the rows).
+        'place_detail': (
+            joinedload(Place.owner),
+            joinedload(Place.amenities),
+            selectinload(Place.reviews),
+        ),
+        # Many rows: join the owner, one IN query per collection.
+        'place_list': (
+            joinedload(Place.owner),
+            selectinload(Place.amenities),
+            selectinload(Place.reviews),
+        ),
+    }
+    derived_columns = {'rating_score': ('review_count', 'rating_sum')}
+
     def __init__(self):
         super().__init__(Place)
+
+    def record_rating(self, place, rating, delta=1):
+        """Count (delta=1) or uncount (delta=-1) one review `rating` in `place`'s aggregates."""
+        place.record_rating(rating, delta)
+
+    def rebuild_rating_aggregates(self):
+        """
+        Recompute review_count, rating_sum and the rating histogram of
+        every place with one grouped scan of `reviews`. Returns the number
+        of places that have reviews.
+        """
+        histogram = [
+            func.sum(db.case((Review.rating == rating, 1), else_=0))
+            for rating in range(1, 6)
+        ]
+        rows = db.session.query(
+            Review.place_id, func.count(Review.id), func.sum(Review.rating), *histogram
+        ).group_by(Review.place_id).all()
+
+        zero = {'review_count': 0, 'rating_sum': 0}
+        zero.update({f'rating_{rating}': 0 for rating in range(1, 6)})
+        db.session.execute(update(Place).values(**zero))
+        if rows:
+            db.session.execute(update(Place), [
+                {
+                    'id': place_id,
+                    'review_count': count,
+                    'rating_sum': total,
+                    **{f'rating_{i + 1}': n for i, n in enumerate(buckets)}
+                }
+                for place_id, count, total, *buckets in rows
+            ])
+        self._commit()
+        return len(rows)
+
+    def _compile(self, f):
+        if f.attr == 'amenities' and f.op == 'all':
+            return Place.id.in_(self._with_all_amenities(f.value))
+        return super()._compile(f)
+
+    @staticmethod
+    def _with_all_amenities(amenity_ids):
+        # Relational division over ix_place_amenity_amenity: one index range
+        # scan per amenity and a GROUP BY, instead of one join per amenity.
+        # The database stays the single source of truth across workers.
+        amenity_ids = set(amenity_ids)
+        return (
+            select(place_amenity.c.place_id)
+            .where(place_amenity.c.amenity_id.in_(amenity_ids))
+            .group_by(place_amenity.c.place_id)
+            .having(func.count() == len(amenity_ids))
+        )
+
+    def rebuild_search_index(self):
+        """
+        Create the full-text index if it is missing (databases created before
+        it existed) and repopulate it from `places`. Returns the place count.
+        """
+        if db.engine.dialect.name == 'sqlite':
+            for statement in SEARCH_INDEX_DDL:
+                db.session.execute(text(statement))
+            db.session.execute(text("INSERT INTO places_fts(places_fts) VALUES ('rebuild')"))
+            self._commit()
+        return db.session.query(func.count(Place.id)).scalar()
+
+    def search_ids(self, terms, limit=None, offset=0):
+        """
+        Ids of the places whose title or description matches every term (as
+        a prefix), best BM25 match first; title hits weigh more.
+        """
+        if db.engine.dialect.name != 'sqlite':
+            return self._search_ids_like(terms, limit, offset)
+        statement = (
+            "SELECT places.id FROM places_fts JOIN places ON places.rowid = places_fts.rowid "
+            "WHERE places_fts MATCH :query "
+            f"ORDER BY bm25(places_fts, {text_index.TITLE_WEIGHT}, {text_index.DESCRIPTION_WEIGHT}), "
+            "places.id LIMIT :limit OFFSET :offset"
+        )
+        # .columns() makes it a SELECT, which a replica may answer
+        with reading():
+            return list(db.session.scalars(text(statement).columns(Place.__table__.c.id), {
+                'query': text_index.fts5_query(terms),
+                'limit': -1 if limit is None else limit,
+                'offset': offset
+            }))
+
+    def _search_ids_like(self, terms, limit, offset):
+        # Unranked fallback for databases without FTS5: title matches first
+        title_hits = and_(*[Place.title.icontains(term, autoescape=True) for term in terms])
+        query = db.session.query(Place.id).filter(and_(*[
+            or_(Place.title.icontains(term, autoescape=True), Place.description.icontains(term, autoescape=True))
+            for term in terms
+        ])).order_by(db.case((title_hits, 0), else_=1), Place.id).offset(offset)
+        if limit is not None:
+            query = query.limit(limit)
+        with reading():
+            return [place_id for place_id, in query]
+
+    def get_coordinates_within_box(self, box):
+        """
+        Return [(id, latitude, longitude)] of the places inside `box`.
+        The geohash prefixes narrow the scan through ix_places_geohash_coords;
+        the coordinate bounds then make the result exact.
+        """
+        min_lat, _, max_lat, _ = box
+        prefixes = [
+            and_(Place.geohash >= prefix, Place.geohash < prefix + '~')
+            for prefix in geo.cover(box) if prefix
+        ]
+        longitudes = [Place.longitude.between(lo, hi) for lo, hi in geo.longitude_spans(box)]
+
+        query = db.session.query(Place.id, Place.latitude, Place.longitude).filter(
+            Place.latitude.between(min_lat, max_lat), or_(*longitudes)
+        )
+        if prefixes:
+            query = query.filter(or_(*prefixes))
+        with reading():
+            return [tuple(row) for row in query]
+
+    def get_amenity_ids(self, place_ids):
+        """{place_id: [amenity_id, ...]} for a batch of places, in one query."""
+        amenity_ids = {place_id: [] for place_id in place_ids}
+        if not amenity_ids:
+            return amenity_ids
+        with reading():
+            rows = db.session.execute(
+                select(place_amenity.c.place_id, place_amenity.c.amenity_id)
+                .where(place_amenity.c.place_id.in_(list(amenity_ids)))
+            ).all()
+        for place_id, amenity_id in rows:
+            amenity_ids[place_id].append(amenity_id)
+        return amenity_ids
+
+
+class InMemoryPlaceRepository(InMemoryRepository):
+    """
+    In-memory place storage with a grid index over the coordinates, an
+    inverted index over the text, a bitmap index over the amenities and
+    columns of the numeric attributes for range filters and sorting.
+
+    Not selected by any app config: the facade's other repositories are
+    SQLAlchemy ones. Tests and benchmarks use it as the in-memory reference.
+    """
+
+    # Attributes kept as columns; average_rating follows the rating
+    # aggregates, which go through `record_rating` to stay current
+    COLUMNS = ('price', 'latitude', 'longitude', 'average_rating')
+
+    def __init__(self, cell_degrees=0.25):
+        super().__init__()
+        self._grid = geo.GridIndex(cell_degrees)
+        self._text = text_index.TextIndex()
+        self._amenities = BitmapIndex()
+        self._columns = ColumnStore(self.COLUMNS)
+
+    def add(self, obj):
+        # create_place and update_place add the place again after
+        # add_amenity, which re-syncs its amenity bits
+        super().add(obj)
+        self._grid.insert(obj.id, obj.latitude, obj.longitude)
+        self._text.insert(obj.id, obj.title, obj.description)
+        self._amenities.set(obj.id, (amenity.id for amenity in obj.amenities))
+        self._set_columns(obj)
+
+    def delete(self, obj_id):
+        super().delete(obj_id)
+        self._grid.remove(obj_id)
+        self._text.remove(obj_id)
+        self._amenities.remove(obj_id)
+        self._columns.remove(obj_id)
+
+    def record_rating(self, place, rating, delta=1):
+        place.record_rating(rating, delta)
+        if place.id in self._storage:
+            self._set_columns(place)
+
+    def _set_columns(self, obj):
+        self._columns.set(obj.id, {name: getattr(obj, name) for name in self.COLUMNS})
+
+    def find(self, query, profile=None):
+        sort_name, descending = query.order_by[0]
+        if sort_name not in self.COLUMNS or query.order_by[1:] != [('id', descending)]:
+            return super().find(query, profile)
+        # Sorted off the columns: only the places on the page are read
+        ids, filters = self._candidates(query.filters)
+        if filters:
+            candidates = self._storage if ids is None else ids
+            ids = {obj_id for obj_id in candidates
+                   if all(_matches(self._storage[obj_id], f) for f in filters)}
+        keys = self._columns.keys(sort_name, ids)
+        skip = query.offset or 0
+        if query.after:
+            cursor = decode_cursor(query.after, query)
+            keys = [key for key in keys if (key < cursor if descending else key > cursor)]
+            skip = 0
+        if query.limit is None:
+            return self._page_of(sorted(keys, reverse=descending)[skip:], False, query)
+        # A heap picks the page without sorting every match
+        pick = heapq.nlargest if descending else heapq.nsmallest
+        window = pick(skip + query.limit + 1, keys)
+        return self._page_of(window[skip:skip + query.limit], len(window) > skip + query.limit, query)
+
+    def _candidates(self, filters):
+        # "Has all these amenities" is an AND of the amenity bitsets, and
+        # numeric ranges are evaluated a whole column at a time
+        bitmap_filters = [f for f in filters if f.attr == 'amenities' and f.op == 'all']
+        column_filters = [f for f in filters if f.attr in self.COLUMNS and f.op in RANGE_OPERATORS]
+        ids, remaining = super()._candidates(
+            [f for f in filters if f not in bitmap_filters and f not in column_filters]
+        )
+        for f in bitmap_filters:
+            hits = self._amenities.all_of(f.value)
+            ids = hits if ids is None else ids & hits
+        if column_filters:
+            hits = self._columns.select(column_filters)
+            ids = hits if ids is None else ids & hits
+        return ids, remaining
+
+    def rebuild_search_index(self):
+        self._text = text_index.TextIndex()
+        for place in self._storage.values():
+            self._text.insert(place.id, place.title, place.description)
+        return len(self._text)
+
+    def search_ids(self, terms, limit=None, offset=0):
+        return self._text.search(terms, limit, offset)
+
+    def get_coordinates_within_box(self, box):
+        return self._grid.query(box)
+
+    def get_amenity_ids(self, place_ids):
+        places = (self.get(place_id) for place_id in place_ids)
+        return {place.id: [a.id for a in place.amenities] for place in places if place}
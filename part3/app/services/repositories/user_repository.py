@@ -1,9 +1,64 @@
+import threading
+from flask import current_app
+from sqlalchemy import func, select
+from app.extensions import db
 from app.models.user import User
+from app.persistence.bloom import BloomFilter
 from app.persistence.repository import SQLAlchemyRepository
 
+_filter_lock = threading.Lock()
+
+
 class UserRepository(SQLAlchemyRepository):
     def __init__(self):
         super().__init__(User)
 
     def get_user_by_email(self, email):
         return self.model.query.filter_by(email=email).first()
+
+    def add(self, obj):
+        super().add(obj)
+        emails = current_app.extensions.get('email_filter')
+        if emails is not None:
+            emails.add(obj.email)
+
+    def email_taken(self, email, exclude_id=None):
+        """
+        Whether a user other than `exclude_id` holds `email`, answered by
+        the unique index on users.email. A per-process Bloom filter in
+        front answers "free" for never-seen emails without a query. It
+        misses emails registered by other workers since it was built, so
+        the unique constraint at commit remains the final check.
+        """
+        emails = self._email_filter()
+        if emails is not None and email not in emails:
+            return False
+        holder = db.session.scalar(select(User.id).where(User.email == email))
+        return holder is not None and holder != exclude_id
+
+    def reset_email_filter(self):
+        """Drop the filter (e.g. after rows were inserted behind its back)."""
+        current_app.extensions.pop('email_filter', None)
+
+    def _email_filter(self):
+        config = current_app.config
+        if not config.get('EMAIL_FILTER_CAPACITY'):
+            return None
+        emails = current_app.extensions.get('email_filter')
+        if emails is None or emails.full:
+            with _filter_lock:
+                emails = current_app.extensions.get('email_filter')
+                if emails is None or emails.full:
+                    emails = self._build_email_filter(
+                        config['EMAIL_FILTER_CAPACITY'], config.get('EMAIL_FILTER_ERROR_RATE', 0.01)
+                    )
+                    current_app.extensions['email_filter'] = emails
+        return emails
+
+    def _build_email_filter(self, capacity, error_rate):
+        # Room to double before the next rebuild
+        count = db.session.scalar(select(func.count()).select_from(User))
+        emails = BloomFilter(max(capacity, 2 * count), error_rate)
+        for email in db.session.scalars(select(User.email).execution_options(yield_per=10000)):
+            emails.add(email)
+        return emails
@@ -0,0 +1,8 @@
+from blinker import Namespace
+
+_signals = Namespace()
+
+# Sent by HBnBFacade once a write has gone through. `kinds` is a tuple of
+# the entity collections that changed ('users', 'amenities', 'places',
+# 'reviews'), so derived data such as cached responses can be dropped.
+data_changed = _signals.signal('data-changed')
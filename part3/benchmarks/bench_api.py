@@ -0,0 +1,454 @@
+"""
+Latency, throughput and SQL query counts of every /api/v1 endpoint.
+
+    python -m benchmarks.bench_api --scale 100k --requests 200 --output base.json
+    python -m benchmarks.bench_api --scale 100k --mode http --threads 8 --compare base.json
+
+The dataset (benchmarks/datasets.py) is seeded once into
+benchmarks/data/bench-<scale>.db and reused by later runs. Each scenario
+is warmed up, then timed `--requests` times:
+
+* `client` mode calls the app in-process through the Flask test client,
+  one request at a time, so the numbers are the app's own cost;
+* `http` mode serves the app with a threaded WSGI server and drives it
+  from `--threads` client threads over real sockets.
+
+Write scenarios only touch rows the benchmark created itself. The JSON
+report holds p50/p95/p99/mean/max latency in milliseconds, requests per
+second, statuses and SQL statements per request for each scenario;
+`--compare` prints the change against an earlier report.
+"""
+import argparse
+import http.client
+import itertools
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import threading
+import time
+from collections import namedtuple
+from datetime import datetime, timedelta
+
+import sqlalchemy
+from sqlalchemy import event, func, select
+from werkzeug.serving import make_server
+
+from app import create_app
+from app.extensions import db, password_hasher
+from app.models.amenity import Amenity
+from app.models.place import Place
+from app.models.review import Review
+from app.models.user import User
+from benchmarks import datasets
+from config import Config
+
+SAMPLE_SIZE = 200  # ids of each kind the read scenarios pick from
+
+# `path` and `body` are functions of the Context; `body` returns a dict
+# (sent as JSON) or a str sent with `content_type`. Work done while
+# building them (e.g. creating the review a DELETE removes) is not timed.
+Scenario = namedtuple('Scenario', 'name method path body auth content_type')
+Scenario.__new__.__defaults__ = (None, None, 'application/json')
+
+_queries = threading.local()
+
+
+def make_app(db_path, **settings):
+    """An app on the SQLite file `db_path` that reports SQL statements per request."""
+    os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+
+    class BenchConfig(Config):
+        SQLALCHEMY_DATABASE_URI = f'sqlite:///{os.path.abspath(db_path)}'
+        JWT_VERIFY_SUB = False  # identities are dicts
+        JWT_ACCESS_TOKEN_EXPIRES = 24 * 3600
+        SCHEMA_CHECK_ON_STARTUP = False
+
+    for name, value in settings.items():
+        setattr(BenchConfig, name, value)
+
+    app = create_app(BenchConfig)
+    with app.app_context():
+        event.listen(db.engine, 'before_cursor_execute', _count_query)
+
+    @app.before_request
+    def reset_query_count():
+        _queries.count = 0
+
+    @app.after_request
+    def report_query_count(response):
+        # Streamed bodies run their queries after this point; client
+        # mode reads the thread-local counter once the body is consumed.
+        response.headers['X-Query-Count'] = str(getattr(_queries, 'count', 0))
+        return response
+
+    return app
+
+
+def _count_query(conn, cursor, statement, parameters, context, executemany):
+    _queries.count = getattr(_queries, 'count', 0) + 1
+
+
+class Context:
+    """Ids, tokens and bench-owned rows the scenarios build requests from."""
+
+    def __init__(self, app, rng):
+        self.app = app
+        self.rng = rng
+        self.client = app.test_client()
+        self.run = f'{int(time.time())}{rng.randrange(1000):03d}'
+        self._counter = itertools.count()
+        with app.app_context():
+            self.ids = {
+                model.__tablename__: list(db.session.scalars(
+                    select(model.id).order_by(func.random()).limit(SAMPLE_SIZE)
+                ))
+                for model in (User, Place, Review, Amenity)
+            }
+            self.user_id = db.session.scalar(select(User.id).where(User.email == datasets.USER_EMAIL))
+        self.tokens = {role: self._login(email) for role, email in (
+            ('admin', datasets.ADMIN_EMAIL), ('user', datasets.USER_EMAIL)
+        )}
+        # Rows the update scenarios may rewrite freely
+        self.amenity_id = self._create('/api/v1/amenities/', {'name': f'Bench {self.run}'}, 'admin')
+        self.place_id = self._create('/api/v1/places/', self.place_body(), 'user')
+        self.review_id = self.create_review()
+        self.since = (datetime.utcnow() - timedelta(days=3)).isoformat()
+
+    def _login(self, email):
+        response = self.client.post('/api/v1/auth/login',
+                                    json={'email': email, 'password': datasets.BENCH_PASSWORD})
+        if response.status_code != 200:
+            raise RuntimeError(f"Cannot log in as {email}: {response.get_data(as_text=True)}")
+        return response.get_json()['access_token']
+
+    def _create(self, path, body, auth):
+        response = self.client.post(path, json=body, headers=self.headers(auth))
+        if response.status_code != 201:
+            raise RuntimeError(f"POST {path} failed: {response.get_data(as_text=True)}")
+        return response.get_json()['id']
+
+    def headers(self, auth):
+        return {'Authorization': f'Bearer {self.tokens[auth]}'} if auth else {}
+
+    def pick(self, kind):
+        return self.rng.choice(self.ids[kind])
+
+    def unique(self):
+        return f'{self.run}-{next(self._counter)}'
+
+    def city(self):
+        latitude, longitude = self.rng.choice(datasets.CITIES)
+        return latitude, longitude
+
+    def place_body(self):
+        latitude, longitude = self.city()
+        return {
+            'title': f'Bench {self.rng.choice(datasets.NOUNS)}',
+            'description': 'Created by the benchmark',
+            'price': float(self.rng.randrange(20, 1000)),
+            'latitude': latitude, 'longitude': longitude,
+            'amenities': self.rng.sample(self.ids['amenities'], min(2, len(self.ids['amenities'])))
+        }
+
+    def create_review(self):
+        return self._create('/api/v1/reviews/', {
+            'text': 'Benchmark review', 'rating': self.rng.randint(1, 5),
+            'user_id': self.user_id, 'place_id': self.pick('places')
+        }, 'user')
+
+    def user_body(self):
+        return {'first_name': 'Bench', 'last_name': 'User',
+                'email': f'bench-{self.unique()}@bench.example.com', 'password': 'bench-password'}
+
+
+def _amenity_rows(ctx):
+    return ''.join(json.dumps({'name': f'Imported {ctx.unique()}'[:50]}) + '\n' for _ in range(10))
+
+
+def _box_path(ctx):
+    latitude, longitude = ctx.city()
+    west, east = (((longitude + delta + 180.0) % 360.0) - 180.0 for delta in (-0.1, 0.1))
+    return (f'/api/v1/places/within?min_lat={latitude - 0.1}&max_lat={latitude + 0.1}'
+            f'&min_lon={west}&max_lon={east}&limit=50')
+
+
+SCENARIOS = [
+    Scenario('users.list', 'GET', lambda c: '/api/v1/users/?limit=100'),
+    Scenario('users.get', 'GET', lambda c: f"/api/v1/users/{c.pick('users')}"),
+    Scenario('users.register', 'POST', lambda c: '/api/v1/users/', lambda c: c.user_body()),
+    Scenario('users.admin_create', 'POST', lambda c: '/api/v1/users/admin',
+             lambda c: c.user_body(), 'admin'),
+    Scenario('users.update', 'PUT', lambda c: f'/api/v1/users/{c.user_id}',
+             lambda c: {'first_name': 'Bench', 'last_name': 'User', 'email': datasets.USER_EMAIL,
+                        'password': datasets.BENCH_PASSWORD}, 'admin'),
+    Scenario('auth.login', 'POST', lambda c: '/api/v1/auth/login',
+             lambda c: {'email': datasets.USER_EMAIL, 'password': datasets.BENCH_PASSWORD}),
+    Scenario('amenities.list', 'GET', lambda c: '/api/v1/amenities/?limit=100'),
+    Scenario('amenities.get', 'GET', lambda c: f"/api/v1/amenities/{c.pick('amenities')}"),
+    Scenario('amenities.create', 'POST', lambda c: '/api/v1/amenities/',
+             lambda c: {'name': f'Bench {c.unique()}'[:50]}, 'admin'),
+    Scenario('amenities.update', 'PUT', lambda c: f'/api/v1/amenities/{c.amenity_id}',
+             lambda c: {'name': f'Bench {c.unique()}'[:50]}, 'admin'),
+    Scenario('places.list', 'GET', lambda c: '/api/v1/places/?limit=100'),
+    Scenario('places.list_map', 'GET',
+             lambda c: '/api/v1/places/?limit=100&fields=id,title,price,latitude,longitude'),
+    Scenario('places.list_filtered', 'GET',
+             lambda c: '/api/v1/places/?limit=50&min_price=100&max_price=300&min_rating=3&sort=-price'),
+    Scenario('places.list_amenities', 'GET',
+             lambda c: '/api/v1/places/?limit=50&amenities=' + ','.join(c.rng.sample(c.ids['amenities'], 2))),
+    Scenario('places.nearby', 'GET',
+             lambda c: '/api/v1/places/nearby?lat={}&lon={}&radius_km=5&limit=50'.format(*c.city())),
+    Scenario('places.within', 'GET', _box_path),
+    Scenario('places.search', 'GET',
+             lambda c: f"/api/v1/places/search?q={c.rng.choice(datasets.ADJECTIVES)}"
+                       f"+{c.rng.choice(datasets.NOUNS)}&limit=20"),
+    Scenario('places.get', 'GET', lambda c: f"/api/v1/places/{c.pick('places')}"),
+    Scenario('places.create', 'POST', lambda c: '/api/v1/places/', lambda c: c.place_body(), 'user'),
+    Scenario('places.update', 'PUT', lambda c: f'/api/v1/places/{c.place_id}',
+             lambda c: {'price': float(c.rng.randrange(20, 1000))}, 'user'),
+    Scenario('reviews.list', 'GET', lambda c: '/api/v1/reviews/?limit=100'),
+    Scenario('reviews.get', 'GET', lambda c: f"/api/v1/reviews/{c.pick('reviews')}"),
+    Scenario('reviews.by_place', 'GET', lambda c: f"/api/v1/reviews/places/{c.pick('places')}/reviews"),
+    Scenario('reviews.create', 'POST', lambda c: '/api/v1/reviews/',
+             lambda c: {'text': 'Benchmark review', 'rating': c.rng.randint(1, 5),
+                        'user_id': c.user_id, 'place_id': c.pick('places')}, 'user'),
+    Scenario('reviews.update', 'PUT', lambda c: f'/api/v1/reviews/{c.review_id}',
+             lambda c: {'text': 'Benchmark review', 'rating': c.rng.randint(1, 5),
+                        'user_id': c.user_id, 'place_id': c.pick('places')}, 'user'),
+    Scenario('reviews.delete', 'DELETE', lambda c: f'/api/v1/reviews/{c.create_review()}', auth='user'),
+    Scenario('admin.import', 'POST', lambda c: '/api/v1/admin/import/amenities', _amenity_rows,
+             'admin', 'application/x-ndjson'),
+    Scenario('admin.cache', 'GET', lambda c: '/api/v1/admin/cache', auth='admin'),
+    Scenario('admin.db_pool', 'GET', lambda c: '/api/v1/admin/db-pool', auth='admin'),
+    Scenario('export.places', 'GET', lambda c: f'/api/v1/export/places?since={c.since}', auth='admin'),
+    Scenario('export.reviews', 'GET', lambda c: f'/api/v1/export/reviews?since={c.since}', auth='admin'),
+]
+
+
+def build_request(ctx, scenario):
+    """(method, path, headers, body bytes) for one request of `scenario`."""
+    headers = ctx.headers(scenario.auth)
+    body = scenario.body(ctx) if scenario.body else None
+    if body is not None:
+        headers['Content-Type'] = scenario.content_type
+        body = (body if isinstance(body, str) else json.dumps(body)).encode('utf-8')
+    return scenario.method, scenario.path(ctx), headers, body
+
+
+def percentile(ordered, fraction):
+    """Nearest-rank percentile of an already sorted list."""
+    if not ordered:
+        return None
+    rank = max(1, round(fraction * len(ordered) + 0.5))
+    return ordered[min(rank, len(ordered)) - 1]
+
+
+def summarize(samples, elapsed):
+    """Aggregate [(seconds, status, queries)] measured over `elapsed` wall seconds."""
+    latencies = sorted(seconds * 1000 for seconds, _, _ in samples)
+    statuses = {}
+    for _, status, _ in samples:
+        statuses[str(status)] = statuses.get(str(status), 0) + 1
+    queries = [count for _, _, count in samples]
+    return {
+        'requests': len(samples),
+        'errors': sum(1 for _, status, _ in samples if status >= 400),
+        'statuses': statuses,
+        'p50_ms': round(percentile(latencies, 0.50), 3),
+        'p95_ms': round(percentile(latencies, 0.95), 3),
+        'p99_ms': round(percentile(latencies, 0.99), 3),
+        'mean_ms': round(sum(latencies) / len(latencies), 3),
+        'max_ms': round(latencies[-1], 3),
+        'requests_per_second': round(len(samples) / elapsed, 1) if elapsed else None,
+        'queries_per_request': round(sum(queries) / len(queries), 2),
+        'queries_max': max(queries),
+    }
+
+
+def run_client(ctx, scenario, requests, warmup):
+    client = ctx.app.test_client()
+
+    def call():
+        method, path, headers, body = build_request(ctx, scenario)
+        start = time.perf_counter()
+        response = client.open(path, method=method, headers=headers, data=body)
+        response.get_data()
+        seconds = time.perf_counter() - start
+        return seconds, response.status_code, getattr(_queries, 'count', 0)
+
+    for _ in range(warmup):
+        call()
+    started = time.perf_counter()
+    samples = [call() for _ in range(requests)]
+    return summarize(samples, time.perf_counter() - started)
+
+
+def run_http(ctx, scenario, requests, warmup, threads, port):
+    remaining = [warmup]
+    lock = threading.Lock()
+    samples = []
+
+    def take():
+        with lock:
+            if remaining[0] <= 0:
+                return False
+            remaining[0] -= 1
+            return True
+
+    def client_loop(record):
+        connection = http.client.HTTPConnection('127.0.0.1', port, timeout=60)
+        while take():
+            method, path, headers, body = build_request(ctx, scenario)
+            start = time.perf_counter()
+            try:
+                connection.request(method, path, body=body, headers=headers)
+                response = connection.getresponse()
+                response.read()
+                status, queries = response.status, int(response.getheader('X-Query-Count', 0))
+            except (OSError, http.client.HTTPException):
+                connection.close()
+                connection = http.client.HTTPConnection('127.0.0.1', port, timeout=60)
+                status, queries = 599, 0
+            seconds = time.perf_counter() - start
+            if record:
+                with lock:
+                    samples.append((seconds, status, queries))
+        connection.close()
+
+    def drive(record):
+        pool = [threading.Thread(target=client_loop, args=(record,)) for _ in range(threads)]
+        for thread in pool:
+            thread.start()
+        for thread in pool:
+            thread.join()
+
+    drive(False)
+    remaining[0] = requests
+    started = time.perf_counter()
+    drive(True)
+    return summarize(samples, time.perf_counter() - started)
+
+
+def _git_revision():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run(args):
+    counts = datasets.resolve_counts(args.scale, users=args.users, places=args.places,
+                                     reviews=args.reviews, amenities=args.amenities)
+    db_path = args.db or datasets.default_path(args.scale)
+    app = make_app(
+        db_path,
+        BCRYPT_LOG_ROUNDS=args.bcrypt_rounds,
+        RESPONSE_CACHE_SIZE=1024 if args.cache else 0,
+        PASSWORD_HASH_WORKERS=args.hash_workers,
+    )
+    log = (lambda message: print(message, file=sys.stderr))
+    table_counts = datasets.prepare(app, counts, args.seed, args.reseed, log)
+
+    ctx = Context(app, random.Random(args.seed))
+    selected = [s for s in SCENARIOS
+                if not args.only or any(s.name.startswith(prefix) for prefix in args.only.split(','))]
+
+    server = None
+    if args.mode == 'http':
+        server = make_server('127.0.0.1', 0, app, threaded=True)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    results = {}
+    try:
+        for scenario in selected:
+            if args.mode == 'http':
+                results[scenario.name] = run_http(ctx, scenario, args.requests, args.warmup,
+                                                  args.threads, server.server_port)
+            else:
+                results[scenario.name] = run_client(ctx, scenario, args.requests, args.warmup)
+            log(f"{scenario.name:24} p50 {results[scenario.name]['p50_ms']:9.3f} ms  "
+                f"p99 {results[scenario.name]['p99_ms']:9.3f} ms  "
+                f"{results[scenario.name]['queries_per_request']:6.2f} queries")
+    finally:
+        if server is not None:
+            server.shutdown()
+        password_hasher.shutdown()
+
+    return {
+        'meta': {
+            'scale': args.scale,
+            'rows': table_counts,
+            'mode': args.mode,
+            'threads': args.threads if args.mode == 'http' else 1,
+            'requests': args.requests,
+            'warmup': args.warmup,
+            'cache': args.cache,
+            'bcrypt_rounds': args.bcrypt_rounds,
+            'revision': _git_revision(),
+            'python': platform.python_version(),
+            'sqlalchemy': sqlalchemy.__version__,
+            'started_at': datetime.utcnow().isoformat(timespec='seconds'),
+        },
+        'endpoints': results,
+    }
+
+
+def compare(report, baseline):
+    """Rows of (endpoint, metric, before, after, change %) for the shared endpoints."""
+    rows = []
+    for name, after in report['endpoints'].items():
+        before = baseline.get('endpoints', {}).get(name)
+        if not before:
+            continue
+        for metric in ('p50_ms', 'p95_ms', 'p99_ms', 'requests_per_second', 'queries_per_request'):
+            old, new = before.get(metric), after.get(metric)
+            if old is None or new is None:
+                continue
+            change = round((new - old) / old * 100, 1) if old else None
+            rows.append((name, metric, old, new, change))
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark every /api/v1 endpoint")
+    parser.add_argument('--scale', choices=sorted(datasets.SCALES), default='1k')
+    parser.add_argument('--db', help="SQLite file (default: benchmarks/data/bench-<scale>.db)")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--reseed', action='store_true', help="drop and reseed the dataset")
+    for table in ('users', 'places', 'reviews', 'amenities'):
+        parser.add_argument(f'--{table}', type=int, help=f"override the {table} count when seeding")
+    parser.add_argument('--mode', choices=('client', 'http'), default='client')
+    parser.add_argument('--threads', type=int, default=8, help="client threads in http mode")
+    parser.add_argument('--requests', type=int, default=200, help="timed requests per endpoint")
+    parser.add_argument('--warmup', type=int, default=10)
+    parser.add_argument('--only', help="comma-separated scenario name prefixes, e.g. places,reviews.get")
+    parser.add_argument('--cache', action='store_true', help="keep the response cache enabled")
+    parser.add_argument('--bcrypt-rounds', type=int, default=12)
+    parser.add_argument('--hash-workers', type=int, default=None,
+                        help="password hashing processes (default: one per CPU, 0 = inline)")
+    parser.add_argument('--output', help="write the JSON report here instead of stdout")
+    parser.add_argument('--compare', help="earlier JSON report to compare against")
+    args = parser.parse_args()
+
+    report = run(args)
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(text + '\n')
+    else:
+        print(text)
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        for name, metric, old, new, change in compare(report, baseline):
+            shown = 'n/a' if change is None else f'{change:+.1f}%'
+            print(f"{name:24} {metric:20} {old:>10} -> {new:>10}  {shown}", file=sys.stderr)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,95 @@
+"""
+Login throughput versus password-hashing workers.
+
+    python -m benchmarks.bench_login --threads 16 --logins 200 --rounds 10
+
+For every worker count (1, 2, 4 ... up to the CPU count) a fresh app is
+created, one user is registered, and `--threads` client threads post to
+/api/v1/auth/login until `--logins` logins have completed. Throughput
+should grow roughly linearly with workers until the cores run out.
+"""
+import argparse
+import json
+import os
+import threading
+import time
+
+from app import create_app
+from app.extensions import db, password_hasher
+from app.models.user import User
+from config import Config
+
+
+def worker_counts(limit):
+    count = 1
+    while count < limit:
+        yield count
+        count *= 2
+    yield limit
+
+
+def run(workers, threads, logins, rounds):
+    class BenchConfig(Config):
+        SQLALCHEMY_DATABASE_URI = 'sqlite://'
+        BCRYPT_LOG_ROUNDS = rounds
+        PASSWORD_HASH_WORKERS = workers
+        PASSWORD_HASH_MAX_PENDING = threads
+        RESPONSE_CACHE_SIZE = 0
+
+    app = create_app(BenchConfig)
+    with app.app_context():
+        db.create_all()
+        user = User("Bench", "User", "bench@example.com")
+        user.hash_password('secret')
+        db.session.add(user)
+        db.session.commit()
+
+    remaining = [logins]
+    lock = threading.Lock()
+    statuses = {}
+
+    def client_loop():
+        client = app.test_client()
+        while True:
+            with lock:
+                if remaining[0] <= 0:
+                    return
+                remaining[0] -= 1
+            response = client.post('/api/v1/auth/login',
+                                   json={'email': 'bench@example.com', 'password': 'secret'})
+            with lock:
+                statuses[response.status_code] = statuses.get(response.status_code, 0) + 1
+
+    pool = [threading.Thread(target=client_loop) for _ in range(threads)]
+    started = time.perf_counter()
+    for thread in pool:
+        thread.start()
+    for thread in pool:
+        thread.join()
+    elapsed = time.perf_counter() - started
+    password_hasher.shutdown()
+    return {
+        'workers': workers,
+        'threads': threads,
+        'logins': logins,
+        'seconds': round(elapsed, 3),
+        'logins_per_second': round(logins / elapsed, 1),
+        'statuses': statuses
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Login throughput per hashing worker count")
+    parser.add_argument('--threads', type=int, default=16)
+    parser.add_argument('--logins', type=int, default=200)
+    parser.add_argument('--rounds', type=int, default=10, help="bcrypt log rounds")
+    parser.add_argument('--max-workers', type=int, default=os.cpu_count() or 1)
+    args = parser.parse_args()
+
+    results = [run(0, args.threads, args.logins, args.rounds)]
+    results += [run(w, args.threads, args.logins, args.rounds) for w in worker_counts(args.max_workers)]
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,97 @@
+"""
+Price/box/sort queries over in-memory places: object scan vs columns.
+
+    python -m benchmarks.bench_place_filters --places 100000 --repeat 5
+
+Loads `--places` transient places into a plain InMemoryRepository (every
+query reads every place's attributes) and into InMemoryPlaceRepository
+(range filters and sorts read the price/latitude/longitude/average_rating
+columns), then times one page of 20 for each query:
+
+- price_range: 100 <= price <= 300, cheapest first
+- box_by_price: a latitude/longitude box, most expensive first
+- rated_newest: average_rating >= 4, newest first (walks the created_at order)
+
+The columns are timed with the array fallback and, when installed, NumPy.
+Reports the best of `--repeat` runs in milliseconds.
+"""
+import argparse
+import json
+import random
+import time
+
+from app.models.place import Place
+from app.models.user import User
+from app.persistence import columns
+from app.persistence.query import Query
+from app.persistence.repository import InMemoryRepository
+from app.services.repositories.place_repository import InMemoryPlaceRepository
+
+QUERIES = {
+    'price_range': (('price',), [('price', '>=', 100.0), ('price', '<=', 300.0)]),
+    'box_by_price': (('-price',), [('latitude', '>=', 10.0), ('latitude', '<=', 30.0),
+                                   ('longitude', '>=', -20.0), ('longitude', '<=', 40.0)]),
+    'rated_newest': (('-created_at',), [('average_rating', '>=', 4.0)]),
+}
+
+
+def build_places(count, rng_seed=0):
+    rng = random.Random(rng_seed)
+    owners = [User(f"First{i}", f"Last{i}", f"user{i}@bench.example.com") for i in range(50)]
+    places = []
+    for i in range(count):
+        place = Place(f"Place {i}", "", float(rng.randrange(20, 1000)),
+                      rng.uniform(-60, 60), rng.uniform(-180, 180), rng.choice(owners))
+        place.review_count = rng.randrange(0, 20)
+        place.rating_sum = sum(rng.randint(1, 5) for _ in range(place.review_count))
+        places.append(place)
+    return places
+
+
+def run(repo, order_by, filters):
+    query = Query(order_by=order_by, limit=20)
+    for f in filters:
+        query.where(*f)
+    return [place.id for place in repo.find(query)]
+
+
+def best_of(repo, order_by, filters, repeat):
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        run(repo, order_by, filters)
+        timings.append(time.perf_counter() - started)
+    return round(min(timings) * 1000, 2)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="In-memory place queries: object scan vs columns")
+    parser.add_argument('--places', type=int, default=100_000)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    places = build_places(args.places)
+    scanned, columnar = InMemoryRepository(), InMemoryPlaceRepository()
+    for place in places:
+        scanned.add(place)
+        columnar.add(place)
+
+    numpy = columns.np
+    paths = [('object_scan', scanned, None), ('columns+array', columnar, None)]
+    if numpy is not None:
+        paths.append(('columns+numpy', columnar, numpy))
+
+    results = {}
+    for name, (order_by, filters) in QUERIES.items():
+        # Every path returns the same page
+        assert run(scanned, order_by, filters) == run(columnar, order_by, filters)
+        results[name] = {}
+        for path, repo, backend in paths:
+            columns.np = backend
+            results[name][path] = best_of(repo, order_by, filters, args.repeat)
+        columns.np = numpy
+    print(json.dumps({'places': args.places, 'ms_per_page_of_20': results}, indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,135 @@
+"""
+Serialization cost per 1k places, before and after compiled serializers.
+
+    python -m benchmarks.bench_serialize --places 1000 --repeat 7
+
+Builds `--places` transient places (owner, amenities, reviews; no database
+involved) and times rendering them to JSON bytes three ways:
+
+- marshal: the old path, a hand-built dict per place run through
+  flask-restx `marshal` and encoded with the stdlib json module
+- compiled+json: the compiled serializer, stdlib json
+- compiled+orjson: the compiled serializer, orjson (what the API does)
+
+Reports the best of `--repeat` runs in milliseconds per 1k places.
+"""
+import argparse
+import json
+import random
+import time
+
+from flask_restx import marshal
+
+from app import create_app
+from app.api import serializers
+from app.api.v1.places import place_output
+from app.models.amenity import Amenity
+from app.models.place import Place
+from app.models.review import Review
+from app.models.user import User
+from benchmarks.datasets import ADJECTIVES, FEATURES, NOUNS
+from config import Config
+
+
+def build_places(count, amenities_per_place=4, reviews_per_place=5, rng_seed=0):
+    rng = random.Random(rng_seed)
+    owners = [User(f"First{i}", f"Last{i}", f"user{i}@bench.example.com") for i in range(50)]
+    amenities = [Amenity(f"Amenity {i}") for i in range(30)]
+    places = []
+    for _ in range(count):
+        place = Place(f"{rng.choice(ADJECTIVES).title()} {rng.choice(NOUNS)}",
+                      f"A {rng.choice(NOUNS)} with {rng.choice(FEATURES)}.",
+                      float(rng.randrange(20, 1000)), rng.uniform(-60, 60), rng.uniform(-180, 180),
+                      rng.choice(owners))
+        place.amenities = rng.sample(amenities, amenities_per_place)
+        ratings = [rng.randint(1, 5) for _ in range(reviews_per_place)]
+        for rating in ratings:
+            Review(f"{rng.choice(ADJECTIVES).title()} stay.", rating, place, rng.choice(owners))
+        place.review_count = len(ratings)
+        place.rating_sum = sum(ratings)
+        for star in range(1, 6):
+            setattr(place, f'rating_{star}', ratings.count(star))
+        places.append(place)
+    return places
+
+
+def legacy_serialize_place(place):
+    # The hand-written dict the places API built before the compiled serializers
+    return {
+        'id': place.id,
+        'title': place.title,
+        'description': place.description,
+        'price': place.price,
+        'latitude': place.latitude,
+        'longitude': place.longitude,
+        'review_count': place.review_count,
+        'average_rating': place.average_rating,
+        'rating_histogram': place.rating_histogram,
+        'owner': {
+            'id': place.owner.id,
+            'first_name': place.owner.first_name,
+            'last_name': place.owner.last_name,
+            'email': place.owner.email
+        },
+        'amenities': [{'id': a.id, 'name': a.name} for a in place.amenities],
+        'reviews': [{'id': r.id, 'text': r.text, 'rating': r.rating, 'user_id': r.user_id}
+                    for r in place.reviews]
+    }
+
+
+def render_marshal(places):
+    return json.dumps(marshal([legacy_serialize_place(p) for p in places], place_output)).encode('utf-8')
+
+
+def render_compiled_json(places):
+    serialize = serializers.compile_serializer(place_output)
+    return json.dumps([serialize(p) for p in places], separators=(',', ':')).encode('utf-8')
+
+
+def render_compiled_orjson(places):
+    serialize = serializers.compile_serializer(place_output)
+    return serializers.encode([serialize(p) for p in places])
+
+
+def best_of(func, places, repeat):
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func(places)
+        timings.append(time.perf_counter() - started)
+    return min(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serialization cost per 1k places")
+    parser.add_argument('--places', type=int, default=1000)
+    parser.add_argument('--reviews', type=int, default=5, help="reviews per place")
+    parser.add_argument('--amenities', type=int, default=4, help="amenities per place")
+    parser.add_argument('--repeat', type=int, default=7)
+    args = parser.parse_args()
+
+    class BenchConfig(Config):
+        SQLALCHEMY_DATABASE_URI = 'sqlite://'
+        SCHEMA_CHECK_ON_STARTUP = False
+
+    with create_app(BenchConfig).app_context():
+        places = build_places(args.places, args.amenities, args.reviews)
+        # The same document whichever way it is rendered
+        assert json.loads(render_marshal(places)) == json.loads(render_compiled_orjson(places))
+
+        paths = [('marshal', render_marshal), ('compiled+json', render_compiled_json)]
+        if serializers.orjson is not None:
+            paths.append(('compiled+orjson', render_compiled_orjson))
+        per_1k = 1000 / args.places
+        results = {name: round(best_of(func, places, args.repeat) * 1000 * per_1k, 2)
+                   for name, func in paths}
+    baseline = results['marshal']
+    print(json.dumps({
+        'places': args.places,
+        'ms_per_1k_places': results,
+        'speedup': {name: round(baseline / ms, 2) for name, ms in results.items()},
+    }, indent=2))
+
+
+if __name__ == '__main__':
+    main()
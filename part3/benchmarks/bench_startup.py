@@ -0,0 +1,112 @@
+"""
+Cold start: from `import app` to the first request served.
+
+    python -m benchmarks.bench_startup --runs 10 --output startup.json
+    python -m benchmarks.bench_startup --compare startup.json
+
+Every run is a fresh interpreter (a new worker), timed in phases:
+
+- import: `from app import create_app`
+- create_app: extensions, engine, namespaces
+- schema: create_all on an in-memory SQLite database
+- first_request: GET /api/v1/places/, which builds the facade
+- total: all of the above
+
+Reports the median and minimum of each phase in milliseconds.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+PHASES = ('import', 'create_app', 'schema', 'first_request', 'total')
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def child(path):
+    started = time.perf_counter()
+    marks = [started]
+    from app import create_app
+    from app.extensions import db
+    from config import Config
+    marks.append(time.perf_counter())
+
+    class BenchConfig(Config):
+        SQLALCHEMY_DATABASE_URI = 'sqlite://'
+        SCHEMA_CHECK_ON_STARTUP = False
+        RESPONSE_CACHE_SIZE = 0
+
+    app = create_app(BenchConfig)
+    marks.append(time.perf_counter())
+    with app.app_context():
+        db.create_all()
+    marks.append(time.perf_counter())
+    status = app.test_client().get(path).status_code
+    marks.append(time.perf_counter())
+
+    timings = {phase: (end - start) * 1000 for phase, start, end in zip(PHASES, marks, marks[1:])}
+    timings['total'] = (marks[-1] - started) * 1000
+    timings['status'] = status
+    print(json.dumps(timings))
+
+
+def run(runs, path):
+    samples = []
+    for _ in range(runs):
+        output = subprocess.run(
+            [sys.executable, '-m', 'benchmarks.bench_startup', '--child', '--path', path],
+            cwd=ROOT, capture_output=True, text=True, check=True
+        ).stdout
+        samples.append(json.loads(output.strip().splitlines()[-1]))
+    statuses = sorted({sample['status'] for sample in samples})
+    return {
+        'runs': runs,
+        'path': path,
+        'statuses': statuses,
+        'phases': {
+            phase: {
+                'median_ms': round(statistics.median(s[phase] for s in samples), 1),
+                'min_ms': round(min(s[phase] for s in samples), 1),
+            }
+            for phase in PHASES
+        },
+    }
+
+
+def compare(base, report):
+    print(f"{'phase':<15}{'base ms':>10}{'now ms':>10}{'change':>9}")
+    for phase in PHASES:
+        before = base['phases'][phase]['median_ms']
+        after = report['phases'][phase]['median_ms']
+        change = (after - before) / before * 100 if before else 0.0
+        print(f"{phase:<15}{before:>10.1f}{after:>10.1f}{change:>+8.1f}%")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Time from import to the first request served")
+    parser.add_argument('--runs', type=int, default=10)
+    parser.add_argument('--path', default='/api/v1/places/', help="first request")
+    parser.add_argument('--output', help="write the JSON report here")
+    parser.add_argument('--compare', help="a previous JSON report to diff against")
+    parser.add_argument('--child', action='store_true', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        child(args.path)
+        return
+
+    report = run(args.runs, args.path)
+    print(json.dumps(report, indent=2))
+    if args.output:
+        with open(args.output, 'w') as stream:
+            json.dump(report, stream, indent=2)
+    if args.compare:
+        with open(args.compare) as stream:
+            compare(json.load(stream), report)
+
+
+if __name__ == '__main__':
+    main()
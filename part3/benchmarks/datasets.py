@@ -0,0 +1,226 @@
+"""
+Synthetic, reproducible datasets for the benchmarks.
+
+    python -m benchmarks.datasets --scale 100k
+
+Rows are generated from a seeded RNG and written with Core executemany
+in chunks, straight into a migrated SQLite file, so even the 1M scale
+seeds in minutes rather than hours. Places cluster around a few dozen
+cities so geo queries have realistic densities, and titles/descriptions
+draw from small vocabularies so text search has hits.
+"""
+import argparse
+import os
+import random
+import time
+import uuid
+from datetime import datetime, timedelta
+
+from sqlalchemy import func, insert, select
+
+from app.extensions import bcrypt, db
+from app.models.amenity import Amenity
+from app.models.place import Place
+from app.models.place_amenity import place_amenity
+from app.models.review import Review
+from app.models.user import User
+from app.persistence import geo, migrations
+from app.services import facade
+
+# users / places / reviews per scale; amenities stay a small catalog
+SCALES = {
+    '1k': {'users': 1_000, 'places': 1_000, 'reviews': 1_000, 'amenities': 50},
+    '100k': {'users': 100_000, 'places': 100_000, 'reviews': 100_000, 'amenities': 100},
+    '1m': {'users': 1_000_000, 'places': 1_000_000, 'reviews': 1_000_000, 'amenities': 100},
+}
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data')
+CHUNK_SIZE = 10_000
+BENCH_PASSWORD = 'bench-password'
+ADMIN_EMAIL = 'admin@bench.example.com'
+USER_EMAIL = 'user@bench.example.com'
+
+CITIES = [
+    (48.8566, 2.3522), (51.5074, -0.1278), (40.7128, -74.0060), (34.0522, -118.2437),
+    (35.6762, 139.6503), (-33.8688, 151.2093), (24.7136, 46.6753), (25.2048, 55.2708),
+    (41.9028, 12.4964), (52.5200, 13.4050), (40.4168, -3.7038), (55.7558, 37.6173),
+    (-23.5505, -46.6333), (19.4326, -99.1332), (1.3521, 103.8198), (37.5665, 126.9780),
+    (30.0444, 31.2357), (-1.2921, 36.8219), (43.6532, -79.3832), (-17.7134, 179.9990),
+]
+ADJECTIVES = ['sunny', 'cozy', 'quiet', 'modern', 'rustic', 'bright', 'spacious', 'charming',
+              'central', 'luxury', 'budget', 'historic', 'seaside', 'garden', 'family']
+NOUNS = ['loft', 'studio', 'cabin', 'villa', 'apartment', 'cottage', 'house', 'suite',
+         'bungalow', 'penthouse', 'room', 'chalet', 'townhouse', 'flat', 'farmhouse']
+FEATURES = ['river views', 'a balcony', 'fast wifi', 'free parking', 'a pool', 'a fireplace',
+            'a terrace', 'a full kitchen', 'sea views', 'a garden', 'a gym', 'air conditioning']
+AMENITY_NAMES = ['Wi-Fi', 'Pool', 'Parking', 'Kitchen', 'Washer', 'Dryer', 'Heating',
+                 'Air conditioning', 'Gym', 'Hot tub', 'Workspace', 'TV', 'Fireplace',
+                 'Balcony', 'Garden', 'Elevator', 'Crib', 'EV charger', 'BBQ grill', 'Sauna']
+
+
+def resolve_counts(scale=None, **overrides):
+    counts = dict(SCALES[scale or '1k'])
+    counts.update({key: value for key, value in overrides.items() if value is not None})
+    return counts
+
+
+def default_path(scale):
+    return os.path.join(DATA_DIR, f'bench-{scale}.db')
+
+
+def _chunks(rows, size=CHUNK_SIZE):
+    chunk = []
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) == size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def _timestamp(rng, now):
+    # Spread over the past year so (created_at, id) pages are realistic
+    return now - timedelta(seconds=rng.randrange(365 * 24 * 3600))
+
+
+def _uuid(rng):
+    return str(uuid.UUID(int=rng.getrandbits(128), version=4))
+
+
+def seed(counts, rng_seed=0, log=print):
+    """
+    Fill the current app's (empty, migrated) database with `counts` rows.
+    Returns the seconds spent per table.
+    """
+    rng = random.Random(rng_seed)
+    now = datetime.utcnow()
+    password = bcrypt.generate_password_hash(BENCH_PASSWORD).decode('utf-8')
+    timings = {}
+
+    def write(name, table, rows):
+        started = time.perf_counter()
+        for chunk in _chunks(rows):
+            db.session.execute(insert(table), chunk)
+            db.session.commit()
+        timings[name] = round(time.perf_counter() - started, 2)
+        log(f"seeded {name} in {timings[name]}s")
+
+    def users():
+        for email, is_admin in ((ADMIN_EMAIL, True), (USER_EMAIL, False)):
+            created = _timestamp(rng, now)
+            yield {'id': _uuid(rng), 'first_name': 'Bench', 'last_name': 'User', 'email': email,
+                   'password': password, 'is_admin': is_admin,
+                   'created_at': created, 'updated_at': created}
+        for i in range(counts['users'] - 2):
+            created = _timestamp(rng, now)
+            yield {'id': _uuid(rng), 'first_name': f'First{i}', 'last_name': f'Last{i}',
+                   'email': f'user{i}@bench.example.com', 'password': password,
+                   'is_admin': False, 'created_at': created, 'updated_at': created}
+
+    user_ids = []
+
+    def remember_users():
+        for row in users():
+            user_ids.append(row['id'])
+            yield row
+
+    write('users', User.__table__, remember_users())
+
+    amenity_ids = [_uuid(rng) for _ in range(counts['amenities'])]
+    write('amenities', Amenity.__table__, (
+        {'id': amenity_id, 'name': f'{AMENITY_NAMES[i % len(AMENITY_NAMES)]} {i // len(AMENITY_NAMES) or ""}'.strip(),
+         'created_at': now, 'updated_at': now}
+        for i, amenity_id in enumerate(amenity_ids)
+    ))
+
+    place_ids = []
+
+    def places():
+        for _ in range(counts['places']):
+            latitude, longitude = rng.choice(CITIES)
+            latitude = max(-90.0, min(90.0, latitude + rng.gauss(0, 0.2)))
+            longitude = (longitude + rng.gauss(0, 0.2) + 180.0) % 360.0 - 180.0
+            created = _timestamp(rng, now)
+            place_id = _uuid(rng)
+            place_ids.append(place_id)
+            yield {
+                'id': place_id, 'created_at': created, 'updated_at': created,
+                'title': f'{rng.choice(ADJECTIVES).title()} {rng.choice(NOUNS)}',
+                'description': f'A {rng.choice(ADJECTIVES)} {rng.choice(NOUNS)} with '
+                               f'{rng.choice(FEATURES)} and {rng.choice(FEATURES)}.',
+                'price': float(rng.randrange(20, 1000)),
+                'latitude': latitude, 'longitude': longitude,
+                'geohash': geo.encode(latitude, longitude),
+                'user_id': rng.choice(user_ids),
+            }
+
+    write('places', Place.__table__, places())
+
+    def links():
+        for place_id in place_ids:
+            for amenity_id in rng.sample(amenity_ids, min(len(amenity_ids), rng.randrange(1, 8))):
+                yield {'place_id': place_id, 'amenity_id': amenity_id}
+
+    write('place_amenity', place_amenity, links())
+
+    def reviews():
+        for _ in range(counts['reviews']):
+            created = _timestamp(rng, now)
+            yield {'id': _uuid(rng), 'created_at': created, 'updated_at': created,
+                   'rating': rng.randint(1, 5), 'comment': f'{rng.choice(ADJECTIVES).title()} stay.',
+                   'user_id': rng.choice(user_ids), 'place_id': rng.choice(place_ids)}
+
+    write('reviews', Review.__table__, reviews())
+
+    started = time.perf_counter()
+    facade.rebuild_rating_aggregates()
+    timings['rating_aggregates'] = round(time.perf_counter() - started, 2)
+    return timings
+
+
+def table_counts():
+    return {
+        'users': db.session.scalar(select(func.count()).select_from(User)),
+        'places': db.session.scalar(select(func.count()).select_from(Place)),
+        'reviews': db.session.scalar(select(func.count()).select_from(Review)),
+        'amenities': db.session.scalar(select(func.count()).select_from(Amenity)),
+    }
+
+
+def prepare(app, counts, rng_seed=0, reseed=False, log=print):
+    """
+    Make sure the app's database holds a seeded dataset: migrate it and seed
+    it when it is empty (or `reseed` is set). Returns the table counts.
+    """
+    with app.app_context():
+        if reseed:
+            db.drop_all()
+            with db.engine.begin() as connection:
+                connection.exec_driver_sql("DROP TABLE IF EXISTS schema_migrations")
+        migrations.upgrade()
+        if table_counts()['users'] == 0:
+            seed(counts, rng_seed, log)
+        return table_counts()
+
+
+def main():
+    from benchmarks.bench_api import make_app
+
+    parser = argparse.ArgumentParser(description="Seed a benchmark database")
+    parser.add_argument('--scale', choices=sorted(SCALES), default='1k')
+    parser.add_argument('--db', help="SQLite file (default: benchmarks/data/bench-<scale>.db)")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--reseed', action='store_true')
+    for table in ('users', 'places', 'reviews', 'amenities'):
+        parser.add_argument(f'--{table}', type=int, help=f"override the {table} count")
+    args = parser.parse_args()
+
+    counts = resolve_counts(args.scale, users=args.users, places=args.places,
+                            reviews=args.reviews, amenities=args.amenities)
+    app = make_app(args.db or default_path(args.scale))
+    print(prepare(app, counts, args.seed, args.reseed))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,48 @@
+"""
+Bulk-load users, amenities, places or reviews from NDJSON or CSV files.
+
+    python import_data.py users users.ndjson
+    python import_data.py places places.csv --chunk-size 10000
+
+Import in dependency order (users and amenities before places, places
+before reviews). The report is printed as JSON.
+"""
+import argparse
+import json
+import os
+import sys
+
+from app import create_app
+from app.persistence import migrations
+from app.services import facade
+from app.services.bulk_import import FORMATS, KINDS, read_rows
+from config import config
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('kind', choices=KINDS)
+    parser.add_argument('path', help="NDJSON or CSV file ('-' for stdin)")
+    parser.add_argument('--format', choices=FORMATS,
+                        help="defaults to the file extension, else ndjson")
+    parser.add_argument('--chunk-size', type=int, default=5000)
+    parser.add_argument('--config', default='default', choices=sorted(config))
+    args = parser.parse_args(argv)
+
+    fmt = args.format or ('csv' if args.path.endswith('.csv') else 'ndjson')
+    app = create_app(config[args.config])
+    with app.app_context():
+        migrations.upgrade()
+        if args.path == '-':
+            report = facade.bulk_import(args.kind, read_rows(sys.stdin, fmt), args.chunk_size)
+        else:
+            with open(args.path, newline='', encoding='utf-8') as stream:
+                report = facade.bulk_import(args.kind, read_rows(stream, fmt), args.chunk_size)
+
+    json.dump(report.to_dict(), sys.stdout, indent=2)
+    sys.stdout.write(os.linesep)
+    return 0 if not report.failed else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
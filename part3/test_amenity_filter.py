@@ -0,0 +1,72 @@
+# test_amenity_filter.py
+
+from app.extensions import db
+from app.models.user import User
+from conftest import make_places
+
+
+def seed_amenity_places(repo_add):
+    from app.models.amenity import Amenity
+    owner = User("Amenity", "Owner", "amenity@example.com")
+    wifi, pool, parking = Amenity("Wi-Fi"), Amenity("Pool"), Amenity("Parking")
+    places = make_places(owner, 6)
+    for i, place in enumerate(places):
+        place.add_amenity(wifi)
+        if i % 2 == 0:
+            place.add_amenity(pool)
+        if i % 3 == 0:
+            place.add_amenity(parking)
+        repo_add(place)
+    return places, (wifi, pool, parking)
+
+
+def test_in_memory_amenity_bitmap():
+    from app.persistence.query import Query
+    from app.services.repositories.place_repository import InMemoryPlaceRepository
+
+    repo = InMemoryPlaceRepository()
+    places, (wifi, pool, parking) = seed_amenity_places(repo.add)
+    ids = [place.id for place in places]
+
+    def having(*amenity_ids, **window):
+        return repo.find(Query(**window).where('amenities', 'all', amenity_ids))
+
+    assert having(wifi.id, pool.id).items == places[0::2]
+    assert [p.id for p in having(pool.id, parking.id)] == [ids[0]]
+
+    page = having(pool.id, limit=2)
+    assert [p.id for p in page] == ids[0:4:2]
+    page = having(pool.id, limit=2, after=page.next_cursor)
+    assert [p.id for p in page] == [ids[4]] and page.next_cursor is None
+
+    # Re-adding after add_amenity / removal keeps the bits in sync, and
+    # freed row numbers are reused
+    places[1].add_amenity(parking)
+    repo.add(places[1])
+    assert {p.id for p in having(parking.id)} == {ids[0], ids[1], ids[3]}
+    repo.delete(ids[0])
+    assert having(pool.id, parking.id).items == []
+    repo.add(places[0])
+    assert repo._amenities._rows[ids[0]] == 0
+    assert having('missing').items == []
+
+
+def test_places_endpoint_amenity_filter(app):
+    with app.app_context():
+        places, amenities = seed_amenity_places(db.session.add)
+        db.session.commit()
+        ids = [place.id for place in places]
+        wifi, pool, parking = (amenity.id for amenity in amenities)
+
+    client = app.test_client()
+    response = client.get(f'/api/v1/places/?amenities={wifi},{pool}')
+    assert [p['id'] for p in response.json] == ids[0::2]
+    response = client.get(f'/api/v1/places/?amenities={pool},{parking}')
+    assert [p['id'] for p in response.json] == [ids[0]]
+
+    response = client.get(f'/api/v1/places/?amenities={pool}&limit=2')
+    assert [p['id'] for p in response.json] == ids[0:4:2]
+    next_url = response.headers['Link'].split('>')[0].lstrip('<')
+    response = client.get(next_url)
+    assert [p['id'] for p in response.json] == [ids[4]]
+    assert client.get('/api/v1/places/?amenities=missing').json == []
@@ -0,0 +1,18 @@
+# test_app.py
+
+from conftest import make_app
+
+
+def test_one_lazy_facade_per_app():
+    from app.api.v1 import auth, users
+    from app.services import facade, get_facade
+
+    first, second = make_app(), make_app()
+    assert first.extensions['services']._facade is None  # nothing built yet
+    with first.app_context():
+        built = get_facade()
+        assert users.facade.user_repo is auth.facade.user_repo is built.user_repo
+        assert facade._get_current_object() is built
+    with second.app_context():
+        assert get_facade() is not built
+    assert first.extensions['services']._facade is built
@@ -0,0 +1,120 @@
+# test_bulk_io.py
+
+from datetime import datetime, timedelta
+
+from app.extensions import db
+from app.models.user import User
+from conftest import make_places
+
+
+def test_bulk_import_users_places_reviews(app):
+    import io
+    import json
+    from app.models.review import Review
+    from app.services import facade
+    from app.services.bulk_import import read_rows
+
+    with app.app_context():
+        users = "\n".join([
+            json.dumps({'id': 'u1', 'first_name': 'A', 'last_name': 'B',
+                        'email': 'a@example.com', 'password': 'secret'}),
+            json.dumps({'id': 'u2', 'first_name': 'C', 'last_name': 'D',
+                        'email': 'c@example.com', 'password_hash': '$2b$04$x'}),
+            json.dumps({'first_name': 'E', 'last_name': 'F', 'email': 'a@example.com',
+                        'password_hash': 'x'}),
+            "{not json",
+        ])
+        report = facade.bulk_import('users', read_rows(io.StringIO(users), 'ndjson'), chunk_size=2)
+        assert report.inserted == 2
+        assert {e['line'] for e in report.errors} == {3, 4}
+        assert facade.get_user('u1').password.startswith('$2b$')
+
+        amenities = "id,name\nwifi,Wi-Fi\npool,Pool\n"
+        assert facade.bulk_import('amenities', read_rows(io.StringIO(amenities), 'csv')).inserted == 2
+
+        places = (
+            "id,title,price,latitude,longitude,owner_id,amenities\n"
+            "p1,Loft,100,48.85,2.35,u1,wifi;pool\n"
+            "p2,Cabin,80,91,0,u1,\n"
+            "p3,Hut,20,10,10,nobody,\n"
+        )
+        report = facade.bulk_import('places', read_rows(io.StringIO(places), 'csv'))
+        assert report.inserted == 1
+        assert {e['line'] for e in report.errors} == {3, 4}
+        place = facade.get_place('p1')
+        assert place.geohash and sorted(a.name for a in place.amenities) == ['Pool', 'Wi-Fi']
+
+        reviews = io.StringIO("\n".join(json.dumps(row) for row in [
+            {'text': 'Great', 'rating': 5, 'user_id': 'u1', 'place_id': 'p1'},
+            {'text': 'Meh', 'rating': 3, 'user_id': 'u2', 'place_id': 'p1'},
+            {'text': 'Bad', 'rating': 9, 'user_id': 'u2', 'place_id': 'p1'},
+            {'text': 'Fractional', 'rating': 4.7, 'user_id': 'u2', 'place_id': 'p1'},
+        ]))
+        report = facade.bulk_import('reviews', read_rows(reviews, 'ndjson'))
+        assert (report.inserted, report.failed) == (2, 2)
+        assert "whole number" in report.errors[-1]['error']
+        db.session.expire_all()
+        assert Review.query.count() == 2
+        assert (place.review_count, place.rating_sum) == (2, 8)
+        assert place.rating_histogram == [0, 0, 1, 0, 1]
+
+
+def test_admin_import_endpoint(app):
+    from flask_jwt_extended import create_access_token
+
+    with app.app_context():
+        admin = create_access_token(identity={'id': 'admin', 'is_admin': True})
+        user = create_access_token(identity={'id': 'user', 'is_admin': False})
+
+    client = app.test_client()
+    body = '{"name": "Wi-Fi"}\n{"name": ""}\n'
+    response = client.post('/api/v1/admin/import/amenities', data=body,
+                           headers={'Authorization': f'Bearer {admin}'})
+    assert response.status_code == 200
+    assert (response.json['inserted'], response.json['failed']) == (1, 1)
+
+    response = client.post('/api/v1/admin/import/amenities', data=body,
+                           headers={'Authorization': f'Bearer {user}'})
+    assert response.status_code == 403
+
+
+def test_ndjson_export_streams_in_update_order(app):
+    import json
+    from flask_jwt_extended import create_access_token
+    from app.models.amenity import Amenity
+    from app.models.review import Review
+
+    with app.app_context():
+        owner = User("Ann", "Lee", "ann@example.com")
+        wifi = Amenity("Wi-Fi")
+        places = make_places(owner, 5)
+        places[0].add_amenity(wifi)
+        for i, place in enumerate(places):
+            place.updated_at = datetime(2025, 2, 1) + timedelta(minutes=i)
+        Review("Nice", 4, places[0], owner)
+        db.session.add_all(places)
+        db.session.commit()
+        ids = [place.id for place in places]
+        owner_id, wifi_id = owner.id, wifi.id
+        cutoff = places[3].updated_at.isoformat()
+        admin = create_access_token(identity={'id': 'admin', 'is_admin': True})
+
+    client = app.test_client()
+    headers = {'Authorization': f'Bearer {admin}'}
+    response = client.get('/api/v1/export/places?chunk_size=2', headers=headers)
+    assert response.status_code == 200
+    assert response.mimetype == 'application/x-ndjson'
+    rows = [json.loads(line) for line in response.data.decode().splitlines()]
+    assert [row['id'] for row in rows] == ids
+    assert rows[0]['amenities'] == [wifi_id] and rows[1]['amenities'] == []
+    assert rows[0]['owner_id'] == owner_id
+
+    response = client.get(f'/api/v1/export/places?since={cutoff}', headers=headers)
+    assert [json.loads(line)['id'] for line in response.data.decode().splitlines()] == ids[3:]
+
+    response = client.get('/api/v1/export/reviews', headers=headers)
+    (review,) = [json.loads(line) for line in response.data.decode().splitlines()]
+    assert (review['text'], review['rating']) == ('Nice', 4)
+
+    assert client.get('/api/v1/export/places?since=yesterday',
+                      headers=headers).status_code == 400
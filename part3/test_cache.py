@@ -0,0 +1,62 @@
+# test_cache.py
+
+from app.extensions import db
+from app.models.user import User
+from app.models.place import Place
+
+
+def test_response_cache_etag_and_invalidation(app):
+    from flask_jwt_extended import create_access_token
+    from app.services import facade
+
+    with app.app_context():
+        owner = User("Cache", "Owner", "cache@example.com")
+        place = Place("Cached", "", 10.0, 0.0, 0.0, owner)
+        db.session.add(place)
+        db.session.commit()
+        place_id, owner_id = place.id, owner.id
+        admin = create_access_token(identity={'id': owner.id, 'is_admin': True})
+
+    cache = app.extensions['response_cache']
+    client = app.test_client()
+    url = f'/api/v1/places/{place_id}'
+    first = client.get(url)
+    etag = first.headers['ETag']
+    assert client.get(url).json == first.json
+    assert (cache.hits, cache.misses) == (1, 1)
+
+    assert client.get(url, headers={'If-None-Match': etag}).status_code == 304
+    assert client.get(url + '?x=1').status_code == 200  # query string is part of the key
+    assert cache.misses == 2
+
+    with app.app_context():
+        facade.update_place(place_id, {'title': 'Renamed'})
+    refreshed = client.get(url, headers={'If-None-Match': etag})
+    assert refreshed.status_code == 200
+    assert refreshed.json['title'] == 'Renamed' and refreshed.headers['ETag'] != etag
+
+    # User writes leave entries that do not depend on users alone
+    client.get('/api/v1/amenities/')
+    with app.app_context():
+        facade.update_user(owner_id, {'first_name': 'Renamed'})
+    hits = cache.hits
+    assert client.get('/api/v1/amenities/').status_code == 200 and cache.hits == hits + 1
+    with app.app_context():
+        facade.create_amenity({'name': 'Sauna'})
+    assert [a['name'] for a in client.get('/api/v1/amenities/').json] == ['Sauna']
+
+    stats = client.get('/api/v1/admin/cache', headers={'Authorization': f'Bearer {admin}'}).json
+    assert stats['enabled'] and stats['invalidations'] >= 2
+
+
+def test_response_cache_lru_bound():
+    from app.api.cache import ResponseCache
+    cache = ResponseCache(max_entries=2)
+    cache.put('/a', b'a', {}, ('places',))
+    cache.put('/b', b'b', {}, ('places',))
+    cache.get('/a')
+    cache.put('/c', b'c', {}, ('amenities',))
+    assert cache.get('/b') is None and cache.get('/a') is not None
+    assert cache.stats()['evictions'] == 1
+    cache.invalidate(('amenities',))
+    assert cache.get('/c') is None and cache.get('/a') is not None
@@ -0,0 +1,42 @@
+# test_engine.py
+
+from app import create_app
+from app.extensions import db
+from conftest import TestConfig
+
+
+def test_engine_tuning_on_sqlite_file(tmp_path):
+    from flask_jwt_extended import create_access_token
+    from sqlalchemy.exc import OperationalError
+    from app.persistence.engine import TimedQueuePool, pool_stats
+
+    class FileConfig(TestConfig):
+        SQLALCHEMY_DATABASE_URI = f"sqlite:///{tmp_path / 'tuned.db'}"
+        DB_STATEMENT_TIMEOUT_MS = 200
+
+    app = create_app(FileConfig)
+    with app.app_context():
+        assert isinstance(db.engine.pool, TimedQueuePool)
+        pool_stats.reset()
+        with db.engine.connect() as connection:
+            pragma = lambda name: connection.exec_driver_sql(f"PRAGMA {name}").scalar()
+            assert (pragma('journal_mode'), pragma('synchronous'), pragma('busy_timeout')) == \
+                ('wal', 1, 5000)
+            try:
+                connection.exec_driver_sql(
+                    "WITH RECURSIVE n(i) AS (SELECT 1 UNION ALL SELECT i + 1 FROM n) "
+                    "SELECT count(*) FROM n"
+                ).scalar()
+                assert False
+            except OperationalError as e:
+                assert 'interrupted' in str(e)
+            # The deadline is per statement
+            assert connection.exec_driver_sql("SELECT 1").scalar() == 1
+        admin = create_access_token(identity={'id': 'admin', 'is_admin': True})
+
+    response = app.test_client().get('/api/v1/admin/db-pool',
+                                     headers={'Authorization': f'Bearer {admin}'})
+    assert response.json['pool'] == 'TimedQueuePool'
+    assert response.json['checkouts'] >= 1 and response.json['size'] == 5
+    with app.app_context():
+        db.engine.dispose()
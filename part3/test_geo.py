@@ -0,0 +1,82 @@
+# test_geo.py
+
+from app.extensions import db
+from app.models.user import User
+from app.models.place import Place
+
+
+def test_geohash_and_cover():
+    from app.persistence import geo
+    assert geo.encode(57.64911, 10.40744, 11) == "u4pruydqqvj"
+    assert geo.encode(-25.382708, -49.265506, 6) == "6gkzwg"
+
+    box = geo.bounding_box(48.8566, 2.3522, 5)
+    prefixes = geo.cover(box)
+    assert 0 < len(prefixes) <= 16
+    assert any(geo.encode(48.87, 2.33).startswith(p) for p in prefixes)
+
+    # Boxes crossing the antimeridian are split in two longitude spans
+    wrapped = geo.bounding_box(0.0, 179.99, 10)
+    assert wrapped[1] > wrapped[3]
+    assert geo.box_contains(wrapped, 0.0, -179.99)
+
+
+def seed_cities(repo_add):
+    owner = User("Geo", "Owner", "geo@example.com")
+    cities = {
+        'louvre': (48.8606, 2.3376),
+        'eiffel': (48.8584, 2.2945),
+        'versailles': (48.8049, 2.1204),
+        'london': (51.5074, -0.1278),
+        'fiji': (-17.7134, 179.9990),
+        'samoa': (-17.7000, -179.9990),
+    }
+    places = {}
+    for name, (lat, lon) in cities.items():
+        places[name] = Place(name, "", 10.0, lat, lon, owner)
+        repo_add(places[name])
+    return places
+
+
+def test_in_memory_grid_nearby():
+    from app.persistence import geo
+    from app.services.repositories.place_repository import InMemoryPlaceRepository
+
+    repo = InMemoryPlaceRepository()
+    places = seed_cities(repo.add)
+    box = geo.bounding_box(48.8566, 2.3522, 10)
+    ids = {row[0] for row in repo.get_coordinates_within_box(box)}
+    assert ids == {places['louvre'].id, places['eiffel'].id}
+
+    # Moving a place re-indexes it
+    places['london'].latitude, places['london'].longitude = 48.85, 2.35
+    repo.add(places['london'])
+    assert places['london'].id in {row[0] for row in repo.get_coordinates_within_box(box)}
+    repo.delete(places['london'].id)
+    assert places['london'].id not in {row[0] for row in repo.get_coordinates_within_box(box)}
+
+    wrapped = geo.bounding_box(-17.7, 180.0, 50)
+    assert {row[0] for row in repo.get_coordinates_within_box(wrapped)} == \
+        {places['fiji'].id, places['samoa'].id}
+
+
+def test_nearby_endpoint_sorted_by_distance(app):
+    with app.app_context():
+        seed_cities(db.session.add)
+        db.session.commit()
+
+    client = app.test_client()
+    response = client.get('/api/v1/places/nearby?lat=48.8566&lon=2.3522&radius_km=25')
+    assert response.status_code == 200
+    assert [p['title'] for p in response.json] == ['louvre', 'eiffel', 'versailles']
+    distances = [p['distance_km'] for p in response.json]
+    assert distances == sorted(distances) and distances[-1] <= 25
+
+    response = client.get('/api/v1/places/nearby?lat=48.8566&lon=2.3522&radius_km=25&limit=1&offset=1')
+    assert [p['title'] for p in response.json] == ['eiffel']
+
+    response = client.get('/api/v1/places/within?min_lat=-18&max_lat=-17&min_lon=179&max_lon=-179')
+    assert sorted(p['title'] for p in response.json) == ['fiji', 'samoa']
+
+    assert client.get('/api/v1/places/nearby?lat=91&lon=0&radius_km=1').status_code == 400
+    assert client.get('/api/v1/places/nearby?lat=0&lon=0').status_code == 400
@@ -0,0 +1,40 @@
+# test_metrics.py
+
+from conftest import make_app
+
+
+def test_metrics_endpoint_reports_requests_and_sql():
+    import threading
+    from app import metrics
+
+    metrics.registry.reset()
+    app = make_app()
+    client = app.test_client()
+    for _ in range(3):
+        assert client.get('/api/v1/places/').status_code == 200
+    assert client.get('/api/v1/places/missing').status_code == 404
+
+    # Shards of exited threads are folded in, not lost
+    thread = threading.Thread(target=lambda: metrics.sql_statements.inc(amount=5))
+    thread.start()
+    thread.join()
+    del thread
+
+    response = client.get('/metrics')
+    assert response.status_code == 200
+    assert response.content_type.startswith('text/plain; version=0.0.4')
+    lines = response.get_data(as_text=True).splitlines()
+    labels = '{endpoint="places_place_list",method="GET"'
+    assert f'hbnb_http_requests_total{labels},status="200"}} 3' in lines
+    assert 'hbnb_http_requests_total{endpoint="places_place_resource",method="GET",status="404"} 1' in lines
+    assert f'hbnb_http_request_duration_seconds_count{labels}}} 3' in lines
+    assert f'hbnb_http_request_duration_seconds_bucket{labels},le="+Inf"}} 3' in lines
+    # Only the first listing reaches the database; the others are cache hits
+    assert f'hbnb_http_request_sql_statements_bucket{labels},le="0"}} 2' in lines
+    assert f'hbnb_http_request_sql_statements_count{labels}}} 3' in lines
+    total = next(line for line in lines if line.startswith('hbnb_sql_statements_total '))
+    assert int(total.split()[1]) >= 3 + 5
+    assert any(line.startswith('hbnb_db_pool_checkout_wait_seconds_count') for line in lines)
+
+    # Outside METRICS_ALLOW_FROM (loopback by default) the series stay private
+    assert client.get('/metrics', environ_base={'REMOTE_ADDR': '203.0.113.7'}).status_code == 403
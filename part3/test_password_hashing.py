@@ -0,0 +1,77 @@
+# test_password_hashing.py
+
+from app import create_app
+from app.extensions import db
+from app.models.user import User
+from conftest import TestConfig, make_app
+
+
+def test_password_hasher_pool_and_backpressure():
+    import threading
+    from flask import Flask
+    from app.extensions import bcrypt, password_hasher
+    from app.password_hashing import HasherBusy, PasswordHasher
+
+    pool_app = Flask(__name__)
+    pool_app.config.update(BCRYPT_LOG_ROUNDS=4, PASSWORD_HASH_WORKERS=1)
+    hasher = PasswordHasher(pool_app)
+    try:
+        pw_hash = hasher.hash('secret')
+        assert hasher.verify(pw_hash, 'secret') and not hasher.verify(pw_hash, 'wrong')
+        assert len(hasher.hash_many(['a', 'b', 'c'])) == 3
+    finally:
+        hasher.shutdown()
+
+    # Hashes stay interchangeable with flask_bcrypt's
+    app = make_app()
+    with app.app_context():
+        assert bcrypt.check_password_hash(pw_hash, 'secret')
+
+    # A full queue fails fast with a 503 on login
+    with app.app_context():
+        user = User("Busy", "User", "busy@example.com")
+        user.hash_password('secret')
+        db.session.add(user)
+        db.session.commit()
+    client = app.test_client()
+    credentials = {'email': 'busy@example.com', 'password': 'secret'}
+    assert client.post('/api/v1/auth/login', json=credentials).status_code == 200
+
+    slots = [password_hasher._slots.acquire(blocking=False) for _ in range(password_hasher.max_pending)]
+    try:
+        assert all(slots)
+        response = client.post('/api/v1/auth/login', json=credentials)
+        assert response.status_code == 503 and response.headers['Retry-After'] == '1'
+    finally:
+        for _ in slots:
+            password_hasher._slots.release()
+
+
+def test_password_hasher_timeout_is_busy_and_keeps_the_slot():
+    import time
+    import bcrypt as _bcrypt
+    from app.extensions import password_hasher
+
+    class SlowHashConfig(TestConfig):
+        PASSWORD_HASH_WORKERS = 1
+        PASSWORD_HASH_TIMEOUT = 0.001
+
+    app = create_app(SlowHashConfig)
+    with app.app_context():
+        db.create_all()
+        user = User("Slow", "User", "slow@example.com")
+        # Stored directly: hashing through the pool would time out too
+        user.password = _bcrypt.hashpw(b'secret', _bcrypt.gensalt(12)).decode('utf-8')
+        db.session.add(user)
+        db.session.commit()
+    try:
+        response = app.test_client().post('/api/v1/auth/login',
+                                          json={'email': 'slow@example.com', 'password': 'secret'})
+        assert response.status_code == 503 and response.headers['Retry-After'] == '1'
+        # The slot comes back once the worker has finished, not before
+        deadline = time.monotonic() + 30
+        while password_hasher._slots._value < password_hasher.max_pending:
+            assert time.monotonic() < deadline
+            time.sleep(0.01)
+    finally:
+        password_hasher.shutdown()
@@ -0,0 +1,170 @@
+# test_query.py
+
+from app.extensions import db
+from app.models.user import User
+from app.models.place import Place
+from app.persistence.repository import InMemoryRepository
+from conftest import make_app, make_places
+
+
+def seed_priced_places():
+    alice = User("Alice", "Owner", "alice.owner@example.com")
+    bob = User("Bob", "Owner", "bob.owner@example.com")
+    places = make_places(alice, 6)
+    for place, price, title in zip(places, [50, 20, 80, 20, 65, 35], "FBDAEC"):
+        place.price, place.title = float(price), title
+    places[5].owner = bob
+    for place in places:
+        place.user_id = place.owner.id  # set at flush by SQLAlchemy, by hand in memory
+    places[0].record_rating(5)
+    places[2].record_rating(2)
+    return places
+
+
+def query_pages(repo, query_args, **where):
+    """Walk every page of a query two at a time, returning the ids."""
+    from app.persistence.query import Query
+    seen, cursor = [], None
+    while True:
+        query = Query(limit=2, after=cursor, **query_args)
+        for attr, (op, value) in where.items():
+            query.where(attr, op, value)
+        page = repo.find(query)
+        seen.extend(p.id for p in page)
+        cursor = page.next_cursor
+        if not cursor:
+            return seen
+
+
+def test_query_spec_on_both_backends():
+    from app.persistence.query import Query
+    from app.services.repositories.place_repository import (
+        InMemoryPlaceRepository, PlaceRepository
+    )
+
+    def check(repo, places):
+        ids = [place.id for place in places]
+        by_price = sorted(places, key=lambda p: (p.price, p.id))
+        assert query_pages(repo, {'order_by': ('price',)}) == [p.id for p in by_price]
+        by_price_desc = sorted(places, key=lambda p: (p.price, p.id), reverse=True)
+        assert query_pages(repo, {'order_by': ('-price',)}) == [p.id for p in by_price_desc]
+        assert query_pages(repo, {'order_by': ('title',)}, price=('>=', 35.0)) == \
+            [ids[5], ids[2], ids[4], ids[0]]
+        assert query_pages(repo, {}, user_id=('==', places[5].user_id)) == [ids[5]]
+        assert query_pages(repo, {}, average_rating=('>=', 3)) == [ids[0]]
+        by_rating = sorted(places, key=lambda p: (p.rating_score, p.id), reverse=True)
+        assert query_pages(repo, {'order_by': ('-rating_score',)}) == [p.id for p in by_rating]
+        assert by_rating[:2] == [places[0], places[2]]
+        assert set(query_pages(repo, {}, price=('in', [20.0, 80.0]))) == {ids[1], ids[2], ids[3]}
+        # A cursor only resumes the sort order it was issued for
+        cursor = repo.find(Query(limit=1)).next_cursor
+        try:
+            repo.find(Query(order_by=('-price',), after=cursor))
+            assert False
+        except ValueError as e:
+            assert "cursor" in str(e)
+
+    repo = InMemoryPlaceRepository()
+    repo.add_index('user_id')
+    places = seed_priced_places()
+    for place in places:
+        repo.add(place)
+    check(repo, places)
+
+    app = make_app()
+    with app.app_context():
+        places = seed_priced_places()
+        db.session.add_all(places)
+        db.session.commit()
+        check(PlaceRepository(), places)
+        try:
+            PlaceRepository().find(Query().where('record_rating', '==', 1))
+            assert False
+        except ValueError as e:
+            assert "record_rating" in str(e)
+
+
+def test_columnar_place_queries_match_object_scan():
+    import random
+    from app.services.repositories.place_repository import InMemoryPlaceRepository
+
+    rng = random.Random(7)
+    owner = User("Col", "Owner", "col.owner@example.com")
+    places = make_places(owner, 120)
+    for place in places:
+        place.price = float(rng.randrange(10, 30))  # plenty of ties
+        place.latitude, place.longitude = rng.uniform(-60, 60), rng.uniform(-180, 180)
+        if rng.random() < 0.7:
+            place.record_rating(rng.randint(1, 5))
+    columnar, scanned = InMemoryPlaceRepository(), InMemoryRepository()
+
+    def check():
+        newest = sorted(scanned.get_all(), key=lambda p: (p.created_at, p.id), reverse=True)
+        assert query_pages(columnar, {'order_by': ('-created_at',)}) == [p.id for p in newest]
+        for order in (('price',), ('-price',), ('-latitude',), ('created_at',), ('-created_at',)):
+            for where in ({}, {'price': ('>=', 15.0)},
+                          {'price': ('<', 25.0), 'longitude': ('>', 0.0)},
+                          {'average_rating': ('>=', 3)}, {'title': ('!=', 'Place 3')}):
+                assert query_pages(columnar, {'order_by': order}, **where) == \
+                    query_pages(scanned, {'order_by': order}, **where)
+
+    for place in places:
+        columnar.add(place)
+        scanned.add(place)
+    check()
+
+    # Re-added after a change, added after querying, deleted rows' slots
+    # reused by the last row
+    places[3].price = 99.0
+    places[4].record_rating(1)
+    late = Place("Late", "", 21.0, 5.0, 5.0, owner)
+    for place in places[3:5] + [late]:
+        columnar.add(place)
+        scanned.add(place)
+    for place in places[::7]:
+        columnar.delete(place.id)
+        scanned.delete(place.id)
+    assert len(columnar._columns) == len(scanned.get_all())
+    check()
+
+    # Ratings recorded through the repository reach the column without a re-add
+    unrated = next(p for p in columnar.get_all() if p.average_rating is None)
+    columnar.record_rating(unrated, 5)
+    assert unrated.id in query_pages(columnar, {}, average_rating=('>=', 5))
+    check()
+
+
+def test_places_and_reviews_endpoint_filters(app):
+    from app.models.review import Review
+
+    with app.app_context():
+        places = seed_priced_places()
+        for rating in (5, 2, 4):
+            Review("ok", rating, places[0], places[0].owner)
+        db.session.add_all(places)
+        db.session.commit()
+        ids = [place.id for place in places]
+        bob_id = places[5].user_id
+
+    client = app.test_client()
+    titles = lambda response: [p['title'] for p in response.json]
+    assert titles(client.get('/api/v1/places/?min_price=30&max_price=70&sort=-price')) == \
+        ['E', 'F', 'C']
+    assert titles(client.get(f'/api/v1/places/?owner_id={bob_id}')) == ['C']
+    assert titles(client.get('/api/v1/places/?min_rating=4')) == ['F']
+    assert client.get('/api/v1/places/?sort=latitude').status_code == 400
+    # Unreviewed places rank as rated 0, so the sort key is never null
+    assert titles(client.get('/api/v1/places/?sort=-rating'))[:2] == ['F', 'D']
+    assert titles(client.get('/api/v1/places/?sort=rating'))[-2:] == ['D', 'F']
+    seen, url = [], '/api/v1/places/?sort=-rating&limit=4&fields=title'
+    while url:
+        response = client.get(url)
+        seen += titles(response)
+        url = response.headers.get('Link', '').split('>')[0].lstrip('<')
+    assert seen[:2] == ['F', 'D'] and sorted(seen) == sorted("FBDAEC")
+    assert client.get('/api/v1/places/?min_price=cheap').status_code == 400
+
+    response = client.get(f'/api/v1/reviews/places/{ids[0]}/reviews?min_rating=4&limit=1')
+    assert response.status_code == 200 and len(response.json) == 1
+    assert 'Link' in response.headers
+    assert client.get('/api/v1/reviews/places/nope/reviews').status_code == 404
@@ -0,0 +1,160 @@
+# test_query_audit.py
+
+from app import create_app
+from app.extensions import db
+from app.models.user import User
+from app.models.place import Place
+from conftest import TestConfig, make_app, seed_listing
+
+
+def count_queries(app, func):
+    from sqlalchemy import event
+    statements = []
+
+    def before_cursor_execute(conn, cursor, statement, *args):
+        statements.append(statement)
+
+    with app.app_context():
+        engine = db.engine
+        event.listen(engine, 'before_cursor_execute', before_cursor_execute)
+        try:
+            func()
+        finally:
+            event.remove(engine, 'before_cursor_execute', before_cursor_execute)
+    return len(statements)
+
+
+def test_place_listing_query_count_is_constant():
+    from app.api.v1.places import serialize_place
+    from app.services import facade
+
+    counts = []
+    for size in (2, 10):
+        app = make_app()
+        with app.app_context():
+            seed_listing(size)
+            db.session.expunge_all()
+
+        def list_places():
+            page = facade.get_all_places(limit=50)
+            assert len([serialize_place(p) for p in page]) == size
+
+        counts.append(count_queries(app, list_places))
+    assert counts[0] == counts[1] == 3
+
+    def detail():
+        place = facade.get_all_places(limit=1, profile=None).items[0]
+        db.session.expunge_all()
+        serialize_place(facade.get_place(place.id))
+
+    assert count_queries(app, detail) == 1 + 2
+
+
+def test_endpoints_stay_within_query_budgets():
+    from flask_jwt_extended import create_access_token
+    from app.services import facade
+    from app.models.amenity import Amenity
+    from app.models.review import Review
+
+    class NoCacheConfig(TestConfig):
+        RESPONSE_CACHE_SIZE = 0
+
+    app = create_app(NoCacheConfig)
+    with app.app_context():
+        db.create_all()
+        seed_listing(5)
+        owner = db.session.scalars(db.select(User).where(User.email == 'owner0@example.com')).one()
+        owner.hash_password('secret')
+        db.session.commit()
+        place = owner.places[0]
+        other = db.session.scalars(db.select(Place).where(Place.user_id != owner.id)).first()
+        ids = {
+            'owner': owner.id, 'place': place.id, 'other': other.id,
+            'review': place.reviews[0].id, 'reviews': [r.id for r in other.reviews],
+            'amenities': [a.id for a in db.session.scalars(db.select(Amenity))],
+        }
+        admin = create_access_token(identity={'id': 'admin', 'is_admin': True})
+        user = create_access_token(identity={'id': owner.id, 'is_admin': False})
+        # Build the email filter now rather than inside the first registration
+        facade.user_repo.email_taken('owner0@example.com')
+
+    as_admin = {'Authorization': f'Bearer {admin}'}
+    as_user = {'Authorization': f'Bearer {user}'}
+    new_place = {'title': 'New', 'price': 5.0, 'latitude': 1.0, 'longitude': 1.0,
+                 'amenities': ids['amenities']}
+    review = {'text': 'Good', 'rating': 5, 'user_id': ids['owner'], 'place_id': ids['other']}
+    requests = [
+        ('GET', '/api/v1/users/', None, {}),
+        ('POST', '/api/v1/users/', {'first_name': 'N', 'last_name': 'U',
+                                    'email': 'new@example.com', 'password': 'pw'}, {}),
+        ('POST', '/api/v1/users/admin', {'first_name': 'N', 'last_name': 'U',
+                                         'email': 'new2@example.com', 'password': 'pw'}, as_admin),
+        ('GET', f"/api/v1/users/{ids['owner']}", None, {}),
+        ('PUT', f"/api/v1/users/{ids['owner']}", {'first_name': 'O', 'last_name': 'W',
+                                                  'email': 'owner0@example.com', 'password': 'secret'},
+         as_admin),
+        ('POST', '/api/v1/auth/login', {'email': 'owner0@example.com', 'password': 'secret'}, {}),
+        ('GET', '/api/v1/amenities/', None, {}),
+        ('POST', '/api/v1/amenities/', {'name': 'Sauna'}, as_admin),
+        ('GET', f"/api/v1/amenities/{ids['amenities'][0]}", None, {}),
+        ('PUT', f"/api/v1/amenities/{ids['amenities'][0]}", {'name': 'Wi-Fi 6'}, as_admin),
+        ('GET', '/api/v1/places/', None, {}),
+        ('POST', '/api/v1/places/', new_place, as_user),
+        ('GET', '/api/v1/places/nearby?lat=0&lon=0&radius_km=10', None, {}),
+        ('GET', '/api/v1/places/within?min_lat=-1&min_lon=-1&max_lat=1&max_lon=1', None, {}),
+        ('GET', '/api/v1/places/search?q=place', None, {}),
+        ('GET', f"/api/v1/places/{ids['place']}", None, {}),
+        ('PUT', f"/api/v1/places/{ids['place']}", {'price': 12.0}, as_user),
+        ('GET', '/api/v1/reviews/', None, {}),
+        ('POST', '/api/v1/reviews/', review, as_user),
+        ('GET', f"/api/v1/reviews/{ids['review']}", None, {}),
+        ('PUT', f"/api/v1/reviews/{ids['review']}", dict(review, place_id=ids['place'], rating=2), as_user),
+        ('DELETE', f"/api/v1/reviews/{ids['review']}", None, as_user),
+        ('GET', f"/api/v1/reviews/places/{ids['other']}/reviews", None, {}),
+    ]
+
+    client = app.test_client()
+    exercised = set()
+    for method, path, body, headers in requests:
+        # Strict mode raises QueryBudgetExceeded out of the test client
+        response = client.open(path, method=method, json=body, headers=headers)
+        assert response.status_code < 400, (method, path, response.get_data(as_text=True))
+        assert 'X-Query-Repeats' not in response.headers
+        endpoint, _ = app.url_map.bind('localhost').match(path.split('?')[0], method=method)
+        exercised.add(f'{method} {endpoint}')
+    assert exercised == set(app.config['QUERY_BUDGETS'])
+
+
+def test_query_budget_flags_n_plus_one_loops(app):
+    from app.models.amenity import Amenity
+    from app.persistence.query_audit import QueryBudgetExceeded, query_budget
+    from app.services import facade
+
+    with app.app_context():
+        amenities = [Amenity(f"Amenity {i}") for i in range(4)]
+        db.session.add_all(amenities)
+        db.session.commit()
+        ids = [a.id for a in amenities]
+        db.session.expunge_all()
+
+        with query_budget(1) as log:
+            assert len(facade.amenity_repo.get_many(ids)) == 4
+        assert len(log) == 1
+
+        db.session.expunge_all()
+        try:
+            with query_budget(10):
+                for amenity_id in ids:
+                    facade.amenity_repo.get(amenity_id)
+            assert False
+        except QueryBudgetExceeded as e:
+            assert 'N+1 pattern' in str(e) and 'repeated 4x' in str(e)
+
+        db.session.expunge_all()
+        try:
+            with query_budget(2, allow_repeats=True):
+                for amenity_id in ids:
+                    facade.amenity_repo.get(amenity_id)
+            assert False
+        except QueryBudgetExceeded as e:
+            assert str(e).startswith('budget is 2: 4 statement(s)')
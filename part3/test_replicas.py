@@ -0,0 +1,67 @@
+# test_replicas.py
+
+from app import create_app
+from app.extensions import db
+from app.models.user import User
+from app.models.place import Place
+from conftest import TestConfig, make_app
+
+
+def test_read_replica_routing(tmp_path):
+    from flask_jwt_extended import create_access_token
+    from sqlalchemy import create_engine
+    from sqlalchemy.pool import QueuePool
+    from app.persistence.query_audit import record_statements
+    from app.persistence.replicas import ReplicaRouter, sync_sqlite_replicas
+    from app.services import facade
+
+    class ReplicaConfig(TestConfig):
+        SQLALCHEMY_DATABASE_URI = f"sqlite:///{tmp_path / 'primary.db'}"
+        SQLALCHEMY_REPLICA_URIS = [f"sqlite:///{tmp_path / 'replica.db'}"]
+        RESPONSE_CACHE_SIZE = 0
+
+    app = create_app(ReplicaConfig)
+    with app.app_context():
+        db.create_all()
+        owner = User("Owner", "One", "owner@example.com")
+        synced = Place("Synced", "", 10.0, 0.0, 0.0, owner)
+        db.session.add(synced)
+        db.session.commit()
+        sync_sqlite_replicas(ReplicaConfig.SQLALCHEMY_DATABASE_URI, ReplicaConfig.SQLALCHEMY_REPLICA_URIS)
+        # Written after the sync: the replica lags behind it
+        fresh = Place("Fresh", "", 20.0, 0.0, 0.0, owner)
+        db.session.add(fresh)
+        db.session.commit()
+        synced_id, fresh_id, owner_id = synced.id, fresh.id, owner.id
+        token = create_access_token(identity={'id': owner_id, 'is_admin': False})
+        primary, replica = db.engines[None], db.engines['replica0']
+
+    client = app.test_client()
+    with app.app_context(), record_statements(primary) as on_primary, record_statements(replica) as on_replica:
+        assert [p['title'] for p in client.get('/api/v1/places/').json] == ['Synced']
+        assert client.get(f'/api/v1/places/{fresh_id}').status_code == 404
+    assert len(on_replica) > 0 and len(on_primary) == 0
+
+    # Writes, and the reads they make, use the primary
+    response = client.put(f'/api/v1/places/{fresh_id}', json={'title': 'Fresher'},
+                          headers={'Authorization': f'Bearer {token}'})
+    assert response.status_code == 200
+    with app.test_request_context('/', method='GET'):
+        assert facade.get_place(fresh_id) is None  # replica
+        db.session.add(Place("Newest", "", 30.0, 0.0, 0.0, db.session.get(User, owner_id)))
+        db.session.flush()
+        assert facade.get_place(fresh_id).title == 'Fresher'  # read-your-writes
+        db.session.rollback()
+    with app.test_request_context('/', method='GET'):
+        assert facade.get_place(synced_id).title == 'Synced'
+
+    # The replica binds stay with this app: another one's create_all ignores them
+    with make_app().app_context():
+        assert Place.query.count() == 0
+
+    engines = [create_engine('sqlite://', poolclass=QueuePool) for _ in range(2)]
+    router = ReplicaRouter(engines)
+    assert [router.pick() for _ in range(4)] == engines * 2
+    busy = ReplicaRouter(engines, 'least_busy')
+    with engines[0].connect(), engines[0].connect():
+        assert [busy.pick() for _ in range(3)] == [engines[1]] * 3
@@ -0,0 +1,186 @@
+# test_repository.py
+
+from app.extensions import db
+from app.models.user import User
+from app.models.place import Place
+from app.persistence.repository import InMemoryRepository, SQLAlchemyRepository
+from conftest import make_places
+
+
+def walk(repo, limit):
+    seen, cursor = [], None
+    while True:
+        page = repo.get_page(limit=limit, after=cursor)
+        seen.extend(p.id for p in page)
+        cursor = page.next_cursor
+        if not cursor:
+            return seen
+
+
+def test_in_memory_keyset_pagination():
+    owner = User("Page", "Owner", "pager@example.com")
+    repo = InMemoryRepository()
+    places = make_places(owner, 7)
+    for place in reversed(places):
+        repo.add(place)
+
+    expected = [p.id for p in sorted(places, key=lambda p: (p.created_at, p.id))]
+    assert walk(repo, 3) == expected
+    assert [p.id for p in repo.get_page(limit=2, offset=5)] == expected[5:]
+
+    repo.delete(expected[0])
+    assert walk(repo, 2) == expected[1:]
+
+    try:
+        repo.get_page(limit=2, after="not-a-cursor")
+        assert False
+    except ValueError as e:
+        assert "cursor" in str(e)
+
+
+def test_sqlalchemy_keyset_pagination(app):
+    with app.app_context():
+        owner = User("Page", "Owner", "pager@example.com")
+        places = make_places(owner, 7)
+        db.session.add_all([owner] + places)
+        db.session.commit()
+
+        repo = SQLAlchemyRepository(Place)
+        expected = [p.id for p in sorted(places, key=lambda p: (p.created_at, p.id))]
+        assert walk(repo, 3) == expected
+        assert [p.id for p in repo.get_page(limit=3, offset=6)] == expected[6:]
+        assert repo.get_page(limit=7).next_cursor is None
+
+
+def test_places_endpoint_next_link(app):
+    with app.app_context():
+        owner = User("Page", "Owner", "pager@example.com")
+        db.session.add_all([owner] + make_places(owner, 3))
+        db.session.commit()
+
+    client = app.test_client()
+    first = client.get('/api/v1/places/?limit=2')
+    assert first.status_code == 200
+    assert len(first.json) == 2
+    next_url = first.headers['Link'].split('>')[0].lstrip('<')
+
+    second = client.get(next_url)
+    assert len(second.json) == 1
+    assert 'Link' not in second.headers
+
+    assert client.get('/api/v1/places/?limit=0').status_code == 400
+    assert client.get('/api/v1/places/?after=bogus').status_code == 400
+
+
+def test_rating_aggregates_follow_review_writes(app):
+    from app.models.review import Review
+    from app.services import facade
+
+    with app.app_context():
+        owner = User("Rate", "Owner", "rater@example.com")
+        place = Place("Rated", "", 10.0, 0.0, 0.0, owner)
+        db.session.add(place)
+        db.session.commit()
+
+        first = facade.create_review({'text': 'Good', 'rating': 4,
+                                      'user_id': owner.id, 'place_id': place.id})
+        second = facade.create_review({'text': 'Poor', 'rating': 2,
+                                       'user_id': owner.id, 'place_id': place.id})
+        assert (place.review_count, place.rating_sum) == (2, 6)
+        assert place.average_rating == 3.0
+        assert place.rating_histogram == [0, 1, 0, 1, 0]
+
+        facade.update_review(second.id, {'rating': 5})
+        assert place.rating_histogram == [0, 0, 0, 1, 1]
+        # Review.validate is the one rule: 0 is rejected like 6
+        for rating in (0, 6):
+            try:
+                facade.update_review(second.id, {'rating': rating})
+                assert False
+            except ValueError as e:
+                assert "between 1 and 5" in str(e)
+        facade.delete_review(first.id)
+        assert (place.review_count, place.rating_sum) == (1, 5)
+
+        # Corrupt the aggregates, then rebuild them from the reviews table
+        place.review_count, place.rating_sum, place.rating_5 = 9, 9, 9
+        db.session.add(Review("Extra", 3, place, owner))
+        db.session.commit()
+        assert facade.rebuild_rating_aggregates() == 1
+        db.session.expire_all()
+        assert (place.review_count, place.rating_sum) == (2, 8)
+        assert place.rating_histogram == [0, 0, 1, 0, 1]
+        assert Place.query.order_by(Place.average_rating.desc()).first() is place
+
+
+def test_in_memory_secondary_indexes():
+    repo = InMemoryRepository()
+    alice = User("Alice", "Smith", "alice@example.com")
+    bob = User("Bob", "Smith", "bob@example.com")
+    repo.add(alice)
+    repo.add_index('email', unique=True)
+    repo.add_index('last_name')
+    repo.add(bob)
+
+    assert repo.get_by_attribute('email', 'bob@example.com') is bob
+    assert set(repo.get_all_by_attribute('last_name', 'Smith')) == {alice, bob}
+
+    try:
+        repo.update(bob.id, {'email': 'alice@example.com'})
+        assert False
+    except ValueError as e:
+        assert "unique" in str(e)
+    assert bob.email == 'bob@example.com'
+
+    repo.update(bob.id, {'email': 'robert@example.com', 'last_name': 'Jones'})
+    assert repo.get_by_attribute('email', 'bob@example.com') is None
+    assert repo.get_by_attribute('email', 'robert@example.com') is bob
+    assert repo.get_all_by_attribute('last_name', 'Smith') == [alice]
+
+    repo.delete(alice.id)
+    assert repo.get_by_attribute('email', 'alice@example.com') is None
+    assert repo.get_all_by_attribute('last_name', 'Smith') == []
+
+
+def test_transaction_commits_once_and_rolls_back(app):
+    from sqlalchemy import event
+    from app.models.amenity import Amenity
+    from app.services import facade
+
+    with app.app_context():
+        owner = User("Unit", "Work", "uow@example.com")
+        wifi, pool = Amenity("Wi-Fi"), Amenity("Pool")
+        db.session.add_all([owner, wifi, pool])
+        db.session.commit()
+
+        commits = []
+        event.listen(db.session, 'after_commit', lambda session: commits.append(1))
+        place = facade.create_place({
+            'title': 'Atomic', 'price': 10.0, 'latitude': 0.0, 'longitude': 0.0,
+            'owner_id': owner.id, 'amenities': [wifi.id, pool.id]
+        })
+        review = facade.create_review({'text': 'Good', 'rating': 5,
+                                       'user_id': owner.id, 'place_id': place.id})
+        assert len(commits) == 2
+
+        # A failing update leaves neither the field change nor the cleared
+        # amenity list behind
+        try:
+            facade.update_place(place.id, {'title': 'Changed', 'amenities': ['missing']})
+            assert False
+        except ValueError:
+            pass
+        db.session.expire_all()
+        assert place.title == 'Atomic' and len(place.amenities) == 2
+
+        # Several facade calls grouped into one unit of work
+        try:
+            with facade.transaction():
+                facade.update_review(review.id, {'rating': 1})
+                facade.delete_review(review.id)
+                raise RuntimeError("abort")
+        except RuntimeError:
+            pass
+        assert facade.get_review(review.id).rating == 5
+        assert place.review_count == 1 and place.rating_5 == 1
+        assert len(commits) == 2
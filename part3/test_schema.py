@@ -0,0 +1,68 @@
+# test_schema.py
+
+from app import create_app
+from app.extensions import db
+from conftest import TestConfig
+
+
+class RecordingLogger:
+    def __init__(self):
+        self.warnings = []
+
+    def warning(self, message, *args):
+        self.warnings.append(message % args)
+
+
+def test_migrations_upgrade_old_schema_and_report_missing_indexes():
+    from sqlalchemy import text
+    from app.persistence import migrations
+    from app.services import facade
+
+    app = create_app(TestConfig)
+    with app.app_context():
+        # A database as first shipped, with data in it
+        assert [v for v, _ in migrations.upgrade(target=1)] == [1]
+        stamps = "'2025-01-01 00:00:00', '2025-01-01 00:00:00'"
+        with db.engine.begin() as connection:
+            connection.execute(text(
+                "INSERT INTO users (id, created_at, updated_at, first_name, last_name, email, "
+                f"is_admin) VALUES ('u1', {stamps}, 'A', 'B', 'a@b.c', 0)"
+            ))
+            connection.execute(text(
+                "INSERT INTO places (id, created_at, updated_at, title, description, price, "
+                f"latitude, longitude, user_id) VALUES ('p1', {stamps}, 'Sunny loft', '', "
+                "90.0, 48.85, 2.35, 'u1')"
+            ))
+            for review_id, rating in (('r1', 5), ('r2', 3)):
+                connection.execute(text(
+                    "INSERT INTO reviews (id, created_at, updated_at, rating, comment, user_id, "
+                    f"place_id) VALUES ('{review_id}', {stamps}, {rating}, 'ok', 'u1', 'p1')"
+                ))
+
+        logger = RecordingLogger()
+        missing = migrations.check_schema(logger)
+        assert ('reviews', 'ix_reviews_place_created') in missing
+        assert ('places', 'ix_places_price') in missing
+        assert any('3 schema migration(s) pending' in w for w in logger.warnings)
+
+        assert [v for v, _ in migrations.upgrade()] == [2, 3, 4]
+        assert migrations.upgrade() == []
+        assert migrations.check_schema(RecordingLogger()) == []
+
+        place = facade.get_place('p1')
+        assert (place.review_count, place.rating_sum, place.rating_histogram) == \
+            (2, 8, [0, 0, 1, 0, 1])
+        assert place.geohash.startswith('u09')
+        assert [p.id for p in facade.search_places('loft')] == ['p1']
+
+
+def test_create_all_schema_needs_no_index_migration(app):
+    from app.persistence import migrations
+
+    with app.app_context():
+        with db.engine.connect() as connection:
+            assert migrations.missing_indexes(connection) == []
+        # Migrations only add what is missing
+        assert len(migrations.upgrade()) == len(migrations.MIGRATIONS)
+        with db.engine.connect() as connection:
+            assert migrations.pending_migrations(connection) == []
@@ -0,0 +1,67 @@
+# test_search.py
+
+from app.extensions import db
+from app.models.user import User
+from app.models.place import Place
+
+
+def seed_texts(repo_add):
+    owner = User("Text", "Owner", "text@example.com")
+    texts = [
+        ("Sunny loft", "Bright loft near the river"),
+        ("Garden cottage", "Quiet cottage with a loft bedroom"),
+        ("Café studio", "Small studio above a café"),
+        ("Beach house", "Sea views"),
+    ]
+    places = [Place(title, description, 10.0, 0.0, 0.0, owner) for title, description in texts]
+    for place in places:
+        repo_add(place)
+    return places
+
+
+def test_in_memory_text_index():
+    from app.services.repositories.place_repository import InMemoryPlaceRepository
+
+    repo = InMemoryPlaceRepository()
+    loft, cottage, studio, beach = seed_texts(repo.add)
+    # Title hits outrank description hits; terms match as prefixes
+    assert repo.search_ids(['loft']) == [loft.id, cottage.id]
+    assert repo.search_ids(['lo']) == [loft.id, cottage.id]
+    assert repo.search_ids(['loft', 'riv']) == [loft.id]
+    assert repo.search_ids(['cafe']) == [studio.id]
+    assert repo.search_ids(['loft'], limit=1, offset=1) == [cottage.id]
+
+    beach.title = "Beach loft"
+    repo.add(beach)
+    assert beach.id in repo.search_ids(['loft'])
+    repo.delete(loft.id)
+    assert repo.search_ids(['sunny']) == []
+
+
+def test_search_endpoint_uses_fts(app):
+    from app.services import facade
+
+    with app.app_context():
+        loft, cottage, studio, beach = seed_texts(db.session.add)
+        db.session.commit()
+        beach_id = beach.id
+
+    client = app.test_client()
+    response = client.get('/api/v1/places/search?q=loft')
+    assert response.status_code == 200
+    assert [p['title'] for p in response.json] == ['Sunny loft', 'Garden cottage']
+    response = client.get('/api/v1/places/search?q=Cafe+stu')
+    assert [p['title'] for p in response.json] == ['Café studio']
+    response = client.get('/api/v1/places/search?q=lo&limit=1&offset=1')
+    assert [p['title'] for p in response.json] == ['Garden cottage']
+
+    with app.app_context():
+        facade.update_place(beach_id, {'description': 'Loft over the dunes'})
+    response = client.get('/api/v1/places/search?q=dunes')
+    assert [p['id'] for p in response.json] == [beach_id]
+
+    assert client.get('/api/v1/places/search?q=%20%3F').status_code == 400
+
+    with app.app_context():
+        assert facade.rebuild_search_index() == 4
+        assert len(facade.search_places('loft')) == 3
@@ -0,0 +1,60 @@
+# test_serializers.py
+
+from app.models.place import Place
+from conftest import seed_listing
+
+
+def test_compiled_serializers_match_marshal(app):
+    from flask_restx import marshal
+    from app.api.serializers import compile_serializer
+    from app.api.v1.places import place_output
+    from app.api.v1.reviews import review_output
+    from app.api.v1.users import user_model
+
+    client = app.test_client()
+    with app.app_context():
+        seed_listing(2)
+        place = Place.query.first()
+        for model, obj in ((place_output, place), (review_output, place.reviews[0]),
+                           (user_model, place.owner)):
+            assert compile_serializer(model)(obj) == marshal(obj, model)
+        place_id = place.id
+
+    response = client.get(f'/api/v1/places/{place_id}')
+    assert response.status_code == 200
+    assert response.json['id'] == place_id and len(response.json['reviews']) == 2
+    assert client.get('/api/v1/places/missing').status_code == 404
+
+
+def test_sparse_fieldsets_load_only_what_is_asked(app):
+    from app.persistence.query_audit import record_statements
+
+    client = app.test_client()
+    with app.app_context():
+        seed_listing(3)
+        place = Place.query.first()
+        place_id, review_id = place.id, place.reviews[0].id
+
+    with app.app_context(), record_statements() as log:
+        response = client.get('/api/v1/places/?fields=id,title,price,latitude,longitude')
+    assert response.status_code == 200 and len(response.json) == 3
+    assert set(response.json[0]) == {'id', 'title', 'price', 'latitude', 'longitude'}
+    # One statement, and it reads neither the description nor any relationship
+    assert len(log) == 1 and 'description' not in log.statements[0][0]
+
+    response = client.get(f'/api/v1/places/{place_id}?fields=id,average_rating&expand=owner')
+    assert set(response.json) == {'id', 'average_rating', 'owner'}
+    assert set(response.json['owner']) == {'id', 'first_name', 'last_name', 'email'}
+    assert response.headers['X-Query-Count'] == '1'
+
+    response = client.get(f'/api/v1/places/{place_id}')
+    assert {'owner', 'amenities', 'reviews', 'description'} <= set(response.json)
+
+    response = client.get(f'/api/v1/reviews/{review_id}')
+    assert set(response.json) == {'id', 'text', 'rating', 'user_id', 'place_id'}
+    response = client.get(f'/api/v1/reviews/places/{place_id}/reviews?fields=rating&expand=user,place')
+    assert [set(review) for review in response.json] == [{'rating', 'user', 'place'}] * 2
+    assert response.json[0]['place'] == {'id': place_id, 'title': 'Place 0'}
+
+    assert client.get('/api/v1/places/?fields=id,password').status_code == 400
+    assert client.get(f'/api/v1/reviews/{review_id}?expand=owner').status_code == 400
@@ -0,0 +1,61 @@
+# test_users.py
+
+from datetime import datetime
+
+from app.extensions import db
+from app.models.user import User
+from conftest import make_app
+
+
+def test_email_uniqueness_backed_by_unique_index():
+    from sqlalchemy import insert
+    from app.persistence.bloom import BloomFilter
+    from app.persistence.query_audit import record_statements
+    from app.services import facade
+
+    bloom = BloomFilter(100)
+    for i in range(100):
+        bloom.add(f"user{i}@example.com")
+    assert all(f"user{i}@example.com" in bloom for i in range(100))
+    assert bloom.full
+
+    def register(email):
+        return facade.create_user({'first_name': 'Ann', 'last_name': 'Lee',
+                                   'email': email, 'password': 'secret'})
+
+    app = make_app()
+    with app.app_context():
+        ann_id = register('ann@example.com').id
+        try:
+            register('ann@example.com')
+            assert False
+        except ValueError as e:
+            assert 'Email already registered' in str(e)
+
+        # Never-seen emails are answered by the filter, known ones by the index
+        with record_statements() as log:
+            assert not facade.user_repo.email_taken('nobody@example.com')
+        assert len(log) == 0
+        with record_statements() as log:
+            assert facade.user_repo.email_taken('ann@example.com')
+            assert not facade.user_repo.email_taken('ann@example.com', exclude_id=ann_id)
+        assert len(log) == 2
+
+        # Changing an email releases the old one
+        facade.update_user(ann_id, {'email': 'ann.lee@example.com'})
+        register('ann@example.com')
+
+        # A row the filter never saw (another worker) hits the unique constraint
+        now = datetime.utcnow()
+        db.session.execute(insert(User.__table__).values(
+            id='other-worker', first_name='Bo', last_name='Ng', email='bo@example.com',
+            password=None, is_admin=False, created_at=now, updated_at=now
+        ))
+        db.session.commit()
+        assert not facade.user_repo.email_taken('bo@example.com')
+        try:
+            register('bo@example.com')
+            assert False
+        except ValueError as e:
+            assert 'Email already registered' in str(e)
+        assert register('cy@example.com').id